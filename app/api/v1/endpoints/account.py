@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Form, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.database import get_db
@@ -26,6 +26,8 @@ from app.schemas.account import (
 from app.models.enums import UserRole
 from app.services.upload_service import UploadService
 from app.core.validators import Validators
+from app.core.cache import reference_cache, FAQS, PRIVACY_SECTIONS, WHY_US
+from app.core.http_cache import encode_json, etag_response
 
 router = APIRouter()
 
@@ -1028,6 +1030,7 @@ async def renew_package(
 
 @router.get("/account/help-center", response_model=List[FAQResponse])
 async def get_faqs(
+    request: Request,
     category: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -1042,22 +1045,22 @@ async def get_faqs(
     - ممثل الشركة: أسئلة خاصة بالشركات
     - عامة: أسئلة مشتركة لجميع الأدوار
     """
-    query = db.query(FAQ).filter(FAQ.is_active == True)
+    # فلترة تلقائية حسب دور المستخدم (إذا لم يتم تحديد الفئة يدوياً)
+    role_category_map = {
+        UserRole.TECHNICIAN: "technician",
+        UserRole.POOL_OWNER: "pool_owner",
+        UserRole.COMPANY: "company",
+        UserRole.ADMIN: "admin"
+    }
+    role_category = None if category else role_category_map.get(current_user.role)
     
-    # فلترة حسب الفئة (إذا تم تحديدها يدوياً)
-    if category:
-        query = query.filter(FAQ.category == category)
-    else:
-        # فلترة تلقائية حسب دور المستخدم
-        role_category_map = {
-            UserRole.TECHNICIAN: "technician",
-            UserRole.POOL_OWNER: "pool_owner",
-            UserRole.COMPANY: "company",
-            UserRole.ADMIN: "admin"
-        }
-        role_category = role_category_map.get(current_user.role)
+    def load_faqs():
+        query = db.query(FAQ).filter(FAQ.is_active == True)
         
-        if role_category:
+        # فلترة حسب الفئة (إذا تم تحديدها يدوياً)
+        if category:
+            query = query.filter(FAQ.category == category)
+        elif role_category:
             # جلب FAQs الخاصة بالدور + العامة
             # FAQs الخاصة بالدور لها الأولوية
             query = query.filter(
@@ -1068,20 +1071,22 @@ async def get_faqs(
             query = query.filter(
                 (FAQ.category == "general") | (FAQ.category.is_(None))
             )
-    
-    # الترتيب: FAQs الخاصة بالدور أولاً، ثم العامة
-    faqs = query.order_by(
-        FAQ.category.desc().nullslast(),  # FAQs الخاصة بالدور أولاً
-        FAQ.sort_order,
-        FAQ.id
-    ).all()
-    
-    return faqs
+        
+        # الترتيب: FAQs الخاصة بالدور أولاً، ثم العامة
+        faqs = query.order_by(
+            FAQ.category.desc().nullslast(),  # FAQs الخاصة بالدور أولاً
+            FAQ.sort_order,
+            FAQ.id
+        ).all()
+        return encode_json([FAQResponse.model_validate(faq) for faq in faqs])
+    
+    return etag_response(request, reference_cache.get_or_load(FAQS, (category, role_category), load_faqs), private=True)
 
 # ============= Privacy and Security =============
 
 @router.get("/account/privacy-security", response_model=List[PrivacySectionResponse])
 async def get_privacy_sections(
+    request: Request,
     role: Optional[str] = Query(None, description="فلترة حسب الدور"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -1090,21 +1095,24 @@ async def get_privacy_sections(
     الحصول على أقسام الخصوصية والأمان (مع فلترة حسب الدور)
     Get privacy and security sections (filtered by role)
     """
-    query = db.query(PrivacyPolicySection).filter(
-        PrivacyPolicySection.is_active == True
-    )
-    
-    # يمكن إضافة فلترة حسب الدور في المستقبل إذا أضفنا category للأقسام
-    # حالياً نرجع جميع الأقسام النشطة
-    
-    sections = query.order_by(PrivacyPolicySection.sort_order, PrivacyPolicySection.id).all()
+    def load_sections():
+        query = db.query(PrivacyPolicySection).filter(
+            PrivacyPolicySection.is_active == True
+        )
+        
+        # يمكن إضافة فلترة حسب الدور في المستقبل إذا أضفنا category للأقسام
+        # حالياً نرجع جميع الأقسام النشطة
+        
+        sections = query.order_by(PrivacyPolicySection.sort_order, PrivacyPolicySection.id).all()
+        return encode_json([PrivacySectionResponse.model_validate(section) for section in sections])
     
-    return sections
+    return etag_response(request, reference_cache.get_or_load(PRIVACY_SECTIONS, "active", load_sections), private=True)
 
 # ============= Why Us =============
 
 @router.get("/account/why-us", response_model=WhyUsResponse)
 async def get_why_us(
+    request: Request,
     role: Optional[str] = Query(None, description="فلترة حسب الدور"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -1113,41 +1121,44 @@ async def get_why_us(
     الحصول على معلومات "لماذا نحن" (يمكن تخصيصها حسب الدور)
     Get "Why Us" information (can be customized by role)
     """
-    # جلب الإحصائيات
-    stats = db.query(WhyUsStat).all()
-    stats_response = [
-        WhyUsStatResponse(
-            id=stat.id,
-            stat_type=stat.stat_type,
-            value=stat.value,
-            label_ar=stat.label_ar,
-            label_en=stat.label_en,
-            icon=stat.icon
-        ) for stat in stats
-    ]
+    def load_why_us():
+        # جلب الإحصائيات
+        stats = db.query(WhyUsStat).all()
+        stats_response = [
+            WhyUsStatResponse(
+                id=stat.id,
+                stat_type=stat.stat_type,
+                value=stat.value,
+                label_ar=stat.label_ar,
+                label_en=stat.label_en,
+                icon=stat.icon
+            ) for stat in stats
+        ]
     
-    # جلب المميزات
-    features = db.query(WhyUsFeature).filter(
-        WhyUsFeature.is_active == True
-    ).order_by(WhyUsFeature.sort_order, WhyUsFeature.id).all()
+        # جلب المميزات
+        features = db.query(WhyUsFeature).filter(
+            WhyUsFeature.is_active == True
+        ).order_by(WhyUsFeature.sort_order, WhyUsFeature.id).all()
+    
+        features_response = [
+            WhyUsFeatureResponse(
+                id=feature.id,
+                title_ar=feature.title_ar,
+                title_en=feature.title_en,
+                description_ar=feature.description_ar,
+                description_en=feature.description_en,
+                icon=feature.icon,
+                sort_order=feature.sort_order,
+                is_active=feature.is_active
+            ) for feature in features
+        ]
     
-    features_response = [
-        WhyUsFeatureResponse(
-            id=feature.id,
-            title_ar=feature.title_ar,
-            title_en=feature.title_en,
-            description_ar=feature.description_ar,
-            description_en=feature.description_en,
-            icon=feature.icon,
-            sort_order=feature.sort_order,
-            is_active=feature.is_active
-        ) for feature in features
-    ]
+        return encode_json(WhyUsResponse(
+            stats=stats_response,
+            features=features_response
+        ))
     
-    return WhyUsResponse(
-        stats=stats_response,
-        features=features_response
-    )
+    return etag_response(request, reference_cache.get_or_load(WHY_US, "all", load_why_us), private=True)
 
 # ============= Delete Account =============
 
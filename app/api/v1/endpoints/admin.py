@@ -4,6 +4,8 @@ from sqlalchemy import desc, asc
 from typing import List, Optional
 from app.db.database import get_db
 from app.core.dependencies import get_current_admin
+from app.core.cache import reference_cache, FAQS, PRIVACY_SECTIONS, WHY_US, MAINTENANCE_PACKAGES, PRODUCTS, HOME, OFFERS
+from app.core.single_flight import single_flight
 from app.models.user import User
 from app.models.enums import UserRole
 from app.models.faq import FAQ
@@ -17,6 +19,9 @@ from app.schemas.account import (
     WhyUsFeatureResponse, WhyUsFeatureCreate, WhyUsFeatureUpdate,
     TechnicianProfileUpdateRequest, PoolOwnerProfileUpdateRequest, CompanyProfileUpdateRequest
 )
+from app.models.order import OrderStatus
+from app.schemas.order import OrderStatusUpdate, OrderEventResponse
+from app.services.order_state_machine import transition_order_status
 
 router = APIRouter()
 
@@ -267,15 +272,7 @@ async def delete_user_by_admin(
 
 # ============= Admin - Dashboard =============
 
-@router.get("/admin/dashboard/stats")
-async def get_admin_dashboard_stats(
-    current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
-):
-    """
-    إحصائيات لوحة تحكم الأدمن
-    Admin dashboard statistics
-    """
+def _fetch_admin_dashboard_stats(db: Session) -> dict:
     # عدد المستخدمين حسب الدور
     total_users = db.query(User).count()
     pool_owners = db.query(User).filter(User.role == UserRole.POOL_OWNER).count()
@@ -307,6 +304,19 @@ async def get_admin_dashboard_stats(
         }
     }
 
+
+@router.get("/admin/dashboard/stats")
+def get_admin_dashboard_stats(
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    إحصائيات لوحة تحكم الأدمن
+    Admin dashboard statistics
+    """
+    # الطلبات المتزامنة تنتظر نفس الحساب بدلاً من تكراره
+    return single_flight.do("admin_dashboard_stats", lambda: _fetch_admin_dashboard_stats(db))
+
 # ============= Admin - FAQ Management =============
 
 @router.get("/admin/faqs", response_model=List[FAQResponse])
@@ -346,6 +356,7 @@ async def create_faq(
     new_faq = FAQ(**faq.dict())
     db.add(new_faq)
     db.commit()
+    reference_cache.invalidate(FAQS)
     db.refresh(new_faq)
     return new_faq
 
@@ -372,6 +383,7 @@ async def update_faq(
         setattr(faq, field, value)
     
     db.commit()
+    reference_cache.invalidate(FAQS)
     db.refresh(faq)
     return faq
 
@@ -394,6 +406,7 @@ async def delete_faq(
     
     db.delete(faq)
     db.commit()
+    reference_cache.invalidate(FAQS)
     return
 
 # ============= Admin - Privacy Policy Management =============
@@ -431,6 +444,7 @@ async def create_privacy_section(
     new_section = PrivacyPolicySection(**section.dict())
     db.add(new_section)
     db.commit()
+    reference_cache.invalidate(PRIVACY_SECTIONS)
     db.refresh(new_section)
     return new_section
 
@@ -457,6 +471,7 @@ async def update_privacy_section(
         setattr(section, field, value)
     
     db.commit()
+    reference_cache.invalidate(PRIVACY_SECTIONS)
     db.refresh(section)
     return section
 
@@ -479,6 +494,7 @@ async def delete_privacy_section(
     
     db.delete(section)
     db.commit()
+    reference_cache.invalidate(PRIVACY_SECTIONS)
     return
 
 # ============= Admin - Why Us Management =============
@@ -516,6 +532,7 @@ async def create_why_us_stat(
     new_stat = WhyUsStat(**stat.dict())
     db.add(new_stat)
     db.commit()
+    reference_cache.invalidate(WHY_US)
     db.refresh(new_stat)
     return new_stat
 
@@ -555,6 +572,7 @@ async def update_why_us_stat(
         setattr(stat, field, value)
     
     db.commit()
+    reference_cache.invalidate(WHY_US)
     db.refresh(stat)
     return stat
 
@@ -577,6 +595,7 @@ async def delete_why_us_stat(
     
     db.delete(stat)
     db.commit()
+    reference_cache.invalidate(WHY_US)
     return
 
 @router.get("/admin/why-us/features", response_model=List[WhyUsFeatureResponse])
@@ -612,6 +631,7 @@ async def create_why_us_feature(
     new_feature = WhyUsFeature(**feature.dict())
     db.add(new_feature)
     db.commit()
+    reference_cache.invalidate(WHY_US)
     db.refresh(new_feature)
     return new_feature
 
@@ -638,6 +658,7 @@ async def update_why_us_feature(
         setattr(feature, field, value)
     
     db.commit()
+    reference_cache.invalidate(WHY_US)
     db.refresh(feature)
     return feature
 
@@ -660,6 +681,7 @@ async def delete_why_us_feature(
     
     db.delete(feature)
     db.commit()
+    reference_cache.invalidate(WHY_US)
     return
 
 # ============= Admin - User Profiles Management (التحكم في صفحات الحساب الشخصي) =============
@@ -899,6 +921,7 @@ async def create_package_admin(
     new_package = MaintenancePackage(**package.dict())
     db.add(new_package)
     db.commit()
+    reference_cache.invalidate(MAINTENANCE_PACKAGES)
     db.refresh(new_package)
     return new_package
 
@@ -928,6 +951,7 @@ async def update_package_admin(
         setattr(db_package, field, value)
     
     db.commit()
+    reference_cache.invalidate(MAINTENANCE_PACKAGES)
     db.refresh(db_package)
     return db_package
 
@@ -952,6 +976,7 @@ async def delete_package_admin(
     
     db.delete(db_package)
     db.commit()
+    reference_cache.invalidate(MAINTENANCE_PACKAGES)
     return
 
 # ============= Admin - Offers Management (التحكم في العروض) =============
@@ -1006,9 +1031,11 @@ async def create_offer_admin(
     
     # حساب السعر النهائي
     new_offer.final_price = new_offer.calculate_final_price()
+    new_offer.expire_if_ended()
     
     db.add(new_offer)
     db.commit()
+    reference_cache.invalidate(OFFERS, HOME)
     db.refresh(new_offer)
     return new_offer
 
@@ -1036,8 +1063,13 @@ async def update_offer_admin(
     
     # إعادة حساب السعر النهائي
     db_offer.final_price = db_offer.calculate_final_price()
+    # إعادة حساب الحالة حسب تاريخ الانتهاء (إلا إذا حدد الأدمن الحالة بنفسه)
+    if "end_date" in update_data and "status" not in update_data:
+        db_offer.reactivate_if_extended()
+    db_offer.expire_if_ended()
     
     db.commit()
+    reference_cache.invalidate(OFFERS, HOME)
     db.refresh(db_offer)
     return db_offer
 
@@ -1059,6 +1091,7 @@ async def delete_offer_admin(
     
     db.delete(db_offer)
     db.commit()
+    reference_cache.invalidate(OFFERS, HOME)
     return
 
 # ============= Admin - Products Management (التحكم في المنتجات/الكروت) =============
@@ -1114,6 +1147,7 @@ async def create_product_admin(
     
     db.add(new_product)
     db.commit()
+    reference_cache.invalidate(PRODUCTS, HOME)
     db.refresh(new_product)
     return new_product
 
@@ -1143,6 +1177,7 @@ async def update_product_admin(
     db_product.final_price = db_product.calculate_final_price()
     
     db.commit()
+    reference_cache.invalidate(PRODUCTS, HOME)
     db.refresh(db_product)
     return db_product
 
@@ -1164,4 +1199,41 @@ async def delete_product_admin(
     
     db.delete(db_product)
     db.commit()
+    reference_cache.invalidate(PRODUCTS, HOME)
     return
+
+# ============= Admin - Orders Management (التحكم في حالات الطلبات) =============
+
+@router.put("/admin/orders/{order_id}/status", response_model=OrderEventResponse)
+def update_order_status_admin(
+    order_id: int,
+    status_update: OrderStatusUpdate,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    تغيير حالة طلب (للأدمن فقط) حسب الانتقالات المسموحة
+    Change order status (Admin only) - recorded in the order events log
+    """
+    transition = transition_order_status(
+        db,
+        order_id,
+        status_update.status,
+        actor_id=current_user.id,
+        note=status_update.note,
+    )
+    db.commit()
+    if transition.to_status == OrderStatus.CANCELLED:
+        # المخزون رجع - استجابات المنتجات المحفوظة لم تعد صحيحة
+        reference_cache.invalidate(PRODUCTS, HOME)
+    
+    return OrderEventResponse(
+        id=transition.event_id,
+        order_id=transition.order_id,
+        order_number=transition.order_number,
+        event_type=transition.event_type,
+        from_status=transition.from_status,
+        to_status=transition.to_status,
+        note=transition.note,
+        created_at=transition.created_at,
+    )
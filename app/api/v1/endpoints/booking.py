@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from datetime import datetime, timedelta
 from app.db.database import get_db
@@ -9,15 +10,39 @@ from app.models.pool_type import PoolType
 from app.models.maintenance_package import MaintenancePackage
 from app.schemas.booking import BookingCreate, BookingUpdate, BookingResponse, BookingDetailResponse
 from app.core.dependencies import get_current_user, get_current_admin
+from app.core.cache import reference_cache, HOME
+from app.core.serialization import response_columns, construct_rows, construct_row, json_response
+from app.services.idempotency_service import idempotency_store
 from app.models.user import User
 
 router = APIRouter()
 
+# أعمدة الحجز التي تحتاجها الاستجابة + أسماء الخدمة/نوع المسبح/الباقة/المستخدم في نفس الاستعلام
+BOOKING_DETAIL_COLUMNS = response_columns(BookingDetailResponse, Booking)
+
+
+def _booking_detail_query(db: Session):
+    """استعلام الحجوزات مع الأسماء المرتبطة (JOIN بدلاً من تحميل كل علاقة لكل حجز)"""
+    return (
+        db.query(
+            *BOOKING_DETAIL_COLUMNS,
+            Service.name_ar.label("service_name"),
+            PoolType.name_ar.label("pool_type_name"),
+            MaintenancePackage.name_ar.label("package_name"),
+            User.full_name.label("user_name"),
+        )
+        .outerjoin(Service, Booking.service_id == Service.id)
+        .outerjoin(PoolType, Booking.pool_type_id == PoolType.id)
+        .outerjoin(MaintenancePackage, Booking.package_id == MaintenancePackage.id)
+        .outerjoin(User, Booking.user_id == User.id)
+    )
+
 # ============= User Bookings APIs =============
 
 @router.post("/bookings", response_model=BookingResponse, status_code=status.HTTP_201_CREATED, summary="إنشاء حجز جديد")
 def create_booking(
     booking: BookingCreate,
+    idempotency_key: Optional[str] = Header(None, description="مفتاح فريد لكل حجز - إعادة الإرسال بنفس المفتاح ترجع نفس الحجز"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -26,7 +51,12 @@ def create_booking(
     - حجز إنشاء مسبح
     - حجز صيانة مرة واحدة
     - حجز باقة صيانة
+    - مع Idempotency-Key: إعادة المحاولة ترجع الحجز المحفوظ بدون حجز مكرر
     """
+    idempotent = idempotency_store.request(idempotency_key, current_user.id, "bookings.create", booking)
+    replayed = idempotency_store.replay(db, idempotent)
+    if replayed is not None:
+        return replayed
     
     # التحقق من وجود الخدمة/المسبح/الباقة
     if booking.booking_type == BookingType.CONSTRUCTION:
@@ -64,12 +94,25 @@ def create_booking(
     )
     
     db.add(new_booking)
-    db.commit()
-    db.refresh(new_booking)
+    db.flush()
+    response = BookingResponse.model_validate(new_booking)
+    
+    # حفظ الاستجابة مع Idempotency-Key في نفس الـ transaction
+    stored = idempotency_store.record(db, idempotent, status.HTTP_201_CREATED, response)
+    try:
+        db.commit()
+    except IntegrityError:
+        # حجز متزامن بنفس Idempotency-Key سبقنا - نرجع استجابته
+        db.rollback()
+        replayed = idempotency_store.replay(db, idempotent)
+        if replayed is None:
+            raise
+        return replayed
+    idempotency_store.remember(idempotent, stored)
     
     # TODO: إرسال إشعار للأدمن بالحجز الجديد
     
-    return new_booking
+    return response
 
 @router.get("/bookings/my-bookings", response_model=List[BookingResponse], summary="حجوزاتي")
 def get_my_bookings(
@@ -99,28 +142,19 @@ def get_my_booking_detail(
     current_user: User = Depends(get_current_user)
 ):
     """الحصول على تفاصيل حجز معين للمستخدم"""
-    booking = db.query(Booking).filter(
+    row = _booking_detail_query(db).filter(
         Booking.id == booking_id,
         Booking.user_id == current_user.id
     ).first()
     
-    if not booking:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="الحجز غير موجود"
         )
     
-    # إضافة التفاصيل الإضافية
-    response = BookingDetailResponse(**booking.__dict__)
-    
-    if booking.service:
-        response.service_name = booking.service.name_ar
-    if booking.pool_type:
-        response.pool_type_name = booking.pool_type.name_ar
-    if booking.package:
-        response.package_name = booking.package.name_ar
-    
-    return response
+    # اسم المستخدم لا يظهر في تفاصيل حجز المستخدم نفسه
+    return json_response(construct_row(BookingDetailResponse, row, user_name=None))
 
 @router.get("/bookings/my-reminders", response_model=List[BookingResponse], summary="تذكيرات الصيانة")
 def get_my_maintenance_reminders(
@@ -154,7 +188,7 @@ def get_all_bookings_admin(
 ):
     """الحصول على قائمة بجميع الحجوزات (للأدمن فقط)"""
     
-    query = db.query(Booking)
+    query = _booking_detail_query(db)
     
     if booking_type:
         query = query.filter(Booking.booking_type == booking_type)
@@ -162,25 +196,9 @@ def get_all_bookings_admin(
     if status_filter:
         query = query.filter(Booking.status == status_filter)
     
-    bookings = query.order_by(Booking.created_at.desc()).offset(skip).limit(limit).all()
-    
-    # إضافة التفاصيل
-    results = []
-    for booking in bookings:
-        response = BookingDetailResponse(**booking.__dict__)
-        
-        if booking.service:
-            response.service_name = booking.service.name_ar
-        if booking.pool_type:
-            response.pool_type_name = booking.pool_type.name_ar
-        if booking.package:
-            response.package_name = booking.package.name_ar
-        if booking.user:
-            response.user_name = booking.user.full_name
-        
-        results.append(response)
+    rows = query.order_by(Booking.created_at.desc()).offset(skip).limit(limit).all()
     
-    return results
+    return json_response(construct_rows(BookingDetailResponse, rows))
 
 @router.get("/admin/bookings/pending", response_model=List[BookingDetailResponse], summary="الحجوزات المعلقة (أدمن)")
 def get_pending_bookings_admin(
@@ -189,26 +207,11 @@ def get_pending_bookings_admin(
 ):
     """الحصول على الحجوزات المعلقة التي تحتاج موافقة (للأدمن فقط)"""
     
-    bookings = db.query(Booking).filter(
+    rows = _booking_detail_query(db).filter(
         Booking.status == BookingStatus.PENDING
     ).order_by(Booking.created_at.desc()).all()
     
-    results = []
-    for booking in bookings:
-        response = BookingDetailResponse(**booking.__dict__)
-        
-        if booking.service:
-            response.service_name = booking.service.name_ar
-        if booking.pool_type:
-            response.pool_type_name = booking.pool_type.name_ar
-        if booking.package:
-            response.package_name = booking.package.name_ar
-        if booking.user:
-            response.user_name = booking.user.full_name
-        
-        results.append(response)
-    
-    return results
+    return json_response(construct_rows(BookingDetailResponse, rows))
 
 @router.put("/admin/bookings/{booking_id}", response_model=BookingResponse, summary="تحديث حجز (أدمن)")
 def update_booking_admin(
@@ -236,6 +239,7 @@ def update_booking_admin(
         setattr(booking, field, value)
     
     db.commit()
+    reference_cache.invalidate(HOME)
     db.refresh(booking)
     
     # TODO: إرسال إشعار للمستخدم بتحديث حالة الحجز
@@ -259,4 +263,5 @@ def delete_booking_admin(
     
     db.delete(booking)
     db.commit()
+    reference_cache.invalidate(HOME)
     return None
\ No newline at end of file
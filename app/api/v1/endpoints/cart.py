@@ -1,14 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy import delete
 from typing import List
 from app.db.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.models.cart_item import CartItem
-from app.models.product import Product
+from app.models.product import Product, ProductStatus
 from app.schemas.cart import (
-    CartItemCreate, CartItemUpdate, CartItemResponse, CartResponse
+    CartItemCreate, CartItemUpdate, CartItemResponse, CartResponse, CartSummaryResponse,
+    CartBatchUpdate, CartOperationType,
 )
+from app.services.pricing_service import CartLine, price_cart
 
 router = APIRouter()
 
@@ -83,8 +86,41 @@ async def add_to_cart(
         created_at=cart_item.created_at
     )
 
+def _cart_rows(db: Session, user_id: int):
+    """
+    عناصر السلة مع بيانات المنتج في استعلام واحد (JOIN بدلاً من تحميل المنتج لكل عنصر)
+    LEFT JOIN حتى تظهر العناصر التي حُذف منتجها (product_status = None)
+    """
+    return (
+        db.query(
+            CartItem.id,
+            CartItem.product_id,
+            CartItem.quantity,
+            CartItem.created_at,
+            Product.name_ar.label("product_name_ar"),
+            Product.image_url.label("product_image_url"),
+            Product.final_price,
+            Product.free_delivery,
+            Product.status.label("product_status"),
+        )
+        .outerjoin(Product, CartItem.product_id == Product.id)
+        .filter(CartItem.user_id == user_id)
+        .order_by(CartItem.id)
+        .all()
+    )
+
+
+def _cart_line(row) -> CartLine:
+    return CartLine(
+        product_id=row.product_id,
+        quantity=row.quantity,
+        unit_price=float(row.final_price),
+        free_delivery=bool(row.free_delivery),
+    )
+
+
 @router.get("/cart", response_model=CartResponse)
-async def get_cart(
+def get_cart(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -92,56 +128,54 @@ async def get_cart(
     الحصول على محتويات السلة
     Get cart contents
     """
-    cart_items = db.query(CartItem).filter(
-        CartItem.user_id == current_user.id
-    ).all()
-    
-    items = []
-    total_amount = 0.0
-    delivery_fee = 50.0  # رسوم التوصيل الافتراضية
-    
-    for cart_item in cart_items:
-        product = cart_item.product
-        if not product or product.status != "active":
-            # حذف العناصر للمنتجات غير المتاحة
-            db.delete(cart_item)
-            continue
-        
-        item_total = float(product.final_price * cart_item.quantity)
-        total_amount += item_total
-        
-        # إذا كان المنتج توصيل مجاني، لا نضيف رسوم التوصيل
-        if product.free_delivery:
-            delivery_fee = 0.0
-        
-        items.append(CartItemResponse(
-            id=cart_item.id,
-            product_id=cart_item.product_id,
-            quantity=cart_item.quantity,
-            product_name_ar=product.name_ar,
-            product_image_url=product.image_url,
-            unit_price=float(product.final_price),
-            total_price=item_total,
-            created_at=cart_item.created_at
-        ))
-    
-    db.commit()
-    
-    # حساب إجمالي الكمية
-    total_items = sum(item.quantity for item in items)
+    rows = _cart_rows(db, current_user.id)
+    active_rows = [row for row in rows if row.product_status == ProductStatus.ACTIVE]
+    stale_item_ids = [row.id for row in rows if row.product_status != ProductStatus.ACTIVE]
     
-    # إذا كان الإجمالي 0، لا رسوم توصيل
-    if total_amount == 0:
-        delivery_fee = 0.0
+    pricing = price_cart(_cart_line(row) for row in active_rows)
+    items = [
+        CartItemResponse(
+            id=row.id,
+            product_id=row.product_id,
+            quantity=row.quantity,
+            product_name_ar=row.product_name_ar,
+            product_image_url=row.product_image_url,
+            unit_price=priced.line.unit_price,
+            total_price=priced.total_price,
+            created_at=row.created_at
+        )
+        for row, priced in zip(active_rows, pricing.lines)
+    ]
     
-    grand_total = total_amount + delivery_fee
+    if stale_item_ids:
+        # حذف العناصر للمنتجات غير المتاحة في DELETE واحد (نادراً - الحالة العادية قراءة فقط بدون commit)
+        db.execute(delete(CartItem).where(CartItem.id.in_(stale_item_ids)))
+        db.commit()
     
     return CartResponse(
         items=items,
-        total_items=total_items,
-        total_amount=total_amount,
-        delivery_fee=delivery_fee,
-        grand_total=grand_total
+        total_items=pricing.total_items,
+        total_amount=pricing.total_amount,
+        delivery_fee=pricing.delivery_fee,
+        grand_total=pricing.grand_total
+    )
+
+@router.get("/cart/summary", response_model=CartSummaryResponse)
+def get_cart_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    ملخص السلة (الإجماليات فقط بدون العناصر) - لعرض شارة السلة وصفحة الدفع
+    Cart totals only
+    """
+    rows = _cart_rows(db, current_user.id)
+    pricing = price_cart(_cart_line(row) for row in rows if row.product_status == ProductStatus.ACTIVE)
+    return CartSummaryResponse(
+        total_items=pricing.total_items,
+        total_amount=pricing.total_amount,
+        delivery_fee=pricing.delivery_fee,
+        grand_total=pricing.grand_total
     )
 
 @router.put("/cart/items/{item_id}", response_model=CartItemResponse)
@@ -194,6 +228,96 @@ async def update_cart_item(
         created_at=cart_item.created_at
     )
 
+@router.patch("/cart", response_model=CartResponse)
+def batch_update_cart(
+    batch: CartBatchUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    تعديل عدة عناصر في السلة في طلب واحد (add / update / remove)
+    - العمليات تُطبق بالترتيب على نفس المنتج
+    - التحقق من المخزون لكل المنتجات في استعلام واحد
+    - كل العمليات في transaction واحدة: إما تنجح كلها أو لا يتغير شيء
+    Batch cart mutations
+    """
+    product_ids = {operation.product_id for operation in batch.operations}
+    
+    # عناصر السلة الحالية للمنتجات المطلوبة (استعلام واحد)
+    existing_items = {
+        item.product_id: item
+        for item in db.query(CartItem).filter(
+            CartItem.user_id == current_user.id,
+            CartItem.product_id.in_(product_ids)
+        )
+    }
+    
+    # حساب الكمية النهائية لكل منتج بعد تطبيق العمليات بالترتيب
+    quantities = {product_id: item.quantity for product_id, item in existing_items.items()}
+    for operation in batch.operations:
+        current = quantities.get(operation.product_id, 0)
+        if operation.op != CartOperationType.ADD and current == 0:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"المنتج {operation.product_id} غير موجود في السلة"
+            )
+        if operation.op == CartOperationType.ADD:
+            quantities[operation.product_id] = current + operation.quantity
+        elif operation.op == CartOperationType.UPDATE:
+            quantities[operation.product_id] = operation.quantity
+        else:
+            quantities[operation.product_id] = 0
+    
+    # التحقق من المنتجات والمخزون في استعلام واحد
+    products = {
+        row.id: row
+        for row in db.query(Product.id, Product.name_ar, Product.status, Product.stock_quantity)
+        .filter(Product.id.in_([product_id for product_id, quantity in quantities.items() if quantity > 0]))
+    }
+    for product_id, quantity in quantities.items():
+        if quantity == 0:
+            continue
+        product = products.get(product_id)
+        if not product:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"المنتج {product_id} غير موجود"
+            )
+        if product.status != ProductStatus.ACTIVE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"المنتج {product.name_ar} غير متاح حالياً"
+            )
+        if quantity > product.stock_quantity:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"الكمية المتاحة للمنتج {product.name_ar}: {product.stock_quantity} فقط"
+            )
+    
+    # تطبيق التغييرات
+    removed_product_ids = [
+        product_id for product_id, quantity in quantities.items()
+        if quantity == 0 and product_id in existing_items
+    ]
+    if removed_product_ids:
+        db.execute(
+            delete(CartItem).where(
+                CartItem.user_id == current_user.id,
+                CartItem.product_id.in_(removed_product_ids)
+            )
+        )
+    for product_id, quantity in quantities.items():
+        if quantity == 0:
+            continue
+        item = existing_items.get(product_id)
+        if item is None:
+            db.add(CartItem(user_id=current_user.id, product_id=product_id, quantity=quantity))
+        elif item.quantity != quantity:
+            item.quantity = quantity
+    db.commit()
+    
+    return get_cart(db=db, current_user=current_user)
+
 @router.delete("/cart/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_from_cart(
     item_id: int,
@@ -220,7 +344,7 @@ async def remove_from_cart(
     return None
 
 @router.delete("/cart", status_code=status.HTTP_204_NO_CONTENT)
-async def clear_cart(
+def clear_cart(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -228,13 +352,8 @@ async def clear_cart(
     مسح السلة بالكامل
     Clear entire cart
     """
-    cart_items = db.query(CartItem).filter(
-        CartItem.user_id == current_user.id
-    ).all()
-    
-    for item in cart_items:
-        db.delete(item)
-    
+    # DELETE واحد بدلاً من تحميل كل العناصر وحذفها واحداً تلو الآخر
+    db.execute(delete(CartItem).where(CartItem.user_id == current_user.id))
     db.commit()
     return None
 
@@ -8,8 +8,9 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import func, nullslast
 from sqlalchemy.orm import Session
 
-from app.api.v1.endpoints.home import _fetch_featured_service_offers, _fetch_featured_products
+from app.services.home_service import fetch_featured_service_offers, fetch_featured_products
 from app.core.config import settings
+from app.core.single_flight import single_flight
 from app.core.dependencies import (
     get_current_company_user,
     get_current_pool_owner,
@@ -234,7 +235,7 @@ def _fetch_special_offers(db: Session, limit: int = 6) -> List[OfferCard]:
         )
 
     if not offer_cards:
-        fetched = _fetch_featured_service_offers(limit=limit, db=db)
+        fetched = fetch_featured_service_offers(limit=limit, db=db)
         for offer in fetched:
             offer_cards.append(
                 OfferCard(
@@ -599,7 +600,7 @@ def get_company_dashboard(
     nav = _build_nav_data(current_user, db)
     footer = _build_footer_navigation()
     shared = _build_shared_sections(db)
-    account = _build_company_account_section(db)
+    account = single_flight.do("company_account_section", lambda: _build_company_account_section(db))
 
     return CompanyDashboardResponse(
         nav=nav,
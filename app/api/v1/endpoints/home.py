@@ -1,145 +1,34 @@
-from datetime import datetime, timedelta
 from typing import List, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import desc, func
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
-from app.models.service_offer import OfferStatus, ServiceOffer
 from app.schemas.service_offer import ServiceOfferDetailResponse
 from app.models.comment import Comment
 from app.models.user import User
-from app.models.enums import UserRole, BookingType, BookingStatus
-from app.models.booking import Booking
-from app.models.product import Product, ProductStatus
+from app.models.enums import UserRole
 from app.schemas.product import ProductDetailResponse
 from app.schemas.comment import CommentCreate, CommentResponse, CommentsListResponse
 from app.schemas.account import ProjectResponse
 from app.core.dependencies import get_current_active_user, get_current_user_optional
+from app.core.cache import reference_cache, HOME
+from app.core.single_flight import single_flight
+from app.services.home_service import (
+    fetch_comments,
+    fetch_featured_for_role,
+    fetch_home_projects,
+    fetch_home_stats,
+    home_role_key,
+    home_section,
+    relative_time,
+)
 
 
 def _summary_with_role(base: str, role_label: Optional[str]) -> str:
     return f"{base} - {role_label}" if role_label else base
 
 
-def _fetch_featured_service_offers(limit: int, db: Session) -> List[ServiceOfferDetailResponse]:
-    """
-    جلب عروض الخدمات (للإنشاء والصيانة) - لصاحب الحمام وممثل الشركة
-    Fetch service offers (construction & maintenance) - for Pool Owner and Company
-    """
-    today = datetime.now().date()
-
-    offers = (
-        db.query(ServiceOffer)
-        .filter(
-            ServiceOffer.is_featured == True,
-            ServiceOffer.status == OfferStatus.ACTIVE,
-            (ServiceOffer.end_date == None) | (ServiceOffer.end_date >= today),
-        )
-        .order_by(
-            desc(ServiceOffer.sort_order),
-            desc(ServiceOffer.created_at),
-        )
-        .limit(limit)
-        .all()
-    )
-
-    results: List[ServiceOfferDetailResponse] = []
-    for offer in offers:
-        offer_dict = ServiceOfferDetailResponse(**offer.__dict__)
-        if offer.service:
-            offer_dict.service_name = offer.service.name_ar
-        results.append(offer_dict)
-
-    return results
-
-
-def _fetch_featured_products(limit: int, db: Session) -> List[ProductDetailResponse]:
-    """
-    جلب المنتجات المميزة من المتجر - للفني
-    Fetch featured products from store - for Technician
-    """
-    products = (
-        db.query(Product)
-        .filter(
-            Product.is_featured == True,
-            Product.status == ProductStatus.ACTIVE,
-        )
-        .order_by(
-            desc(Product.sort_order) if hasattr(Product, 'sort_order') else desc(Product.created_at),
-            desc(Product.created_at),
-        )
-        .limit(limit)
-        .all()
-    )
-
-    results: List[ProductDetailResponse] = []
-    for product in products:
-        product_dict = ProductDetailResponse(**product.__dict__)
-        if product.category:
-            product_dict.category_name = product.category.name_ar
-        results.append(product_dict)
-
-    return results
-
-
-def _fetch_home_stats(db: Session):
-    from app.models.service import Service, ServiceStatus
-
-    today = datetime.now().date()
-
-    active_offers_count = (
-        db.query(ServiceOffer)
-        .filter(
-            ServiceOffer.status == OfferStatus.ACTIVE,
-            (ServiceOffer.end_date == None) | (ServiceOffer.end_date >= today),
-        )
-        .count()
-    )
-
-    active_services_count = (
-        db.query(Service)
-        .filter(Service.status == ServiceStatus.ACTIVE)
-        .count()
-    )
-
-    return {
-        "active_offers": active_offers_count,
-        "active_services": active_services_count,
-        "message": "مرحباً بك في Plupool! 🏊",
-    }
-
-
-def _relative_time(created_at: datetime) -> str:
-    """
-    حساب الوقت النسبي (مثل "منذ ساعتين")
-    Calculate relative time (e.g., "منذ ساعتين")
-    """
-    now = datetime.now()
-    if created_at.tzinfo:
-        now = datetime.now(created_at.tzinfo)
-    
-    diff = now - created_at
-    
-    if diff.days > 365:
-        years = diff.days // 365
-        return f"منذ {years} {'سنة' if years == 1 else 'سنوات'}"
-    elif diff.days > 30:
-        months = diff.days // 30
-        return f"منذ {months} {'شهر' if months == 1 else 'أشهر'}"
-    elif diff.days > 0:
-        return f"منذ {diff.days} {'يوم' if diff.days == 1 else 'أيام'}"
-    elif diff.seconds > 3600:
-        hours = diff.seconds // 3600
-        return f"منذ {hours} {'ساعة' if hours == 1 else 'ساعات'}"
-    elif diff.seconds > 60:
-        minutes = diff.seconds // 60
-        return f"منذ {minutes} {'دقيقة' if minutes == 1 else 'دقائق'}"
-    else:
-        return "الآن"
-
-
 def create_home_router(role_label: Optional[str] = None) -> APIRouter:
     home_router = APIRouter()
 
@@ -179,12 +68,11 @@ def create_home_router(role_label: Optional[str] = None) -> APIRouter:
         - المنتجات (Products) متاحة للجميع في المتجر
         - عروض الخدمات (Service Offers) خاصة بصاحب الحمام وممثل الشركة
         """
-        # إذا كان المستخدم فني، نعرض المنتجات
-        if current_user and current_user.role == UserRole.TECHNICIAN:
-            return _fetch_featured_products(limit, db)
-        else:
-            # لصاحب الحمام وممثل الشركة والزوار: نعرض عروض الخدمات
-            return _fetch_featured_service_offers(limit, db)
+        role_key = home_role_key(current_user)
+        return home_section(
+            ("featured_offers", role_key, limit),
+            lambda: fetch_featured_for_role(role_key, limit, db),
+        )
 
     @home_router.get(
         "/home-stats",
@@ -197,7 +85,10 @@ def create_home_router(role_label: Optional[str] = None) -> APIRouter:
         - عدد الخدمات المتاحة
         - إلخ
         """
-        return _fetch_home_stats(db)
+        return home_section(
+            ("home_stats",),
+            lambda: single_flight.do("home_stats", lambda: fetch_home_stats(db)),
+        )
 
     # ============= Projects Section (مشاريعنا) =============
     # هذه المشاريع تظهر لجميع الأدوار في الصفحة الرئيسية
@@ -222,69 +113,7 @@ def create_home_router(role_label: Optional[str] = None) -> APIRouter:
         - مشاريع الإنشاء المكتملة أو قيد التنفيذ
         - تعرض كأمثلة على أعمال الشركة
         """
-        # جلب الحجوزات من نوع إنشاء مسبح (مشاريع)
-        # نعرض المشاريع المكتملة أو قيد التنفيذ فقط
-        bookings = (
-            db.query(Booking)
-            .filter(
-                Booking.booking_type == BookingType.CONSTRUCTION,
-                Booking.status.in_([BookingStatus.IN_PROGRESS, BookingStatus.COMPLETED])
-            )
-            .order_by(Booking.created_at.desc())
-            .limit(limit)
-            .all()
-        )
-        
-        projects = []
-        for booking in bookings:
-            # استخراج اسم المشروع
-            project_name = None
-            if booking.pool_type:
-                project_name = booking.pool_type.name_ar
-            elif booking.admin_notes:
-                # إذا كان فيه admin_notes، نستخدمه كاسم المشروع
-                project_name = booking.admin_notes.split('\n')[0] if '\n' in booking.admin_notes else booking.admin_notes
-            else:
-                project_name = "مشروع إنشاء مسبح"
-            
-            # استخراج الوصف من admin_notes أو استخدام وصف افتراضي
-            description = None
-            if booking.admin_notes and '\n' in booking.admin_notes:
-                description = '\n'.join(booking.admin_notes.split('\n')[1:])
-            elif booking.admin_notes:
-                description = booking.admin_notes
-            else:
-                description = "تصميم فاخر مع ضمان 10 سنوات وصيانة مجانية لمدة 3 شهور"
-            
-            # صورة المشروع
-            project_image = booking.project_image if booking.project_image else None
-            
-            # حساب نسبة الإنجاز
-            completion_percentage = 100.0 if booking.status == BookingStatus.COMPLETED else 50.0
-            
-            # الموقع
-            location = booking.user.address if booking.user else None
-            
-            # تاريخ البدء والانتهاء
-            start_date = str(booking.booking_date) if booking.booking_date else None
-            end_date = str(booking.next_maintenance_date) if booking.next_maintenance_date else None
-            
-            projects.append(
-                ProjectResponse(
-                    booking_id=booking.id,
-                    project_name=project_name,
-                    location=location,
-                    pools_count=1,  # افتراضي - يمكن تحسينه لاحقاً
-                    completion_percentage=completion_percentage,
-                    status=booking.status.value,
-                    start_date=start_date,
-                    end_date=end_date,
-                    next_visit=None,  # للصفحة الرئيسية مش محتاجين next_visit
-                    image_url=project_image,  # صورة المشروع
-                )
-            )
-        
-        return projects
+        return home_section(("projects", limit), lambda: fetch_home_projects(limit, db))
 
     # ============= Comments/Reviews Section =============
     # هذه التعليقات خاصة بصاحب الحمام وممثل الشركة فقط (ليس للفني)
@@ -353,6 +182,7 @@ def create_home_router(role_label: Optional[str] = None) -> APIRouter:
         
         db.add(new_comment)
         db.commit()
+        reference_cache.invalidate(HOME)
         db.refresh(new_comment)
         
         # إرجاع التعليق مع معلومات المستخدم
@@ -366,7 +196,7 @@ def create_home_router(role_label: Optional[str] = None) -> APIRouter:
             service_id=new_comment.service_id,
             booking_id=new_comment.booking_id,
             created_at=new_comment.created_at,
-            relative_time=_relative_time(new_comment.created_at),
+            relative_time=relative_time(new_comment.created_at),
         )
     
     @home_router.get(
@@ -405,70 +235,9 @@ def create_home_router(role_label: Optional[str] = None) -> APIRouter:
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="هذه الميزة متاحة لصاحب الحمام وممثل الشركة فقط. الفني غير مسموح له بعرض التعليقات"
             )
-        query = db.query(Comment).join(User, Comment.user_id == User.id)
-        
-        # فلترة حسب service_id
-        if service_id:
-            query = query.filter(Comment.service_id == service_id)
-        
-        # فلترة حسب booking_id
-        if booking_id:
-            query = query.filter(Comment.booking_id == booking_id)
-        
-        # إذا لم يتم تحديد service_id أو booking_id، عرض التعليقات العامة فقط
-        if not service_id and not booking_id:
-            query = query.filter(
-                Comment.service_id.is_(None),
-                Comment.booking_id.is_(None)
-            )
-        
-        # حساب المتوسط
-        avg_rating = query.with_entities(func.avg(Comment.rating)).scalar()
-        average_rating = round(float(avg_rating), 1) if avg_rating else None
-        
-        # الحصول على العدد الإجمالي
-        total = query.count()
-        
-        # الترتيب حسب الخيار المحدد
-        if sort_by == "newest" or sort_by == "all":
-            # الأحدث أولاً (افتراضي)
-            comments = query.order_by(desc(Comment.created_at)).offset(skip).limit(limit).all()
-        elif sort_by == "oldest":
-            # الأقدم أولاً
-            comments = query.order_by(Comment.created_at).offset(skip).limit(limit).all()
-        elif sort_by == "highest_rating":
-            # الأعلى تقييماً أولاً
-            comments = query.order_by(desc(Comment.rating), desc(Comment.created_at)).offset(skip).limit(limit).all()
-        elif sort_by == "lowest_rating":
-            # الأقل تقييماً أولاً
-            comments = query.order_by(Comment.rating, desc(Comment.created_at)).offset(skip).limit(limit).all()
-        else:
-            # افتراضي: الأحدث أولاً
-            comments = query.order_by(desc(Comment.created_at)).offset(skip).limit(limit).all()
-        
-        # تحويل إلى response
-        comments_list = []
-        for comment in comments:
-            comments_list.append(
-                CommentResponse(
-                    id=comment.id,
-                    user_id=comment.user_id,
-                    user_name=comment.user.full_name if comment.user else "مستخدم Plupool",
-                    user_avatar=comment.user.profile_image if comment.user else None,
-                    content=comment.content,
-                    rating=comment.rating,
-                    service_id=comment.service_id,
-                    booking_id=comment.booking_id,
-                    created_at=comment.created_at,
-                    relative_time=_relative_time(comment.created_at),
-                )
-            )
-        
-        return CommentsListResponse(
-            comments=comments_list,
-            total=total,
-            average_rating=average_rating,
-            sort_by=sort_by,
+        return home_section(
+            ("comments", service_id, booking_id, sort_by, skip, limit),
+            lambda: fetch_comments(service_id, booking_id, sort_by, skip, limit, db),
         )
 
     return home_router
@@ -480,7 +249,4 @@ router = create_home_router()
 __all__ = [
     "router",
     "create_home_router",
-    "_fetch_featured_service_offers",
-    "_fetch_featured_products",
-    "_fetch_home_stats",
 ]
\ No newline at end of file
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc, and_
+from sqlalchemy import desc, asc, and_, or_
 from typing import List, Optional
-from datetime import datetime
+from datetime import date
 from app.db.database import get_db
 from app.models.service_offer import ServiceOffer, OfferStatus, DiscountType
 from app.models.service import Service
 from app.schemas.service_offer import ServiceOfferCreate, ServiceOfferUpdate, ServiceOfferResponse, ServiceOfferDetailResponse
 from app.core.dependencies import get_current_user, get_current_admin
+from app.core.http_cache import etag_response
+from app.core.cache import reference_cache, HOME, OFFERS
+from app.services.catalog_service import offer_detail_query, offer_detail_from_row, offer_details_from_rows
+from app.services.home_service import fetch_featured_service_offers
 from app.models.user import User
 
 router = APIRouter()
@@ -20,6 +24,7 @@ router = APIRouter()
 
 @router.get("/", response_model=List[ServiceOfferDetailResponse], summary="قائمة عروض الخدمات (الإنشاء والصيانة)")
 def get_all_offers(
+    request: Request,
     service_id: Optional[int] = Query(None, description="فلترة حسب الخدمة"),
     status: Optional[OfferStatus] = Query(None, description="فلترة حسب الحالة"),
     is_featured: Optional[bool] = Query(None, description="العروض المميزة فقط"),
@@ -30,50 +35,45 @@ def get_all_offers(
     """
     الحصول على قائمة بجميع عروض الخدمات (الإنشاء والصيانة) مع الفلترة
     
+    - بدون status: كل العروض التي لم تنتهِ (النشطة وغير النشطة)
+    - مع status: العروض بهذه الحالة فقط (expired للعروض المنتهية)
+    
     ملاحظة: هذه العروض خاصة بخدمات الإنشاء والصيانة فقط.
     للعروض على المنتجات (معدات الصيانة)، استخدم /products
     """
-    today = datetime.now().date()
-    
-    query = db.query(ServiceOffer)
+    query = offer_detail_query(db)
     
     # فلترة حسب الخدمة
     if service_id:
         query = query.filter(ServiceOffer.service_id == service_id)
     
-    # فلترة حسب الحالة
+    # فلترة حسب الحالة (افتراضياً: استبعاد العروض المنتهية فقط)
+    # العروض غير النشطة لا يحولها الـ job إلى EXPIRED فنستبعد المنتهي منها بالتاريخ
     if status:
         query = query.filter(ServiceOffer.status == status)
+    else:
+        query = query.filter(
+            ServiceOffer.status != OfferStatus.EXPIRED,
+            or_(ServiceOffer.end_date.is_(None), ServiceOffer.end_date >= date.today()),
+        )
     
     # فلترة العروض المميزة
     if is_featured is not None:
         query = query.filter(ServiceOffer.is_featured == is_featured)
     
-    # استبعاد العروض المنتهية
-    query = query.filter(
-        (ServiceOffer.end_date == None) | (ServiceOffer.end_date >= today)
-    )
-    
     # الترتيب
     query = query.order_by(
         desc(ServiceOffer.sort_order),
         desc(ServiceOffer.created_at)
     )
     
-    offers = query.offset(skip).limit(limit).all()
-    
-    # إضافة تفاصيل الخدمة
-    results = []
-    for offer in offers:
-        offer_dict = ServiceOfferDetailResponse(**offer.__dict__)
-        if offer.service:
-            offer_dict.service_name = offer.service.name_ar
-        results.append(offer_dict)
+    rows = query.offset(skip).limit(limit).all()
     
-    return results
+    return etag_response(request, offer_details_from_rows(rows))
 
 @router.get("/featured", response_model=List[ServiceOfferDetailResponse], summary="عروض الخدمات المميزة (للصفحة الرئيسية)")
 def get_featured_service_offers(
+    request: Request,
     limit: int = Query(6, description="عدد العروض"),
     db: Session = Depends(get_db)
 ):
@@ -91,22 +91,16 @@ def get_featured_service_offers(
     
     ملاحظة: هذه مختلفة عن منتجات المتجر (معدات الصيانة)
     """
-    from app.api.v1.endpoints.home import _fetch_featured_service_offers
-    return _fetch_featured_service_offers(limit, db)
+    return etag_response(request, fetch_featured_service_offers(limit, db))
 
 @router.get("/{offer_id}", response_model=ServiceOfferDetailResponse, summary="تفاصيل عرض خدمة")
-def get_offer(offer_id: int, db: Session = Depends(get_db)):
+def get_offer(offer_id: int, request: Request, db: Session = Depends(get_db)):
     """الحصول على تفاصيل عرض معين"""
-    offer = db.query(ServiceOffer).filter(ServiceOffer.id == offer_id).first()
-    if not offer:
+    row = offer_detail_query(db).filter(ServiceOffer.id == offer_id).first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="العرض غير موجود")
     
-    # إضافة تفاصيل الخدمة
-    offer_dict = ServiceOfferDetailResponse(**offer.__dict__)
-    if offer.service:
-        offer_dict.service_name = offer.service.name_ar
-    
-    return offer_dict
+    return etag_response(request, offer_detail_from_row(row))
 
 @router.post("/", response_model=ServiceOfferResponse, status_code=status.HTTP_201_CREATED, summary="إضافة عرض خدمة (Admin)")
 def create_offer(
@@ -125,9 +119,11 @@ def create_offer(
     
     # حساب السعر النهائي
     new_offer.final_price = new_offer.calculate_final_price()
+    new_offer.expire_if_ended()
     
     db.add(new_offer)
     db.commit()
+    reference_cache.invalidate(OFFERS, HOME)
     db.refresh(new_offer)
     return new_offer
 
@@ -149,8 +145,13 @@ def update_offer(
     
     # إعادة حساب السعر النهائي
     db_offer.final_price = db_offer.calculate_final_price()
+    # إعادة حساب الحالة حسب تاريخ الانتهاء (إلا إذا حدد الأدمن الحالة بنفسه)
+    if "end_date" in update_data and "status" not in update_data:
+        db_offer.reactivate_if_extended()
+    db_offer.expire_if_ended()
     
     db.commit()
+    reference_cache.invalidate(OFFERS, HOME)
     db.refresh(db_offer)
     return db_offer
 
@@ -167,4 +168,5 @@ def delete_offer(
     
     db.delete(db_offer)
     db.commit()
+    reference_cache.invalidate(OFFERS, HOME)
     return None
\ No newline at end of file
@@ -1,38 +1,86 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List
-from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import delete, desc, insert
+from sqlalchemy.exc import IntegrityError, OperationalError
+from typing import List, Optional
 from app.db.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.models.cart_item import CartItem
 from app.models.order import Order, OrderStatus, PaymentMethod
 from app.models.order_item import OrderItem
+from app.models.order_summary import OrderSummary
+from app.models.order_event import OrderEvent, OrderEventType
 from app.models.product import Product
-from app.schemas.order import OrderCreate, OrderResponse, OrderSummaryResponse, OrderItemResponse
+from app.schemas.order import OrderCreate, OrderResponse, OrderSummaryResponse, OrderItemResponse, OrderEventResponse
+from app.core.serialization import response_columns, construct_rows, json_response
+from app.core.cache import reference_cache, PRODUCTS, HOME
+from app.services.inventory_service import reserve_stock
+from app.services.pricing_service import CartLine, price_cart
+from app.services.order_number_service import generate_order_number
+from app.services.idempotency_service import IdempotentRequest, idempotency_store
+from app.services.order_summary_service import write_order_summary
+from app.services.order_state_machine import record_order_event
 
 router = APIRouter()
 
-def generate_order_number() -> str:
-    """إنشاء رقم طلب فريد"""
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    import random
-    random_suffix = random.randint(1000, 9999)
-    return f"#{timestamp}{random_suffix}"
+# عدد المحاولات عند تعارض الـ transactions (deadlock / serialization failure)
+CHECKOUT_MAX_ATTEMPTS = 3
+
+# أعمدة ملخص الطلب التي تحتاجها شاشة "مشترياتي"
+ORDER_SUMMARY_COLUMNS = response_columns(OrderSummaryResponse, OrderSummary)
+# أعمدة سجل الأحداث + رقم الطلب من جدول الطلبات
+ORDER_EVENT_COLUMNS = response_columns(OrderEventResponse, OrderEvent, Order)
+
+
+def _order_events_query(db: Session):
+    return db.query(*ORDER_EVENT_COLUMNS).join(Order, OrderEvent.order_id == Order.id)
 
 @router.post("/orders", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
-async def create_order(
+def create_order(
     order_data: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, description="مفتاح فريد لكل طلب - إعادة الإرسال بنفس المفتاح ترجع نفس الطلب"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     إنشاء طلب جديد من السلة
     Create new order from cart
+    - مع Idempotency-Key: إعادة المحاولة ترجع الاستجابة المحفوظة بدون إنشاء طلب مكرر
     """
-    # الحصول على عناصر السلة
-    cart_items = db.query(CartItem).filter(
+    idempotent = idempotency_store.request(idempotency_key, current_user.id, "orders.create", order_data)
+    replayed = idempotency_store.replay(db, idempotent)
+    if replayed is not None:
+        return replayed
+    
+    for attempt in range(1, CHECKOUT_MAX_ATTEMPTS + 1):
+        try:
+            return _place_order(order_data, db, current_user, idempotent)
+        except IntegrityError:
+            # طلب متزامن بنفس Idempotency-Key سبقنا - نرجع استجابته
+            db.rollback()
+            replayed = idempotency_store.replay(db, idempotent)
+            if replayed is None:
+                raise
+            return replayed
+        except OperationalError:
+            # تعارض مع طلب متزامن - نلغي كل شيء ونعيد المحاولة من البداية
+            db.rollback()
+            if attempt == CHECKOUT_MAX_ATTEMPTS:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="تعذر إتمام الطلب حالياً، حاول مرة أخرى"
+                )
+
+
+def _place_order(
+    order_data: OrderCreate,
+    db: Session,
+    current_user: User,
+    idempotent: Optional[IdempotentRequest] = None,
+) -> OrderResponse:
+    # الحصول على عناصر السلة مع منتجاتها في استعلام واحد (بدون تحميل كل منتج على حدة)
+    cart_items = db.query(CartItem).options(joinedload(CartItem.product)).filter(
         CartItem.user_id == current_user.id
     ).all()
     
@@ -42,9 +90,6 @@ async def create_order(
             detail="السلة فارغة"
         )
     
-    # حساب الإجماليات
-    total_amount = 0.0
-    delivery_fee = 50.0  # رسوم التوصيل الافتراضية
     order_items_data = []
     
     for cart_item in cart_items:
@@ -61,65 +106,111 @@ async def create_order(
                 detail=f"الكمية المتاحة للمنتج {product.name_ar}: {product.stock_quantity} فقط"
             )
         
-        item_total = float(product.final_price * cart_item.quantity)
-        total_amount += item_total
-        
-        # إذا كان أي منتج توصيل مجاني، لا رسوم توصيل
-        if product.free_delivery:
-            delivery_fee = 0.0
-        
         order_items_data.append({
             "product": product,
             "cart_item": cart_item,
             "unit_price": float(product.final_price),
             "quantity": cart_item.quantity,
-            "total_price": item_total
         })
     
-    grand_total = total_amount + delivery_fee
+    # حساب الإجماليات (نفس محرك التسعير المستخدم في السلة)
+    pricing = price_cart(
+        CartLine(
+            product_id=item_data["product"].id,
+            quantity=item_data["quantity"],
+            unit_price=item_data["unit_price"],
+            free_delivery=bool(item_data["product"].free_delivery),
+        )
+        for item_data in order_items_data
+    )
+    for item_data, priced in zip(order_items_data, pricing.lines):
+        item_data["total_price"] = priced.total_price
+    
+    # حجز المخزون في UPDATE شرطي واحد (بدلاً من الفحص ثم الخصم في Python)
+    quantities = {}
+    for item_data in order_items_data:
+        product_id = item_data["product"].id
+        quantities[product_id] = quantities.get(product_id, 0) + item_data["quantity"]
+    unavailable = reserve_stock(db, quantities)
+    if unavailable:
+        names = "، ".join(
+            item_data["product"].name_ar
+            for item_data in order_items_data
+            if item_data["product"].id in unavailable
+        )
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"الكمية المطلوبة غير متوفرة حالياً للمنتج: {names}"
+        )
     
     # إنشاء الطلب
     order = Order(
         user_id=current_user.id,
-        order_number=generate_order_number(),
-        total_amount=total_amount,
-        delivery_fee=delivery_fee,
-        grand_total=grand_total,
+        order_number=generate_order_number(db),
+        total_amount=pricing.total_amount,
+        delivery_fee=pricing.delivery_fee,
+        grand_total=pricing.grand_total,
         delivery_address=order_data.delivery_address,
         delivery_phone=order_data.delivery_phone,
         payment_method=order_data.payment_method,
         payment_status="pending",
-        status=OrderStatus.CONFIRMED
+        status=OrderStatus.CONFIRMED,
+        delivered_at=None,
     )
     db.add(order)
     db.flush()  # للحصول على order.id
     
-    # إنشاء عناصر الطلب
-    for item_data in order_items_data:
-        order_item = OrderItem(
-            order_id=order.id,
-            product_id=item_data["product"].id,
-            product_name_ar=item_data["product"].name_ar,
-            product_image_url=item_data["product"].image_url,
-            unit_price=item_data["unit_price"],
-            quantity=item_data["quantity"],
-            total_price=item_data["total_price"]
-        )
-        db.add(order_item)
-        
-        # تحديث المخزون
-        item_data["product"].stock_quantity -= item_data["quantity"]
+    # إنشاء عناصر الطلب في INSERT مجمع واحد مع RETURNING للمعرفات (بدون إعادة الاستعلام)
+    items_values = [
+        {
+            "order_id": order.id,
+            "product_id": item_data["product"].id,
+            "product_name_ar": item_data["product"].name_ar,
+            "product_image_url": item_data["product"].image_url,
+            "unit_price": item_data["unit_price"],
+            "quantity": item_data["quantity"],
+            "total_price": item_data["total_price"],
+        }
+        for item_data in order_items_data
+    ]
+    order_items_table = OrderItem.__table__
+    item_ids = db.execute(
+        insert(order_items_table).returning(order_items_table.c.id, sort_by_parameter_order=True),
+        items_values,
+    ).scalars().all()
     
-    # حذف عناصر السلة
-    for cart_item in cart_items:
-        db.delete(cart_item)
+    # ملخص الطلب لشاشة "مشترياتي" (نفس الـ transaction)
+    write_order_summary(db, order, items_values)
+    record_order_event(
+        db,
+        order_id=order.id,
+        user_id=order.user_id,
+        event_type=OrderEventType.CREATED,
+        to_status=order.status,
+        actor_id=current_user.id,
+    )
     
-    db.commit()
-    db.refresh(order)
+    # بناء الاستجابة من البيانات في الذاكرة قبل الـ commit (created_at رجع مع INSERT الطلب)
+    response = _build_order_response(
+        order,
+        [OrderItemResponse(id=item_id, **values) for item_id, values in zip(item_ids, items_values)],
+    )
     
-    # جلب عناصر الطلب
-    order_items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
+    # حذف عناصر السلة التي تم طلبها فقط (DELETE واحد)
+    db.execute(delete(CartItem).where(CartItem.id.in_([cart_item.id for cart_item in cart_items])))
+    
+    # حفظ الاستجابة مع Idempotency-Key في نفس الـ transaction
+    stored = idempotency_store.record(db, idempotent, status.HTTP_201_CREATED, response)
     
+    db.commit()
+    idempotency_store.remember(idempotent, stored)
+    # المخزون تغير - استجابات المنتجات المحفوظة (للزوار والصفحة الرئيسية) لم تعد صحيحة
+    reference_cache.invalidate(PRODUCTS, HOME)
+    return response
+
+
+def _build_order_response(order: Order, order_items: List[OrderItemResponse]) -> OrderResponse:
     return OrderResponse(
         id=order.id,
         order_number=order.order_number,
@@ -133,21 +224,11 @@ async def create_order(
         status=order.status,
         created_at=order.created_at,
         delivered_at=order.delivered_at,
-        order_items=[
-            OrderItemResponse(
-                id=item.id,
-                product_id=item.product_id,
-                product_name_ar=item.product_name_ar,
-                product_image_url=item.product_image_url,
-                unit_price=item.unit_price,
-                quantity=item.quantity,
-                total_price=item.total_price
-            ) for item in order_items
-        ]
+        order_items=order_items,
     )
 
 @router.get("/orders", response_model=List[OrderSummaryResponse])
-async def get_orders(
+def get_orders(
     skip: int = 0,
     limit: int = 50,
     db: Session = Depends(get_db),
@@ -156,26 +237,60 @@ async def get_orders(
     """
     الحصول على تاريخ الطلبات (مشترياتي)
     Get order history (My Purchases)
+    - من جدول order_summaries فقط: مسح واحد على فهرس (user_id, created_at)
     """
-    orders = db.query(Order).filter(
+    rows = db.query(*ORDER_SUMMARY_COLUMNS).filter(
+        OrderSummary.user_id == current_user.id
+    ).order_by(desc(OrderSummary.created_at)).offset(skip).limit(limit).all()
+    
+    return json_response(construct_rows(OrderSummaryResponse, rows))
+
+@router.get("/orders/changes", response_model=List[OrderEventResponse])
+def get_order_changes(
+    after_id: int = Query(0, ge=0, description="معرف آخر حدث مستلم (0 لأول مزامنة)"),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    الطلبات التي تغيرت منذ آخر مزامنة (للتحديث الدوري بدلاً من إعادة تحميل القائمة)
+    Order events with id > `after_id`, oldest first - poll again with the last event id
+    - المؤشر هو معرف الحدث (متزايد) وليس created_at: وقت now() هو بداية الـ transaction
+      فحدث يتم حفظه متأخراً قد يحمل وقتاً أقدم من حدث استلمه العميل مسبقاً
+    """
+    rows = _order_events_query(db).filter(
+        OrderEvent.user_id == current_user.id,
+        OrderEvent.id > after_id
+    ).order_by(OrderEvent.id).limit(limit).all()
+    
+    return json_response(construct_rows(OrderEventResponse, rows))
+
+@router.get("/orders/{order_id}/events", response_model=List[OrderEventResponse])
+def get_order_events(
+    order_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    سجل حالات الطلب
+    Order status history
+    """
+    rows = _order_events_query(db).filter(
+        OrderEvent.order_id == order_id,
+        OrderEvent.user_id == current_user.id
+    ).order_by(OrderEvent.id).all()
+    
+    # الطلبات القديمة (قبل سجل الأحداث) ليس لها أحداث
+    if not rows and not db.query(Order.id).filter(
+        Order.id == order_id,
         Order.user_id == current_user.id
-    ).order_by(desc(Order.created_at)).offset(skip).limit(limit).all()
-    
-    result = []
-    for order in orders:
-        items_count = db.query(OrderItem).filter(OrderItem.order_id == order.id).count()
-        result.append(OrderSummaryResponse(
-            order_number=order.order_number,
-            created_at=order.created_at,
-            total_amount=order.total_amount,
-            delivery_fee=order.delivery_fee,
-            grand_total=order.grand_total,
-            status=order.status,
-            items_count=items_count,
-            payment_method=order.payment_method
-        ))
-    
-    return result
+    ).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="الطلب غير موجود"
+        )
+    
+    return json_response(construct_rows(OrderEventResponse, rows))
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
 async def get_order(
@@ -200,29 +315,8 @@ async def get_order(
     
     order_items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
     
-    return OrderResponse(
-        id=order.id,
-        order_number=order.order_number,
-        total_amount=order.total_amount,
-        delivery_fee=order.delivery_fee,
-        grand_total=order.grand_total,
-        delivery_address=order.delivery_address,
-        delivery_phone=order.delivery_phone,
-        payment_method=order.payment_method,
-        payment_status=order.payment_status,
-        status=order.status,
-        created_at=order.created_at,
-        delivered_at=order.delivered_at,
-        order_items=[
-            OrderItemResponse(
-                id=item.id,
-                product_id=item.product_id,
-                product_name_ar=item.product_name_ar,
-                product_image_url=item.product_image_url,
-                unit_price=item.unit_price,
-                quantity=item.quantity,
-                total_price=item.total_price
-            ) for item in order_items
-        ]
+    return _build_order_response(
+        order,
+        [OrderItemResponse.model_validate(item) for item in order_items],
     )
 
@@ -1,15 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, desc, asc
+from sqlalchemy import or_, and_, desc, asc, case, func
 from typing import List, Optional
 from app.db.database import get_db
 from app.models.product import Product, ProductStatus, DiscountType
 from app.models.category import Category
-from app.models.search_history import SearchHistory
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductDetailResponse
+from app.schemas.product import (
+    ProductCreate, ProductUpdate, ProductResponse, ProductDetailResponse,
+    ProductFacetsResponse, CategoryFacet, PriceRangeFacet, BooleanFacet
+)
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
 from app.schemas.search import SearchHistoryResponse
 from app.core.dependencies import get_current_user, get_current_user_optional, get_current_admin
+from app.services.view_counter_service import product_view_counter
+from app.services.search_history_service import search_history_writer, SEARCH_QUERY_MAX_LENGTH
+from app.services.catalog_service import product_detail_query, product_detail_from_row, product_details_from_rows
+from app.services.home_service import fetch_featured_products
+from app.core.cache import reference_cache, CATEGORIES, PRODUCTS, HOME
+from app.core.http_cache import encode_json, etag_response
 from app.models.user import User
 
 router = APIRouter()
@@ -18,18 +26,22 @@ router = APIRouter()
 
 @router.get("/categories", response_model=List[CategoryResponse], summary="قائمة الفئات")
 def get_all_categories(
+    request: Request,
     is_active: Optional[bool] = True,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
     """الحصول على قائمة بجميع الفئات"""
-    query = db.query(Category)
-    if is_active is not None:
-        query = query.filter(Category.is_active == is_active)
+    def load_categories():
+        query = db.query(Category)
+        if is_active is not None:
+            query = query.filter(Category.is_active == is_active)
+        
+        categories = query.offset(skip).limit(limit).all()
+        return encode_json([CategoryResponse.model_validate(category) for category in categories])
     
-    categories = query.offset(skip).limit(limit).all()
-    return categories
+    return etag_response(request, reference_cache.get_or_load(CATEGORIES, (is_active, skip, limit), load_categories))
 
 @router.post("/categories", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED, summary="إضافة فئة (Admin)")
 def create_category(
@@ -42,6 +54,7 @@ def create_category(
     new_category = Category(**category.dict())
     db.add(new_category)
     db.commit()
+    reference_cache.invalidate(CATEGORIES, PRODUCTS, HOME)
     db.refresh(new_category)
     return new_category
 
@@ -62,6 +75,7 @@ def update_category(
         setattr(db_category, field, value)
     
     db.commit()
+    reference_cache.invalidate(CATEGORIES, PRODUCTS, HOME)
     db.refresh(db_category)
     return db_category
 
@@ -78,6 +92,7 @@ def delete_category(
     
     db.delete(db_category)
     db.commit()
+    reference_cache.invalidate(CATEGORIES, PRODUCTS, HOME)
     return None
 
 # ============= Products APIs (المنتجات - معدات الصيانة) =============
@@ -86,8 +101,81 @@ def delete_category(
 # تظهر في المتجر للجميع، وفي الصفحة الرئيسية للفني فقط
 # للعروض على الخدمات (الإنشاء والصيانة)، استخدم /offers
 
+# شرائح الأسعار المستخدمة في عدّادات الفلاتر (الحد الأعلى غير شامل)
+PRICE_BUCKETS = [(0, 500), (500, 1000), (1000, 5000), (5000, None)]
+
+# مدة صلاحية كاش عدّادات الفلاتر (بالإضافة للإبطال عند تعديل المنتجات)
+FACETS_CACHE_TTL_SECONDS = 60
+
+
+def _apply_product_filters(
+    query,
+    search: Optional[str] = None,
+    category_id: Optional[int] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    free_delivery: Optional[bool] = None,
+    is_featured: Optional[bool] = None,
+    status: Optional[ProductStatus] = None,
+):
+    """تطبيق البحث والتصفية على استعلام المنتجات"""
+    # البحث - إذا كان حرف واحد، نبحث عن المنتجات التي تبدأ به
+    if search:
+        if len(search) == 1:
+            # إذا كان حرف واحد، نبحث عن المنتجات التي تبدأ بهذا الحرف
+            search_filter = or_(
+                Product.name_ar.ilike(f"{search}%"),
+                Product.name_en.ilike(f"{search}%")
+            )
+        else:
+            # إذا كان أكثر من حرف، نبحث في الاسم والوصف
+            search_filter = or_(
+                Product.name_ar.ilike(f"%{search}%"),
+                Product.name_en.ilike(f"%{search}%"),
+                Product.description_ar.ilike(f"%{search}%")
+            )
+        query = query.filter(search_filter)
+    
+    # التصفية
+    if category_id:
+        query = query.filter(Product.category_id == category_id)
+    
+    if min_price is not None:
+        query = query.filter(Product.final_price >= min_price)
+    
+    if max_price is not None:
+        query = query.filter(Product.final_price <= max_price)
+    
+    if free_delivery is not None:
+        query = query.filter(Product.free_delivery == free_delivery)
+    
+    if is_featured is not None:
+        query = query.filter(Product.is_featured == is_featured)
+    
+    if status:
+        query = query.filter(Product.status == status)
+    
+    return query
+
+
+def _price_bucket_expression():
+    """رقم شريحة السعر لكل منتج (CASE في قاعدة البيانات)"""
+    return case(
+        *[
+            (
+                and_(Product.final_price >= low, Product.final_price < high) if high is not None
+                else Product.final_price >= low,
+                index,
+            )
+            for index, (low, high) in enumerate(PRICE_BUCKETS)
+        ],
+        else_=None,
+    )
+
+
 @router.get("/featured", response_model=List[ProductDetailResponse], summary="المنتجات المميزة (للصفحة الرئيسية)")
 def get_featured_products(
+    request: Request,
     limit: int = Query(6, description="عدد المنتجات"),
     db: Session = Depends(get_db)
 ):
@@ -107,13 +195,14 @@ def get_featured_products(
     
     ملاحظة: هذه مختلفة عن عروض الخدمات (الإنشاء والصيانة)
     """
-    from app.api.v1.endpoints.home import _fetch_featured_products
-    return _fetch_featured_products(limit, db)
+    return etag_response(request, fetch_featured_products(limit, db))
 
 @router.get("/", response_model=List[ProductDetailResponse], summary="قائمة المنتجات مع البحث والفلترة")
 def get_all_products(
+    request: Request,
+    
     # البحث
-    search: Optional[str] = Query(None, description="البحث في اسم المنتج"),
+    search: Optional[str] = Query(None, max_length=SEARCH_QUERY_MAX_LENGTH, description="البحث في اسم المنتج"),
     
     # التصفية
     category_id: Optional[int] = Query(None, description="فلترة حسب الفئة"),
@@ -143,53 +232,23 @@ def get_all_products(
     للعروض على الخدمات (الإنشاء والصيانة)، استخدم /offers
     """
     
-    query = db.query(Product)
-    
-    # البحث - إذا كان حرف واحد، نبحث عن المنتجات التي تبدأ به
     if search:
         search = search.strip()
-        if len(search) == 1:
-            # إذا كان حرف واحد، نبحث عن المنتجات التي تبدأ بهذا الحرف
-            search_filter = or_(
-                Product.name_ar.ilike(f"{search}%"),
-                Product.name_en.ilike(f"{search}%")
-            )
-        else:
-            # إذا كان أكثر من حرف، نبحث في الاسم والوصف
-            search_filter = or_(
-                Product.name_ar.ilike(f"%{search}%"),
-                Product.name_en.ilike(f"%{search}%"),
-                Product.description_ar.ilike(f"%{search}%")
-            )
-        query = query.filter(search_filter)
-        
-        # حفظ تاريخ البحث إذا كان المستخدم مسجل دخول
-        if current_user and search:
-            search_history = SearchHistory(
-                user_id=current_user.id,
-                search_query=search
-            )
-            db.add(search_history)
-            db.commit()
-    
-    # التصفية
-    if category_id:
-        query = query.filter(Product.category_id == category_id)
-    
-    if min_price is not None:
-        query = query.filter(Product.final_price >= min_price)
-    
-    if max_price is not None:
-        query = query.filter(Product.final_price <= max_price)
-    
-    if free_delivery is not None:
-        query = query.filter(Product.free_delivery == free_delivery)
-    
-    if is_featured is not None:
-        query = query.filter(Product.is_featured == is_featured)
     
-    if status:
-        query = query.filter(Product.status == status)
+    query = _apply_product_filters(
+        product_detail_query(db),
+        search=search,
+        category_id=category_id,
+        min_price=min_price,
+        max_price=max_price,
+        free_delivery=free_delivery,
+        is_featured=is_featured,
+        status=status,
+    )
+    
+    # حفظ تاريخ البحث إذا كان المستخدم مسجل دخول (يتم الحفظ في الخلفية على دفعات)
+    if current_user and search:
+        search_history_writer.record(current_user.id, search)
     
     # الترتيب
     if sort_by == "price":
@@ -203,35 +262,118 @@ def get_all_products(
     else:  # created_at (default)
         query = query.order_by(desc(Product.created_at) if order == "desc" else asc(Product.created_at))
     
-    products = query.offset(skip).limit(limit).all()
+    rows = query.offset(skip).limit(limit).all()
     
-    # إضافة تفاصيل الفئة
-    results = []
-    for product in products:
-        product_dict = ProductDetailResponse(**product.__dict__)
-        if product.category:
-            product_dict.category_name = product.category.name_ar
-        results.append(product_dict)
+    return etag_response(request, product_details_from_rows(rows))
+
+@router.get("/facets", response_model=ProductFacetsResponse, summary="عدّادات فلاتر المنتجات")
+def get_product_facets(
+    request: Request,
+    search: Optional[str] = Query(None, max_length=SEARCH_QUERY_MAX_LENGTH, description="البحث في اسم المنتج"),
+    category_id: Optional[int] = Query(None, description="فلترة حسب الفئة"),
+    min_price: Optional[int] = Query(None, ge=0, description="الحد الأدنى للسعر"),
+    max_price: Optional[int] = Query(None, ge=0, description="الحد الأقصى للسعر"),
+    free_delivery: Optional[bool] = Query(None, description="توصيل مجاني فقط"),
+    is_featured: Optional[bool] = Query(None, description="المنتجات المميزة فقط"),
+    status: Optional[ProductStatus] = Query(None, description="حالة المنتج"),
+    db: Session = Depends(get_db)
+):
+    """
+    عدد المنتجات لكل فئة، ولكل شريحة سعر، وللتوصيل المجاني
+    حسب نفس فلاتر قائمة المنتجات (/products)
     
-    return results
+    - يتم حساب جميع العدّادات في استعلام واحد مجمّع (GROUP BY)
+    - النتيجة محفوظة مؤقتاً حسب مجموعة الفلاتر
+    """
+    search = search.strip() if search else None
+    cache_key = (
+        search.lower() if search else None,
+        category_id or None,
+        min_price,
+        max_price,
+        free_delivery,
+        is_featured,
+        status.value if status else None,
+    )
+    
+    def load_facets():
+        price_bucket = _price_bucket_expression().label("price_bucket")
+        query = db.query(
+            Product.category_id,
+            Category.name_ar,
+            price_bucket,
+            Product.free_delivery,
+            func.count(Product.id),
+        ).outerjoin(Category, Product.category_id == Category.id)
+        query = _apply_product_filters(
+            query,
+            search=search,
+            category_id=category_id,
+            min_price=min_price,
+            max_price=max_price,
+            free_delivery=free_delivery,
+            is_featured=is_featured,
+            status=status,
+        )
+        rows = query.group_by(
+            Product.category_id, Category.name_ar, price_bucket, Product.free_delivery
+        ).all()
+        
+        # تجميع العدّادات من نتيجة الاستعلام الواحد
+        total = 0
+        categories = {}
+        price_counts = [0] * len(PRICE_BUCKETS)
+        delivery_counts = {True: 0, False: 0}
+        for row_category_id, category_name, bucket, row_free_delivery, count in rows:
+            total += count
+            if row_category_id is not None:
+                name, current = categories.get(row_category_id, (category_name, 0))
+                categories[row_category_id] = (name, current + count)
+            if bucket is not None:
+                price_counts[bucket] += count
+            delivery_counts[bool(row_free_delivery)] += count
+        
+        return encode_json(ProductFacetsResponse(
+            total=total,
+            categories=[
+                CategoryFacet(category_id=key, category_name=name, count=count)
+                for key, (name, count) in sorted(categories.items(), key=lambda item: -item[1][1])
+            ],
+            price_ranges=[
+                PriceRangeFacet(min_price=low, max_price=high, count=price_counts[index])
+                for index, (low, high) in enumerate(PRICE_BUCKETS)
+            ],
+            free_delivery=[
+                BooleanFacet(value=value, count=count) for value, count in delivery_counts.items()
+            ],
+        ))
+    
+    return etag_response(
+        request,
+        reference_cache.get_or_load(PRODUCTS, cache_key, load_facets, ttl_seconds=FACETS_CACHE_TTL_SECONDS),
+    )
 
 @router.get("/{product_id}", response_model=ProductDetailResponse, summary="تفاصيل منتج")
-def get_product(product_id: int, db: Session = Depends(get_db)):
+def get_product(product_id: int, request: Request, db: Session = Depends(get_db)):
     """الحصول على تفاصيل منتج معين"""
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
+    row = product_detail_query(db).filter(Product.id == product_id).first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="المنتج غير موجود")
     
-    # زيادة عدد المشاهدات
-    product.views_count += 1
-    db.commit()
+    # زيادة عدد المشاهدات (يتم حفظها دورياً في دفعات - بدون كتابة في كل طلب)
+    product_view_counter.record(product_id)
     
-    # إضافة تفاصيل الفئة
-    product_dict = ProductDetailResponse(**product.__dict__)
-    if product.category:
-        product_dict.category_name = product.category.name_ar
+    product_dict = product_detail_from_row(
+        row,
+        views_count=(row.views_count or 0) + product_view_counter.pending(product_id),
+    )
     
-    return product_dict
+    # الـ ETag من بيانات المنتج بدون views_count (يتغير مع كل طلب فلا يتطابق أبداً)
+    return etag_response(
+        request,
+        product_dict,
+        etag_content=product_dict.model_dump(exclude={"views_count"}),
+    )
 
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED, summary="إضافة منتج (Admin)")
 def create_product(
@@ -248,6 +390,7 @@ def create_product(
     
     db.add(new_product)
     db.commit()
+    reference_cache.invalidate(PRODUCTS, HOME)
     db.refresh(new_product)
     return new_product
 
@@ -271,6 +414,7 @@ def update_product(
     db_product.final_price = db_product.calculate_final_price()
     
     db.commit()
+    reference_cache.invalidate(PRODUCTS, HOME)
     db.refresh(db_product)
     return db_product
 
@@ -287,4 +431,5 @@ def delete_product(
     
     db.delete(db_product)
     db.commit()
+    reference_cache.invalidate(PRODUCTS, HOME)
     return None
\ No newline at end of file
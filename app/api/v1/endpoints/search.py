@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, distinct
+from sqlalchemy import desc
 from typing import List, Optional
 from app.db.database import get_db
 from app.core.dependencies import get_current_user_optional
 from app.models.user import User
-from app.models.search_history import SearchHistory
-from app.schemas.search import SearchHistoryResponse
+from app.models.recent_search import RecentSearch
+from app.schemas.search import SearchHistoryResponse, TrendingSearchResponse
+from app.services.search_history_service import get_deduplicated_history
+from app.services.trending_search_service import trending_searches
 
 router = APIRouter()
 
@@ -19,30 +21,50 @@ async def get_search_history(
     """
     الحصول على تاريخ البحث
     Get search history
+    - المصدر الأساسي: جدول recent_searches (صف واحد لكل عبارة، يُحدّث عند حفظ البحث)
+    - إذا كان فارغاً (سجل بحث أقدم من الجدول) يتم التجميع من search_history في SQL
     """
     if not current_user:
         return []
     
-    # جلب آخر عمليات البحث المميزة (بدون تكرار)
-    search_history = db.query(SearchHistory).filter(
-        SearchHistory.user_id == current_user.id
+    # جلب آخر عمليات البحث المميزة (صف واحد لكل عبارة - بدون تكرار)
+    recent_searches = db.query(
+        RecentSearch.id,
+        RecentSearch.search_query,
+        RecentSearch.last_searched_at
+    ).filter(
+        RecentSearch.user_id == current_user.id
     ).order_by(
-        desc(SearchHistory.created_at)
-    ).all()
+        desc(RecentSearch.last_searched_at)
+    ).limit(limit).all()
     
-    # تحويل النتائج مع إزالة التكرار
-    results = []
-    seen_queries = set()
-    for item in search_history:
-        if item.search_query not in seen_queries:
-            seen_queries.add(item.search_query)
-            results.append(SearchHistoryResponse(
-                id=item.id,
-                search_query=item.search_query,
-                created_at=item.created_at
-            ))
-            if len(results) >= limit:
-                break
+    # سجل بحث قديم لم يُنقل بعد لجدول آخر عمليات البحث - نجمعه في قاعدة البيانات
+    if not recent_searches:
+        recent_searches = get_deduplicated_history(db, current_user.id, limit)
     
-    return results
+    return [
+        SearchHistoryResponse(
+            id=item.id,
+            search_query=item.search_query,
+            created_at=item.last_searched_at
+        ) for item in recent_searches
+    ]
 
+@router.get("/search/trending", response_model=List[TrendingSearchResponse])
+def get_trending_searches(
+    limit: int = Query(10, ge=1, le=50, description="عدد النتائج"),
+    q: Optional[str] = Query(None, description="بداية عبارة البحث (للاقتراحات)"),
+    db: Session = Depends(get_db)
+):
+    """
+    الحصول على عمليات البحث الأكثر شيوعاً (تُحسب دورياً وتُقدّم من الذاكرة)
+    Get trending searches
+    """
+    # أول طلب بعد تشغيل السيرفر - نحسبها مرة واحدة
+    if not trending_searches.loaded:
+        trending_searches.refresh(db)
+    
+    return [
+        TrendingSearchResponse(search_query=search_query, search_count=search_count)
+        for search_query, search_count in trending_searches.get(limit, prefix=q)
+    ]
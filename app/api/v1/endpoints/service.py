@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.database import get_db
@@ -13,6 +13,8 @@ from app.schemas.maintenance_package import (
     MaintenancePackageResponse
 )
 from app.core.dependencies import get_current_user, get_current_admin
+from app.core.cache import reference_cache, SERVICES, POOL_TYPES, MAINTENANCE_PACKAGES, HOME
+from app.core.http_cache import encode_json, etag_response
 from app.models.user import User
 
 router = APIRouter()
@@ -21,22 +23,26 @@ router = APIRouter()
 
 @router.get("/services", response_model=List[ServiceResponse], summary="قائمة الخدمات")
 def get_all_services(
+    request: Request,
     service_type: Optional[ServiceType] = Query(None, description="فلترة حسب نوع الخدمة"),
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
     """الحصول على قائمة بجميع الخدمات (إنشاء وصيانة)"""
-    query = db.query(Service).filter(Service.status == "active")
+    def load_services():
+        query = db.query(Service).filter(Service.status == "active")
+        
+        if service_type:
+            query = query.filter(Service.service_type == service_type)
+        
+        services = query.offset(skip).limit(limit).all()
+        return encode_json([ServiceResponse.model_validate(service) for service in services])
     
-    if service_type:
-        query = query.filter(Service.service_type == service_type)
-    
-    services = query.offset(skip).limit(limit).all()
-    return services
+    return etag_response(request, reference_cache.get_or_load(SERVICES, (service_type, skip, limit), load_services))
 
 @router.get("/services/{service_id}", response_model=ServiceResponse, summary="تفاصيل خدمة")
-def get_service(service_id: int, db: Session = Depends(get_db)):
+def get_service(service_id: int, request: Request, db: Session = Depends(get_db)):
     """الحصول على تفاصيل خدمة معينة"""
     service = db.query(Service).filter(Service.id == service_id).first()
     if not service:
@@ -44,7 +50,7 @@ def get_service(service_id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="الخدمة غير موجودة"
         )
-    return service
+    return etag_response(request, ServiceResponse.model_validate(service))
 
 @router.post("/services", response_model=ServiceResponse, status_code=status.HTTP_201_CREATED, summary="إضافة خدمة جديدة")
 def create_service(
@@ -57,6 +63,7 @@ def create_service(
     new_service = Service(**service.dict())
     db.add(new_service)
     db.commit()
+    reference_cache.invalidate(SERVICES, HOME)
     db.refresh(new_service)
     return new_service
 
@@ -80,6 +87,7 @@ def update_service(
         setattr(db_service, field, value)
     
     db.commit()
+    reference_cache.invalidate(SERVICES, HOME)
     db.refresh(db_service)
     return db_service
 
@@ -99,27 +107,32 @@ def delete_service(
     
     db.delete(db_service)
     db.commit()
+    reference_cache.invalidate(SERVICES, HOME)
     return None
 
 # ============= Pool Types APIs =============
 
 @router.get("/pool-types", response_model=List[PoolTypeResponse], summary="أنواع المسابح")
 def get_all_pool_types(
+    request: Request,
     is_active: bool = True,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
     """الحصول على قائمة بجميع أنواع المسابح"""
-    query = db.query(PoolType)
-    if is_active is not None:
-        query = query.filter(PoolType.is_active == is_active)
+    def load_pool_types():
+        query = db.query(PoolType)
+        if is_active is not None:
+            query = query.filter(PoolType.is_active == is_active)
+        
+        pool_types = query.offset(skip).limit(limit).all()
+        return encode_json([PoolTypeResponse.model_validate(pool_type) for pool_type in pool_types])
     
-    pool_types = query.offset(skip).limit(limit).all()
-    return pool_types
+    return etag_response(request, reference_cache.get_or_load(POOL_TYPES, (is_active, skip, limit), load_pool_types))
 
 @router.get("/pool-types/{pool_type_id}", response_model=PoolTypeResponse, summary="تفاصيل نوع مسبح")
-def get_pool_type(pool_type_id: int, db: Session = Depends(get_db)):
+def get_pool_type(pool_type_id: int, request: Request, db: Session = Depends(get_db)):
     """الحصول على تفاصيل نوع مسبح معين"""
     pool_type = db.query(PoolType).filter(PoolType.id == pool_type_id).first()
     if not pool_type:
@@ -127,7 +140,7 @@ def get_pool_type(pool_type_id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="نوع المسبح غير موجود"
         )
-    return pool_type
+    return etag_response(request, PoolTypeResponse.model_validate(pool_type))
 
 @router.post("/pool-types", response_model=PoolTypeResponse, status_code=status.HTTP_201_CREATED, summary="إضافة نوع مسبح")
 def create_pool_type(
@@ -139,6 +152,7 @@ def create_pool_type(
     new_pool_type = PoolType(**pool_type.dict())
     db.add(new_pool_type)
     db.commit()
+    reference_cache.invalidate(POOL_TYPES)
     db.refresh(new_pool_type)
     return new_pool_type
 
@@ -162,6 +176,7 @@ def update_pool_type(
         setattr(db_pool_type, field, value)
     
     db.commit()
+    reference_cache.invalidate(POOL_TYPES)
     db.refresh(db_pool_type)
     return db_pool_type
 
@@ -181,12 +196,14 @@ def delete_pool_type(
     
     db.delete(db_pool_type)
     db.commit()
+    reference_cache.invalidate(POOL_TYPES)
     return None
 
 # ============= Maintenance Packages APIs =============
 
 @router.get("/maintenance-packages", response_model=List[MaintenancePackageResponse], summary="باقات الصيانة")
 def get_all_maintenance_packages(
+    request: Request,
     duration: Optional[PackageDuration] = Query(None, description="فلترة حسب المدة"),
     is_active: bool = True,
     skip: int = 0,
@@ -194,19 +211,24 @@ def get_all_maintenance_packages(
     db: Session = Depends(get_db)
 ):
     """الحصول على قائمة بجميع باقات الصيانة"""
-    query = db.query(MaintenancePackage)
-    
-    if is_active is not None:
-        query = query.filter(MaintenancePackage.is_active == is_active)
-    
-    if duration:
-        query = query.filter(MaintenancePackage.duration == duration)
+    def load_packages():
+        query = db.query(MaintenancePackage)
+        
+        if is_active is not None:
+            query = query.filter(MaintenancePackage.is_active == is_active)
+        
+        if duration:
+            query = query.filter(MaintenancePackage.duration == duration)
+        
+        packages = query.offset(skip).limit(limit).all()
+        return encode_json([MaintenancePackageResponse.model_validate(package) for package in packages])
     
-    packages = query.offset(skip).limit(limit).all()
-    return packages
+    return etag_response(request, reference_cache.get_or_load(
+        MAINTENANCE_PACKAGES, (duration, is_active, skip, limit), load_packages
+    ))
 
 @router.get("/maintenance-packages/{package_id}", response_model=MaintenancePackageResponse, summary="تفاصيل باقة")
-def get_maintenance_package(package_id: int, db: Session = Depends(get_db)):
+def get_maintenance_package(package_id: int, request: Request, db: Session = Depends(get_db)):
     """الحصول على تفاصيل باقة معينة"""
     package = db.query(MaintenancePackage).filter(MaintenancePackage.id == package_id).first()
     if not package:
@@ -214,7 +236,7 @@ def get_maintenance_package(package_id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="الباقة غير موجودة"
         )
-    return package
+    return etag_response(request, MaintenancePackageResponse.model_validate(package))
 
 @router.post("/maintenance-packages", response_model=MaintenancePackageResponse, status_code=status.HTTP_201_CREATED, summary="إضافة باقة")
 def create_maintenance_package(
@@ -226,6 +248,7 @@ def create_maintenance_package(
     new_package = MaintenancePackage(**package.dict())
     db.add(new_package)
     db.commit()
+    reference_cache.invalidate(MAINTENANCE_PACKAGES)
     db.refresh(new_package)
     return new_package
 
@@ -249,6 +272,7 @@ def update_maintenance_package(
         setattr(db_package, field, value)
     
     db.commit()
+    reference_cache.invalidate(MAINTENANCE_PACKAGES)
     db.refresh(db_package)
     return db_package
 
@@ -268,4 +292,5 @@ def delete_maintenance_package(
     
     db.delete(db_package)
     db.commit()
+    reference_cache.invalidate(MAINTENANCE_PACKAGES)
     return None
\ No newline at end of file
@@ -0,0 +1,180 @@
+# app/core/cache.py
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from app.core.config import settings
+
+
+MISSING = object()
+
+# Namespaces للبيانات المرجعية (كل namespace له رقم إصدار يتغير عند التعديل)
+SERVICES = "services"
+POOL_TYPES = "pool_types"
+MAINTENANCE_PACKAGES = "maintenance_packages"
+CATEGORIES = "categories"
+PRODUCTS = "products"
+FAQS = "faqs"
+PRIVACY_SECTIONS = "privacy_sections"
+WHY_US = "why_us"
+HOME = "home"
+OFFERS = "offers"
+
+
+class TTLCache:
+    """
+    كاش بسيط في الذاكرة مع مدة صلاحية وحد أقصى للعناصر
+    Thread-safe in-process cache with per-entry expiry and LRU eviction
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        """Returns the cached value or MISSING"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class CacheBackend(ABC):
+    """
+    واجهة مخزن الكاش - يمكن استبدالها بمخزن مشترك (مثل Redis) بين عدة workers
+    Pluggable storage used by VersionedCache
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """Returns the stored value or MISSING"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        ...
+
+    @abstractmethod
+    def get_version(self, namespace: str) -> int:
+        ...
+
+    @abstractmethod
+    def bump_version(self, namespace: str) -> int:
+        ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """مخزن داخل العملية (الافتراضي) - الإبطال يسري على العملية الحالية فقط"""
+
+    def __init__(self, max_entries: int = 4096):
+        self._entries = TTLCache(ttl_seconds=0, max_entries=max_entries)
+        self._versions_lock = threading.Lock()
+        self._versions: dict[str, int] = {}
+
+    def get(self, key: str) -> Any:
+        return self._entries.get(key)
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        self._entries.set(key, value, ttl_seconds=ttl_seconds)
+
+    def get_version(self, namespace: str) -> int:
+        with self._versions_lock:
+            return self._versions.get(namespace, 0)
+
+    def bump_version(self, namespace: str) -> int:
+        with self._versions_lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+            return self._versions[namespace]
+
+
+class VersionedCache:
+    """
+    كاش read-through بإصدارات لكل namespace
+    - القراءة: مفتاح الكاش يحتوي رقم الإصدار الحالي، وعند عدم وجوده يتم التحميل من قاعدة البيانات
+    - الإبطال: زيادة رقم الإصدار (بدون حذف المفاتيح - القديمة تنتهي بالـ TTL)
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+    def set_backend(self, backend: CacheBackend) -> None:
+        """استبدال المخزن (مثلاً بمخزن مشترك عند التشغيل بعدة workers)"""
+        self.backend = backend
+
+    def version(self, namespace: str) -> int:
+        """رقم الإصدار الحالي - يُقرأ قبل التحميل ويُمرر إلى put"""
+        return self.backend.get_version(namespace)
+
+    def _cache_key(self, namespace: str, key: Hashable, version: Optional[int] = None) -> str:
+        if version is None:
+            version = self.backend.get_version(namespace)
+        return f"{namespace}:v{version}:{key!r}"
+
+    def get_or_load(
+        self,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl_seconds: Optional[float] = None,
+    ) -> Any:
+        cache_key = self._cache_key(namespace, key)
+        value = self.backend.get(cache_key)
+        if value is MISSING:
+            value = loader()
+            self.backend.set(cache_key, value, self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        return value
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        """القيمة المحفوظة في الإصدار الحالي أو MISSING"""
+        return self.backend.get(self._cache_key(namespace, key))
+
+    def put(
+        self,
+        namespace: str,
+        key: Hashable,
+        value: Any,
+        ttl_seconds: Optional[float] = None,
+        version: Optional[int] = None,
+    ) -> bool:
+        """
+        تحديث قيمة مباشرة (للتحديث في الخلفية بدون فترة فراغ)
+        version: الإصدار الذي قُرئ قبل تحميل القيمة - إذا تم الإبطال أثناء التحميل
+        لا تُحفظ القيمة (قديمة) حتى لا تُقدّم تحت الإصدار الجديد
+        Returns: هل تم الحفظ
+        """
+        if version is not None and version != self.backend.get_version(namespace):
+            return False
+        self.backend.set(
+            self._cache_key(namespace, key, version),
+            value,
+            self.ttl_seconds if ttl_seconds is None else ttl_seconds,
+        )
+        return True
+
+    def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self.backend.bump_version(namespace)
+
+
+reference_cache = VersionedCache(InMemoryCacheBackend(), ttl_seconds=settings.REFERENCE_CACHE_TTL_SECONDS)
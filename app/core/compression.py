@@ -0,0 +1,136 @@
+# app/core/compression.py
+import gzip
+import io
+from typing import Iterable, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    هل يقبل العميل gzip حسب Accept-Encoding (مع قيم q):
+    - "gzip;q=0" تعني رفض gzip صراحة
+    - "*" تشمل gzip إذا لم يُذكر gzip بالاسم
+    """
+    gzip_q: Optional[float] = None
+    wildcard_q: Optional[float] = None
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        if coding == "gzip":
+            gzip_q = q
+        elif coding == "*":
+            wildcard_q = q
+    if gzip_q is not None:
+        return gzip_q > 0
+    return wildcard_q is not None and wildcard_q > 0
+
+
+class CompressionMiddleware:
+    """
+    ضغط الاستجابات بـ gzip:
+    - فقط إذا كان العميل يقبل gzip (Accept-Encoding مع قيمة q أكبر من 0)
+    - فقط لأنواع المحتوى المسموحة (JSON، نصوص...) - الصور والملفات المضغوطة أصلاً لا تُضغط
+    - فقط إذا كان حجم الاستجابة أكبر من الحد الأدنى (الاستجابات الصغيرة لا تستفيد من الضغط)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        compresslevel: int = 6,
+        content_types: Iterable[str] = ("application/json",),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.content_types = tuple(content_type.lower() for content_type in content_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            await self.app(scope, receive, send)
+            return
+        responder = _GZipResponder(send, self.minimum_size, self.compresslevel, self.content_types)
+        await self.app(scope, receive, responder.send)
+
+
+class _GZipResponder:
+    def __init__(self, send: Send, minimum_size: int, compresslevel: int, content_types: tuple):
+        self._send = send
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.content_types = content_types
+        self.start_message: Message = {}
+        self.passthrough = False
+        self.started = False
+        self.buffer = io.BytesIO()
+        self.gzip_file: Optional[gzip.GzipFile] = None
+
+    def _compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return media_type in self.content_types
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # ننتظر أول جزء من الـ body لمعرفة الحجم قبل إرسال الـ headers
+            self.start_message = message
+            self.passthrough = not self._compressible(Headers(raw=message["headers"]))
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if len(body) < self.minimum_size and not more_body:
+                # استجابة صغيرة - نرسلها كما هي
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.gzip_file = gzip.GzipFile(mode="wb", fileobj=self.buffer, compresslevel=self.compresslevel)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = "gzip"
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                # استجابة على أجزاء (streaming) - الحجم النهائي غير معروف
+                del headers["Content-Length"]
+            else:
+                self.gzip_file.write(body)
+                self.gzip_file.close()
+                body = self.buffer.getvalue()
+                headers["Content-Length"] = str(len(body))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            await self._send(self.start_message)
+
+        self.gzip_file.write(body)
+        if not more_body:
+            self.gzip_file.close()
+        chunk = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
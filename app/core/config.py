@@ -28,6 +28,31 @@ class Settings(BaseSettings):
     ALLOWED_IMAGE_TYPES: List[str] = ["image/jpeg", "image/jpg", "image/png", "image/webp"]
     BASE_URL: str = "http://localhost:8000"  # يجب تحديثه في production في ملف .env  
     
+    # Background jobs
+    PRODUCT_VIEWS_FLUSH_SECONDS: int = 30  # كل كم ثانية يتم حفظ عدد المشاهدات المعلقة
+    SEARCH_HISTORY_FLUSH_SECONDS: int = 5  # كل كم ثانية يتم حفظ عمليات البحث المعلقة
+    SEARCH_HISTORY_RETENTION_DAYS: int = 90  # مدة الاحتفاظ بسجل البحث
+    RECENT_SEARCHES_PER_USER: int = 50  # أقصى عدد عبارات بحث محفوظة لكل مستخدم
+    TRENDING_SEARCHES_REFRESH_SECONDS: int = 300  # كل كم ثانية يتم تحديث الأكثر بحثاً
+    TRENDING_SEARCHES_WINDOW_DAYS: int = 7  # فترة حساب الأكثر بحثاً
+    TRENDING_SEARCHES_CACHE_SIZE: int = 200  # عدد العبارات المحفوظة في الذاكرة
+    TRENDING_SEARCHES_MIN_COUNT: int = 3  # أقل عدد مرات بحث حتى تظهر العبارة في الأكثر بحثاً
+    
+    # Caching
+    REFERENCE_CACHE_TTL_SECONDS: int = 600  # مدة صلاحية كاش البيانات المرجعية (الخدمات، الفئات، الأسئلة الشائعة...)
+    HOME_SNAPSHOT_REFRESH_SECONDS: int = 60  # كل كم ثانية يتم تحديث أقسام الصفحة الرئيسية في الذاكرة
+    ANONYMOUS_RESPONSE_CACHE_ENABLED: bool = True  # كاش استجابات الصفحات العامة للزوار (بدون تسجيل دخول)
+    ANONYMOUS_RESPONSE_CACHE_MAX_ENTRIES: int = 1024  # حد منفصل لاستجابات الزوار حتى لا تُخرج البيانات المرجعية من الكاش
+    
+    # Orders
+    DEFAULT_DELIVERY_FEE: float = 50.0  # رسوم التوصيل الافتراضية (تُلغى إذا كان أي منتج توصيل مجاني)
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24  # مدة حفظ استجابات طلبات الإنشاء المرسلة مع Idempotency-Key
+    
+    # Compression (gzip)
+    GZIP_MINIMUM_SIZE: int = 1024  # الاستجابات الأصغر من هذا الحجم (بالبايت) لا تُضغط
+    GZIP_COMPRESS_LEVEL: int = 6  # مستوى الضغط (1 أسرع - 9 أصغر حجماً)
+    GZIP_CONTENT_TYPES: List[str] = ["application/json", "text/html", "text/plain", "text/css", "application/javascript"]
+    
     @property
     def cors_origins(self) -> List[str]:
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
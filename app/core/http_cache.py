@@ -0,0 +1,50 @@
+# app/core/http_cache.py
+import hashlib
+from typing import Any, NamedTuple, Optional
+from fastapi import Request, Response, status
+from app.core.serialization import dump_json
+
+
+class EncodedJSON(NamedTuple):
+    """استجابة JSON جاهزة (bytes) مع الـ ETag الخاص بها - يمكن حفظها في الكاش"""
+    body: bytes
+    etag: str
+
+
+def _etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def encode_json(content: Any, etag_content: Any = None) -> EncodedJSON:
+    """
+    تحويل المحتوى إلى JSON (orjson) وحساب الـ ETag من المحتوى
+    etag_content: حساب الـ ETag من جزء ثابت من المحتوى (بدون حقول تتغير مع كل طلب مثل العدادات)
+    """
+    body = dump_json(content)
+    return EncodedJSON(body=body, etag=_etag(body if etag_content is None else dump_json(etag_content)))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # المقارنة الضعيفة (weak comparison) حسب RFC 9110
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def etag_response(request: Request, content: Any, private: bool = False, etag_content: Any = None) -> Response:
+    """
+    استجابة تدعم الطلبات الشرطية:
+    - إذا أرسل العميل If-None-Match مطابق للـ ETag الحالي نرجع 304 بدون body
+    - غير ذلك نرجع المحتوى مع ETag
+    """
+    encoded = content if isinstance(content, EncodedJSON) else encode_json(content, etag_content)
+    headers = {
+        "ETag": encoded.etag,
+        "Cache-Control": "private, no-cache" if private else "no-cache",
+    }
+    if etag_matches(request.headers.get("if-none-match"), encoded.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=encoded.body, media_type="application/json", headers=headers)
@@ -0,0 +1,128 @@
+# app/core/response_cache.py
+import asyncio
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.cache import MISSING, TTLCache, VersionedCache, reference_cache, HOME, OFFERS, PRODUCTS
+from app.core.config import settings
+from app.core.http_cache import etag_matches
+
+
+class CachedRoute(NamedTuple):
+    # الـ namespace الذي يتم إبطاله عند تعديل البيانات من الأدمن
+    namespace: str
+    ttl_seconds: int
+
+
+# المسارات العامة التي يتم كاش استجاباتها للزوار (بدون تسجيل دخول)
+ANONYMOUS_CACHE_ROUTES: Dict[str, CachedRoute] = {
+    "/api/v1/home/featured-offers": CachedRoute(HOME, 60),
+    "/api/v1/home/projects": CachedRoute(HOME, 300),
+    "/api/v1/home/comments": CachedRoute(HOME, 60),
+    "/api/v1/offers/": CachedRoute(OFFERS, 120),
+    "/api/v1/products/": CachedRoute(PRODUCTS, 60),
+}
+
+
+class CachedResponse(NamedTuple):
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+
+def _normalized_query(query_string: bytes) -> str:
+    """ترتيب معاملات الـ query حتى يكون ?a=1&b=2 و ?b=2&a=1 نفس المفتاح"""
+    return urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+
+
+class ResponseCacheMiddleware:
+    """
+    كاش استجابات GET للزوار (بدون Authorization):
+    - المفتاح: المسار + الـ query بعد الترتيب
+    - مدة صلاحية لكل مسار (ANONYMOUS_CACHE_ROUTES)
+    - طلب واحد فقط يحسب الاستجابة عند عدم وجودها، والطلبات المتزامنة تنتظر نفس النتيجة (single-flight)
+    - الإبطال: reference_cache.invalidate(namespace) من عمليات التعديل (رقم الإصدار جزء من المفتاح)
+    - الاستجابات في LRU خاص بها (max_entries): كل query مختلف مفتاح جديد
+      فلا تزاحم البيانات المرجعية المحفوظة في reference_cache
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Optional[Dict[str, CachedRoute]] = None,
+        cache: VersionedCache = reference_cache,
+        max_entries: int = settings.ANONYMOUS_RESPONSE_CACHE_MAX_ENTRIES,
+    ):
+        self.app = app
+        self.routes = ANONYMOUS_CACHE_ROUTES if routes is None else routes
+        # أرقام الإصدارات فقط من reference_cache - الاستجابات نفسها في self._responses
+        self.cache = cache
+        self._responses = TTLCache(ttl_seconds=0, max_entries=max_entries)
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route = self.routes.get(scope.get("path")) if scope["type"] == "http" else None
+        if route is None or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        if "authorization" in request_headers:
+            # المستخدم المسجل قد يرى محتوى مختلف حسب الدور
+            await self.app(scope, receive, send)
+            return
+
+        key = (scope["path"], _normalized_query(scope.get("query_string", b"")))
+        cached = self._responses.get((self.cache.version(route.namespace),) + key)
+        if cached is MISSING:
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                await self._fetch(scope, receive, send, route, key)
+                return
+            cached = await asyncio.shield(in_flight)
+            if cached is None:
+                # الطلب الأول لم ينجح - كل طلب يحسب استجابته بنفسه
+                await self.app(scope, receive, send)
+                return
+
+        await self._replay(cached, request_headers, send)
+
+    async def _fetch(self, scope: Scope, receive: Receive, send: Send, route: CachedRoute, key) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        # الإصدار قبل حساب الاستجابة - إذا تم الإبطال أثناء الطلب لا تُحفظ
+        version = self.cache.version(route.namespace)
+        start: Message = {}
+        chunks: List[bytes] = []
+
+        async def send_and_record(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # نسخة من الـ headers قبل أن تعدلها الـ middlewares الخارجية (الضغط، CORS)
+                start = {**message, "headers": list(message.get("headers", []))}
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        response: Optional[CachedResponse] = None
+        try:
+            await self.app(scope, receive, send_and_record)
+            headers = Headers(raw=start.get("headers", []))
+            if start.get("status") == 200 and "set-cookie" not in headers:
+                response = CachedResponse(start["status"], start["headers"], b"".join(chunks))
+                if version == self.cache.version(route.namespace):
+                    self._responses.set((version,) + key, response, ttl_seconds=route.ttl_seconds)
+        finally:
+            del self._in_flight[key]
+            future.set_result(response)
+
+    async def _replay(self, cached: CachedResponse, request_headers: Headers, send: Send) -> None:
+        etag = Headers(raw=cached.headers).get("etag")
+        if etag and etag_matches(request_headers.get("if-none-match"), etag):
+            headers = [(name, value) for name, value in cached.headers if name.lower() in (b"etag", b"cache-control")]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({"type": "http.response.start", "status": cached.status, "headers": list(cached.headers)})
+        await send({"type": "http.response.body", "body": cached.body})
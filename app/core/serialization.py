@@ -0,0 +1,126 @@
+# app/core/serialization.py
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar
+import orjson
+from fastapi import status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# نفس سلوك JSONResponse: مفاتيح غير نصية (مثل int) تتحول لنص
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def response_columns(schema: Type[BaseModel], *models) -> list:
+    """
+    أعمدة الجداول المطلوبة لبناء الـ schema فقط (بدلاً من تحميل الكائن كاملاً)
+    إذا تكرر اسم العمود في أكثر من جدول يؤخذ من الجدول الأول
+    """
+    columns = {}
+    for model in models:
+        table_columns = model.__table__.c
+        for name in schema.model_fields:
+            if name not in columns and name in table_columns:
+                columns[name] = table_columns[name]
+    return list(columns.values())
+
+
+@lru_cache(maxsize=None)
+def _construct_defaults(schema: Type[BaseModel]) -> Optional[Dict[str, Any]]:
+    """
+    القيم الافتراضية لحقول الـ schema (تُحسب مرة واحدة لكل schema)
+    None إذا كانت الـ schema تحتاج model_construct الكامل (default_factory أو private attributes)
+    """
+    if schema.__private_attributes__ or schema.__pydantic_post_init__:
+        return None
+    defaults = {}
+    for name, field in schema.model_fields.items():
+        if field.default_factory is not None:
+            return None
+        if not field.is_required():
+            defaults[name] = field.default
+    return defaults
+
+
+def _new_model(schema: Type[ModelT], values: Dict[str, Any], fields_set: set) -> ModelT:
+    """
+    نفس ما يفعله model_construct بدون المرور على الحقول واحداً واحداً في Python
+    (model_construct في pydantic v2 أبطأ من الـ validation نفسه لقوائم طويلة)
+    """
+    model = object.__new__(schema)
+    object.__setattr__(model, "__dict__", values)
+    object.__setattr__(model, "__pydantic_fields_set__", fields_set)
+    object.__setattr__(model, "__pydantic_extra__", None)
+    object.__setattr__(model, "__pydantic_private__", None)
+    return model
+
+
+def construct_row(schema: Type[ModelT], row, **overrides) -> ModelT:
+    """
+    بناء الـ schema من صف قاعدة بيانات بدون validation
+    للبيانات الداخلية الموثوقة فقط - الأنواع تأتي صحيحة من قاعدة البيانات
+    وأسماء الأعمدة هي أسماء الحقول (response_columns)
+    """
+    defaults = _construct_defaults(schema)
+    if defaults is None:
+        return schema.model_construct(**{**row._mapping, **overrides})
+    keys = row._fields
+    values = dict(defaults)
+    values.update(zip(keys, row))
+    values.update(overrides)
+    return _new_model(schema, values, set(keys).union(overrides))
+
+
+def construct_rows(schema: Type[ModelT], rows: Iterable) -> List[ModelT]:
+    """مثل construct_row لقائمة صفوف (أسماء الأعمدة تُقرأ مرة واحدة)"""
+    defaults = _construct_defaults(schema)
+    if defaults is None:
+        return [schema.model_construct(**row._mapping) for row in rows]
+    models = []
+    keys = None
+    for row in rows:
+        if keys is None:
+            keys = row._fields
+        values = dict(defaults)
+        values.update(zip(keys, row))
+        models.append(_new_model(schema, values, set(keys)))
+    return models
+
+
+def _orjson_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return jsonable_encoder(obj)
+
+
+def dump_json(content: Any) -> bytes:
+    """
+    تحويل المحتوى إلى JSON باستخدام orjson
+    datetime/date/time/enum والنص العربي مدعومة مباشرة (UTF-8 بدون escape)
+    """
+    return orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    استجابة JSON الافتراضية لكل الـ API (orjson بدلاً من json.dumps)
+    تقبل أيضاً Pydantic models مباشرة عند إرجاعها بدون response_model
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def json_response(content: Any, status_code: int = status.HTTP_200_OK) -> ORJSONResponse:
+    """
+    استجابة JSON جاهزة بدون المرور على response_model مرة أخرى
+    (FastAPI لا يعيد التحقق من Response مباشرة)
+    """
+    return ORJSONResponse(content=content, status_code=status_code)
@@ -0,0 +1,51 @@
+# app/core/single_flight.py
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    دمج الحسابات المتطابقة المتزامنة (request coalescing)
+    إذا وصلت عدة طلبات بنفس المفتاح أثناء الحساب، يتم الحساب مرة واحدة وتنتظر باقي الطلبات نفس النتيجة
+    Thread-safe: sync endpoints run in FastAPI's threadpool
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            # المفتاح يُحذف بعد الانتهاء - الطلب التالي يحسب من جديد (هذا ليس كاش)
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+single_flight = SingleFlight()
@@ -1,9 +1,19 @@
 # app/core/tasks.py
+import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from app.core.config import settings
 from app.db.database import get_db
 from app.models import notification as notif_model, booking as booking_model, user as user_model
+from app.services.view_counter_service import product_view_counter
+from app.services.search_history_service import search_history_writer, purge_search_history
+from app.services.trending_search_service import trending_searches
+from app.services.offer_expiry_service import expire_ended_offers
+from app.services.idempotency_service import purge_expired_idempotency_keys
+from app.services.home_service import refresh_home_snapshot
+
+logger = logging.getLogger("plupool.tasks")
 
 def send_daily_notifications():
     db_gen = get_db()
@@ -43,5 +53,73 @@ def send_daily_notifications():
     db.commit()
     db.close()
 
+def flush_product_views():
+    db_gen = get_db()
+    db: Session = next(db_gen)
+    try:
+        product_view_counter.flush(db)
+    finally:
+        db.close()
+
+def flush_search_history():
+    db_gen = get_db()
+    db: Session = next(db_gen)
+    try:
+        search_history_writer.flush(db)
+    finally:
+        db.close()
+
+def purge_old_search_history():
+    db_gen = get_db()
+    db: Session = next(db_gen)
+    try:
+        purge_search_history(db)
+    finally:
+        db.close()
+
+def refresh_home_sections():
+    db_gen = get_db()
+    db: Session = next(db_gen)
+    try:
+        refresh_home_snapshot(db)
+    finally:
+        db.close()
+
+def expire_service_offers():
+    db_gen = get_db()
+    db: Session = next(db_gen)
+    try:
+        expire_ended_offers(db)
+    except Exception:
+        # مثلاً عند التشغيل قبل إنشاء الجداول - المحاولة التالية مع بداية اليوم
+        db.rollback()
+        logger.exception("Expiring ended service offers failed")
+    finally:
+        db.close()
+
+def purge_idempotency_keys():
+    db_gen = get_db()
+    db: Session = next(db_gen)
+    try:
+        purge_expired_idempotency_keys(db)
+    finally:
+        db.close()
+
+def refresh_trending_searches():
+    db_gen = get_db()
+    db: Session = next(db_gen)
+    try:
+        trending_searches.refresh(db)
+    finally:
+        db.close()
+
 scheduler = BackgroundScheduler()
-scheduler.add_job(send_daily_notifications, 'cron', hour=8)  # 8 صباحًا يوميًا
\ No newline at end of file
+scheduler.add_job(send_daily_notifications, 'cron', hour=8)  # 8 صباحًا يوميًا
+scheduler.add_job(flush_product_views, 'interval', seconds=settings.PRODUCT_VIEWS_FLUSH_SECONDS)  # حفظ المشاهدات المعلقة
+scheduler.add_job(flush_search_history, 'interval', seconds=settings.SEARCH_HISTORY_FLUSH_SECONDS)  # حفظ عمليات البحث المعلقة
+scheduler.add_job(purge_old_search_history, 'cron', hour=3)  # تنظيف سجل البحث القديم يوميًا
+scheduler.add_job(refresh_trending_searches, 'interval', seconds=settings.TRENDING_SEARCHES_REFRESH_SECONDS)  # تحديث الأكثر بحثاً
+scheduler.add_job(refresh_home_sections, 'interval', seconds=settings.HOME_SNAPSHOT_REFRESH_SECONDS)  # تحديث أقسام الصفحة الرئيسية
+scheduler.add_job(expire_service_offers, 'cron', hour=0, minute=0)  # إنهاء العروض المنتهية مع بداية كل يوم
+scheduler.add_job(expire_service_offers, 'date')  # مرة عند التشغيل (إذا كان السيرفر متوقف عند منتصف الليل)
+scheduler.add_job(purge_idempotency_keys, 'cron', hour=4)  # حذف مفاتيح Idempotency-Key المنتهية يوميًا
\ No newline at end of file
@@ -0,0 +1,9 @@
+# app/db/upsert.py
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def upsert(db: Session, table):
+    """INSERT يدعم ON CONFLICT حسب نوع قاعدة البيانات (PostgreSQL / SQLite)"""
+    dialect_insert = sqlite.insert if db.get_bind().dialect.name == "sqlite" else postgresql.insert
+    return dialect_insert(table)
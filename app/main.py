@@ -3,10 +3,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from app.core.config import settings
+from app.core.serialization import ORJSONResponse
+from app.core.compression import CompressionMiddleware
+from app.core.response_cache import ResponseCacheMiddleware
 from app.api.v1.api import api_router
 #from app.db.database import engine
 #from app.db.base import Base
-from app.core.tasks import scheduler
+from app.core.tasks import scheduler, flush_product_views, flush_search_history
 
 ## Create database tables
 #Base.metadata.create_all(bind=engine)
@@ -14,9 +17,15 @@ from app.core.tasks import scheduler
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    # orjson لكل الاستجابات (datetime/date/time/enum والنص العربي بدون escape)
+    default_response_class=ORJSONResponse,
 )
 
+# كاش استجابات الزوار (داخل CORS والضغط حتى تُضاف الـ headers الخاصة بكل طلب بعد الكاش)
+if settings.ANONYMOUS_RESPONSE_CACHE_ENABLED:
+    app.add_middleware(ResponseCacheMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +35,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ضغط الاستجابات الكبيرة (JSON بالعربي) للتطبيق
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESS_LEVEL,
+    content_types=settings.GZIP_CONTENT_TYPES,
+)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -43,4 +60,10 @@ async def root():
     }
 
 # ابدأ المهام المجدولة
-scheduler.start()
\ No newline at end of file
+scheduler.start()
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    # حفظ المشاهدات وعمليات البحث المعلقة قبل إيقاف السيرفر
+    flush_product_views()
+    flush_search_history()
@@ -14,9 +14,14 @@ from app.models.technician_task import TechnicianTask  # noqa: F401
 from app.models.user import User  # noqa: F401
 from app.models.water_quality import WaterQualityReading  # noqa: F401
 from app.models.cart_item import CartItem  # noqa: F401
-from app.models.order import Order  # noqa: F401
+from app.models.order import Order, OrderNumberCounter  # noqa: F401
 from app.models.order_item import OrderItem  # noqa: F401
 from app.models.search_history import SearchHistory  # noqa: F401
+from app.models.recent_search import RecentSearch  # noqa: F401
+from app.models.search_trend import SearchQueryDailyCount  # noqa: F401
 from app.models.faq import FAQ  # noqa: F401
 from app.models.privacy_policy import PrivacyPolicySection  # noqa: F401
-from app.models.why_us import WhyUsStat, WhyUsFeature  # noqa: F401
\ No newline at end of file
+from app.models.why_us import WhyUsStat, WhyUsFeature  # noqa: F401
+from app.models.idempotency_key import IdempotencyKey  # noqa: F401
+from app.models.order_summary import OrderSummary  # noqa: F401
+from app.models.order_event import OrderEvent  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class IdempotencyKey(Base):
+    """
+    الاستجابات المحفوظة لطلبات الإنشاء المرسلة مع Idempotency-Key
+    One row per (user, endpoint, key) - replayed when the client retries the same request
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "endpoint", "key", name="uq_idempotency_keys_user_endpoint_key"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    endpoint = Column(String(100), nullable=False)  # مثال: orders.create
+    key = Column(String(255), nullable=False)  # قيمة الـ header من العميل
+    request_hash = Column(String(64), nullable=False)  # بصمة جسم الطلب (نفس المفتاح مع طلب مختلف = خطأ)
+    
+    # الاستجابة المحفوظة
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=False)  # JSON
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    
+    # Relationships
+    user = relationship("User", back_populates="idempotency_keys")
+    
+    def __repr__(self):
+        return f"<IdempotencyKey user_id={self.user_id} endpoint={self.endpoint} key={self.key}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Sequence, Enum as SQLEnum, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -16,6 +16,19 @@ class PaymentMethod(str, enum.Enum):
     CASH_ON_DELIVERY = "cash_on_delivery"  # الدفع عند الاستلام
     ONLINE = "online"                      # الدفع الإلكتروني
 
+# تسلسل أرقام الطلبات (PostgreSQL) - يتم إنشاؤه مع create_all، ويتجاهله SQLite
+order_number_seq = Sequence("order_number_seq", metadata=Base.metadata)
+
+class OrderNumberCounter(Base):
+    """
+    عداد يومي لأرقام الطلبات لقواعد البيانات بدون sequences (مثل SQLite)
+    One row per day - incremented with an upsert inside the checkout transaction
+    """
+    __tablename__ = "order_number_counters"
+    
+    day = Column(Date, primary_key=True)
+    last_value = Column(Integer, nullable=False)
+
 class Order(Base):
     __tablename__ = "orders"
     
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, Text, Enum as SQLEnum
+from sqlalchemy.sql import func
+from app.db.base import Base
+from app.models.order import OrderStatus
+import enum
+
+class OrderEventType(str, enum.Enum):
+    CREATED = "created"                # إنشاء الطلب
+    STATUS_CHANGED = "status_changed"  # تغيير الحالة
+
+class OrderEvent(Base):
+    """
+    سجل أحداث الطلب (إضافة فقط - لا تعديل ولا حذف)
+    Append-only history of order status changes, also used for "changed since" polling
+    """
+    __tablename__ = "order_events"
+    __table_args__ = (
+        Index("ix_order_events_user_id", "user_id", "id"),  # مزامنة "ما تغير بعد الحدث X"
+        Index("ix_order_events_order_id", "order_id", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)  # صاحب الطلب
+    
+    event_type = Column(SQLEnum(OrderEventType), nullable=False)
+    from_status = Column(SQLEnum(OrderStatus), nullable=True)  # فارغ عند الإنشاء
+    to_status = Column(SQLEnum(OrderStatus), nullable=False)
+    
+    actor_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)  # من قام بالتغيير
+    note = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<OrderEvent order_id={self.order_id} {self.from_status} -> {self.to_status}>"
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, Enum as SQLEnum
+from app.db.base import Base
+from app.models.order import OrderStatus, PaymentMethod
+
+class OrderSummary(Base):
+    """
+    ملخص الطلب لشاشة "مشترياتي" (صف واحد لكل طلب)
+    Denormalized projection of orders + order_items - written at order creation and on status change
+    """
+    __tablename__ = "order_summaries"
+    __table_args__ = (
+        Index("ix_order_summaries_user_created", "user_id", "created_at"),
+    )
+    
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    order_number = Column(String(50), nullable=False)
+    
+    # من عناصر الطلب
+    items_count = Column(Integer, nullable=False)  # عدد العناصر
+    first_item_image_url = Column(String(500), nullable=True)  # صورة أول منتج
+    
+    # الإجماليات
+    total_amount = Column(Float, nullable=False)
+    delivery_fee = Column(Float, nullable=False, default=0.0)
+    grand_total = Column(Float, nullable=False)
+    
+    payment_method = Column(SQLEnum(PaymentMethod), nullable=False)
+    status = Column(SQLEnum(OrderStatus), nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), nullable=False)  # نفس تاريخ الطلب
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self):
+        return f"<OrderSummary {self.order_number} - {self.status}>"
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class RecentSearch(Base):
+    """
+    آخر عمليات البحث المميزة لكل مستخدم (صف واحد لكل عبارة بحث)
+    One row per (user, query) - upserted from the search history writer
+    """
+    __tablename__ = "recent_searches"
+    __table_args__ = (
+        UniqueConstraint("user_id", "search_query", name="uq_recent_searches_user_query"),
+        Index("ix_recent_searches_user_last_searched", "user_id", "last_searched_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    search_query = Column(String(200), nullable=False)
+    search_count = Column(Integer, default=1, nullable=False)  # عدد مرات البحث
+    
+    last_searched_at = Column(DateTime(timezone=True), nullable=False)  # آخر مرة
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    # Relationships
+    user = relationship("User", back_populates="recent_searches")
+    
+    def __repr__(self):
+        return f"<RecentSearch user_id={self.user_id} query={self.search_query}>"
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Date, UniqueConstraint
+from app.db.base import Base
+
+class SearchQueryDailyCount(Base):
+    """
+    عدد مرات البحث عن كل عبارة في اليوم (يُحدّث تدريجياً من كاتب تاريخ البحث)
+    Daily rollup used to compute trending searches without rescanning search_history
+    """
+    __tablename__ = "search_query_daily_counts"
+    __table_args__ = (
+        UniqueConstraint("day", "search_query", name="uq_search_query_daily_counts_day_query"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    search_query = Column(String(200), nullable=False)  # العبارة بعد التوحيد (lowercase)
+    search_count = Column(Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f"<SearchQueryDailyCount {self.day} query={self.search_query} count={self.search_count}>"
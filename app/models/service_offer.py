@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Date, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Date, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
+from datetime import date
+from typing import Optional
 import enum
 
 class OfferStatus(str, enum.Enum):
@@ -68,4 +70,32 @@ class ServiceOffer(Base):
             return int(self.original_price - discount_amount)
         elif self.discount_type == DiscountType.FIXED:
             return int(self.original_price - self.discount_value)
-        return self.original_price
\ No newline at end of file
+        return self.original_price
+    
+    def expire_if_ended(self, today: Optional[date] = None):
+        """
+        تحويل العرض النشط إلى منتهي إذا انتهى تاريخه (نفس قاعدة مهمة expire_service_offers)
+        العروض غير النشطة (INACTIVE) تبقى كما هي - حالة اختارها الأدمن
+        """
+        today = today or date.today()
+        if self.status == OfferStatus.ACTIVE and self.end_date and self.end_date < today:
+            self.status = OfferStatus.EXPIRED
+
+    def reactivate_if_extended(self, today: Optional[date] = None):
+        """إرجاع العرض المنتهي إلى نشط إذا تم تمديد تاريخ انتهائه"""
+        today = today or date.today()
+        if self.status == OfferStatus.EXPIRED and (self.end_date is None or self.end_date >= today):
+            self.status = OfferStatus.ACTIVE
+
+
+# العروض المتاحة حالياً فقط (status = ACTIVE) بنفس ترتيب العرض في الصفحة الرئيسية
+# العروض المنتهية تتحول إلى EXPIRED يومياً (expire_service_offers) فلا حاجة لفحص end_date في الاستعلام
+_live_offer_condition = ServiceOffer.status == OfferStatus.ACTIVE
+Index(
+    "ix_service_offers_live",
+    ServiceOffer.is_featured,
+    ServiceOffer.sort_order.desc(),
+    ServiceOffer.created_at.desc(),
+    postgresql_where=_live_offer_condition,
+    sqlite_where=_live_offer_condition,
+)
@@ -48,4 +48,6 @@ class User(Base):
     )
     cart_items = relationship("CartItem", back_populates="user", cascade="all, delete-orphan")
     orders = relationship("Order", back_populates="user", cascade="all, delete-orphan")
-    search_history = relationship("SearchHistory", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    search_history = relationship("SearchHistory", back_populates="user", cascade="all, delete-orphan")
+    recent_searches = relationship("RecentSearch", back_populates="user", cascade="all, delete-orphan")
+    idempotency_keys = relationship("IdempotencyKey", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 from datetime import datetime
+import enum
 
 class CartItemBase(BaseModel):
     product_id: int
@@ -25,6 +26,12 @@ class CartItemResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CartSummaryResponse(BaseModel):
+    total_items: int  # عدد المنتجات
+    total_amount: float  # الإجمالي
+    delivery_fee: float = 0.0
+    grand_total: float  # الإجمالي الكلي
+
 class CartResponse(BaseModel):
     items: list[CartItemResponse]
     total_items: int  # عدد المنتجات
@@ -32,3 +39,22 @@ class CartResponse(BaseModel):
     delivery_fee: float = 0.0
     grand_total: float  # الإجمالي الكلي
 
+class CartOperationType(str, enum.Enum):
+    ADD = "add"         # إضافة كمية (أو إضافة المنتج إذا لم يكن في السلة)
+    UPDATE = "update"   # تعيين الكمية
+    REMOVE = "remove"   # حذف المنتج من السلة
+
+class CartOperation(BaseModel):
+    op: CartOperationType
+    product_id: int
+    quantity: Optional[int] = Field(None, ge=1, description="الكمية (مطلوبة لـ add و update)")
+    
+    @model_validator(mode="after")
+    def validate_quantity(self):
+        """الكمية مطلوبة للإضافة والتحديث"""
+        if self.op in (CartOperationType.ADD, CartOperationType.UPDATE) and self.quantity is None:
+            raise ValueError('quantity مطلوبة لعمليات add و update')
+        return self
+
+class CartBatchUpdate(BaseModel):
+    operations: List[CartOperation] = Field(..., min_length=1, max_length=100, description="العمليات بالترتيب")
@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 from app.models.order import OrderStatus, PaymentMethod
+from app.models.order_event import OrderEventType
 
 class OrderItemResponse(BaseModel):
     id: int
@@ -46,8 +47,25 @@ class OrderSummaryResponse(BaseModel):
     grand_total: float
     status: OrderStatus
     items_count: int
+    first_item_image_url: Optional[str] = None  # صورة أول منتج في الطلب
     payment_method: PaymentMethod
     
     class Config:
         from_attributes = True
 
+class OrderStatusUpdate(BaseModel):
+    status: OrderStatus = Field(..., description="الحالة الجديدة")
+    note: Optional[str] = Field(None, max_length=500, description="ملاحظة تظهر في سجل الطلب")
+
+class OrderEventResponse(BaseModel):
+    id: int
+    order_id: int
+    order_number: str
+    event_type: OrderEventType
+    from_status: Optional[OrderStatus]
+    to_status: OrderStatus
+    note: Optional[str]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
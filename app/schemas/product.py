@@ -62,4 +62,25 @@ class ProductResponse(ProductBase):
 
 # Response with Category Details
 class ProductDetailResponse(ProductResponse):
-    category_name: Optional[str] = None
\ No newline at end of file
+    category_name: Optional[str] = None
+
+# Facets (عدّادات الفلاتر)
+class CategoryFacet(BaseModel):
+    category_id: int
+    category_name: Optional[str] = None
+    count: int
+
+class PriceRangeFacet(BaseModel):
+    min_price: int
+    max_price: Optional[int] = None  # None = بدون حد أعلى
+    count: int
+
+class BooleanFacet(BaseModel):
+    value: bool
+    count: int
+
+class ProductFacetsResponse(BaseModel):
+    total: int
+    categories: List[CategoryFacet] = []
+    price_ranges: List[PriceRangeFacet] = []
+    free_delivery: List[BooleanFacet] = []
@@ -14,3 +14,6 @@ class SearchSuggestionResponse(BaseModel):
     query: str
     created_at: datetime
 
+class TrendingSearchResponse(BaseModel):
+    search_query: str
+    search_count: int
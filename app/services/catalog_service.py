@@ -0,0 +1,47 @@
+from typing import List
+from sqlalchemy.orm import Session
+from app.models.category import Category
+from app.models.product import Product
+from app.models.service import Service
+from app.models.service_offer import ServiceOffer
+from app.schemas.product import ProductDetailResponse
+from app.schemas.service_offer import ServiceOfferDetailResponse
+from app.core.serialization import response_columns, construct_row, construct_rows
+
+# أعمدة العرض التي تحتاجها الاستجابة فقط + اسم الخدمة في نفس الاستعلام
+OFFER_DETAIL_COLUMNS = response_columns(ServiceOfferDetailResponse, ServiceOffer)
+
+# أعمدة المنتج التي تحتاجها الاستجابة فقط + اسم الفئة في نفس الاستعلام
+PRODUCT_DETAIL_COLUMNS = response_columns(ProductDetailResponse, Product)
+
+
+def offer_detail_query(db: Session):
+    """استعلام العروض مع اسم الخدمة (JOIN بدلاً من تحميل الخدمة لكل عرض)"""
+    return db.query(
+        *OFFER_DETAIL_COLUMNS,
+        Service.name_ar.label("service_name"),
+    ).outerjoin(Service, ServiceOffer.service_id == Service.id)
+
+
+def offer_detail_from_row(row) -> ServiceOfferDetailResponse:
+    return construct_row(ServiceOfferDetailResponse, row)
+
+
+def offer_details_from_rows(rows) -> List[ServiceOfferDetailResponse]:
+    return construct_rows(ServiceOfferDetailResponse, rows)
+
+
+def product_detail_query(db: Session):
+    """استعلام المنتجات مع اسم الفئة في نفس الاستعلام (JOIN بدلاً من تحميل الفئة لكل منتج)"""
+    return db.query(
+        *PRODUCT_DETAIL_COLUMNS,
+        Category.name_ar.label("category_name"),
+    ).outerjoin(Category, Product.category_id == Category.id)
+
+
+def product_detail_from_row(row, **overrides) -> ProductDetailResponse:
+    return construct_row(ProductDetailResponse, row, **overrides)
+
+
+def product_details_from_rows(rows) -> List[ProductDetailResponse]:
+    return construct_rows(ProductDetailResponse, rows)
@@ -0,0 +1,337 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import desc, func
+from sqlalchemy.orm import Session
+
+from app.models.service_offer import OfferStatus, ServiceOffer
+from app.schemas.service_offer import ServiceOfferDetailResponse
+from app.models.comment import Comment
+from app.models.user import User
+from app.models.enums import UserRole, BookingType, BookingStatus
+from app.models.booking import Booking
+from app.models.product import Product, ProductStatus
+from app.schemas.product import ProductDetailResponse
+from app.schemas.comment import CommentResponse, CommentsListResponse
+from app.schemas.account import ProjectResponse
+from app.core.config import settings
+from app.core.cache import reference_cache, HOME
+from app.services.catalog_service import (
+    offer_detail_query,
+    offer_details_from_rows,
+    product_detail_query,
+    product_details_from_rows,
+)
+
+
+def fetch_featured_service_offers(limit: int, db: Session) -> List[ServiceOfferDetailResponse]:
+    """
+    جلب عروض الخدمات (للإنشاء والصيانة) - لصاحب الحمام وممثل الشركة
+    Fetch service offers (construction & maintenance) - for Pool Owner and Company
+    """
+    # العروض المنتهية تتحول إلى EXPIRED تلقائياً - الاستعلام يستخدم الفهرس ix_service_offers_live
+    rows = (
+        offer_detail_query(db)
+        .filter(
+            ServiceOffer.is_featured == True,
+            ServiceOffer.status == OfferStatus.ACTIVE,
+        )
+        .order_by(
+            desc(ServiceOffer.sort_order),
+            desc(ServiceOffer.created_at),
+        )
+        .limit(limit)
+        .all()
+    )
+
+    return offer_details_from_rows(rows)
+
+
+def fetch_featured_products(limit: int, db: Session) -> List[ProductDetailResponse]:
+    """
+    جلب المنتجات المميزة من المتجر - للفني
+    Fetch featured products from store - for Technician
+    """
+    rows = (
+        product_detail_query(db)
+        .filter(
+            Product.is_featured == True,
+            Product.status == ProductStatus.ACTIVE,
+        )
+        .order_by(
+            desc(Product.sort_order),
+            desc(Product.created_at),
+        )
+        .limit(limit)
+        .all()
+    )
+
+    return product_details_from_rows(rows)
+
+
+def fetch_home_stats(db: Session):
+    from app.models.service import Service, ServiceStatus
+
+    active_offers_count = (
+        db.query(func.count(ServiceOffer.id))
+        .filter(ServiceOffer.status == OfferStatus.ACTIVE)
+        .scalar()
+    )
+
+    active_services_count = (
+        db.query(Service)
+        .filter(Service.status == ServiceStatus.ACTIVE)
+        .count()
+    )
+
+    return {
+        "active_offers": active_offers_count,
+        "active_services": active_services_count,
+        "message": "مرحباً بك في Plupool! 🏊",
+    }
+
+
+def relative_time(created_at: datetime) -> str:
+    """
+    حساب الوقت النسبي (مثل "منذ ساعتين")
+    Calculate relative time (e.g., "منذ ساعتين")
+    """
+    now = datetime.now()
+    if created_at.tzinfo:
+        now = datetime.now(created_at.tzinfo)
+    
+    diff = now - created_at
+    
+    if diff.days > 365:
+        years = diff.days // 365
+        return f"منذ {years} {'سنة' if years == 1 else 'سنوات'}"
+    elif diff.days > 30:
+        months = diff.days // 30
+        return f"منذ {months} {'شهر' if months == 1 else 'أشهر'}"
+    elif diff.days > 0:
+        return f"منذ {diff.days} {'يوم' if diff.days == 1 else 'أيام'}"
+    elif diff.seconds > 3600:
+        hours = diff.seconds // 3600
+        return f"منذ {hours} {'ساعة' if hours == 1 else 'ساعات'}"
+    elif diff.seconds > 60:
+        minutes = diff.seconds // 60
+        return f"منذ {minutes} {'دقيقة' if minutes == 1 else 'دقائق'}"
+    else:
+        return "الآن"
+
+
+def fetch_home_projects(limit: int, db: Session) -> List[ProjectResponse]:
+    """
+    جلب المشاريع المميزة (مشاريع إنشاء المسابح المكتملة أو قيد التنفيذ)
+    Fetch featured construction projects
+    """
+    # جلب الحجوزات من نوع إنشاء مسبح (مشاريع)
+    # نعرض المشاريع المكتملة أو قيد التنفيذ فقط
+    bookings = (
+        db.query(Booking)
+        .filter(
+            Booking.booking_type == BookingType.CONSTRUCTION,
+            Booking.status.in_([BookingStatus.IN_PROGRESS, BookingStatus.COMPLETED])
+        )
+        .order_by(Booking.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+    
+    projects = []
+    for booking in bookings:
+        # استخراج اسم المشروع
+        project_name = None
+        if booking.pool_type:
+            project_name = booking.pool_type.name_ar
+        elif booking.admin_notes:
+            # إذا كان فيه admin_notes، نستخدمه كاسم المشروع
+            project_name = booking.admin_notes.split('\n')[0] if '\n' in booking.admin_notes else booking.admin_notes
+        else:
+            project_name = "مشروع إنشاء مسبح"
+        
+        # استخراج الوصف من admin_notes أو استخدام وصف افتراضي
+        description = None
+        if booking.admin_notes and '\n' in booking.admin_notes:
+            description = '\n'.join(booking.admin_notes.split('\n')[1:])
+        elif booking.admin_notes:
+            description = booking.admin_notes
+        else:
+            description = "تصميم فاخر مع ضمان 10 سنوات وصيانة مجانية لمدة 3 شهور"
+        
+        # صورة المشروع
+        project_image = booking.project_image if booking.project_image else None
+        
+        # حساب نسبة الإنجاز
+        completion_percentage = 100.0 if booking.status == BookingStatus.COMPLETED else 50.0
+        
+        # الموقع
+        location = booking.user.address if booking.user else None
+        
+        # تاريخ البدء والانتهاء
+        start_date = str(booking.booking_date) if booking.booking_date else None
+        end_date = str(booking.next_maintenance_date) if booking.next_maintenance_date else None
+        
+        projects.append(
+            ProjectResponse(
+                booking_id=booking.id,
+                project_name=project_name,
+                location=location,
+                pools_count=1,  # افتراضي - يمكن تحسينه لاحقاً
+                completion_percentage=completion_percentage,
+                status=booking.status.value,
+                start_date=start_date,
+                end_date=end_date,
+                next_visit=None,  # للصفحة الرئيسية مش محتاجين next_visit
+                image_url=project_image,  # صورة المشروع
+            )
+        )
+    
+    return projects
+
+
+def fetch_comments(
+    service_id: Optional[int],
+    booking_id: Optional[int],
+    sort_by: str,
+    skip: int,
+    limit: int,
+    db: Session,
+) -> CommentsListResponse:
+    """
+    جلب التعليقات والتقييمات مع المتوسط والعدد الإجمالي
+    Fetch comments with average rating and total count
+    """
+    query = db.query(Comment).join(User, Comment.user_id == User.id)
+    
+    # فلترة حسب service_id
+    if service_id:
+        query = query.filter(Comment.service_id == service_id)
+    
+    # فلترة حسب booking_id
+    if booking_id:
+        query = query.filter(Comment.booking_id == booking_id)
+    
+    # إذا لم يتم تحديد service_id أو booking_id، عرض التعليقات العامة فقط
+    if not service_id and not booking_id:
+        query = query.filter(
+            Comment.service_id.is_(None),
+            Comment.booking_id.is_(None)
+        )
+    
+    # حساب المتوسط
+    avg_rating = query.with_entities(func.avg(Comment.rating)).scalar()
+    average_rating = round(float(avg_rating), 1) if avg_rating else None
+    
+    # الحصول على العدد الإجمالي
+    total = query.count()
+    
+    # الترتيب حسب الخيار المحدد
+    if sort_by == "newest" or sort_by == "all":
+        # الأحدث أولاً (افتراضي)
+        comments = query.order_by(desc(Comment.created_at)).offset(skip).limit(limit).all()
+    elif sort_by == "oldest":
+        # الأقدم أولاً
+        comments = query.order_by(Comment.created_at).offset(skip).limit(limit).all()
+    elif sort_by == "highest_rating":
+        # الأعلى تقييماً أولاً
+        comments = query.order_by(desc(Comment.rating), desc(Comment.created_at)).offset(skip).limit(limit).all()
+    elif sort_by == "lowest_rating":
+        # الأقل تقييماً أولاً
+        comments = query.order_by(Comment.rating, desc(Comment.created_at)).offset(skip).limit(limit).all()
+    else:
+        # افتراضي: الأحدث أولاً
+        comments = query.order_by(desc(Comment.created_at)).offset(skip).limit(limit).all()
+    
+    # تحويل إلى response
+    comments_list = []
+    for comment in comments:
+        comments_list.append(
+            CommentResponse(
+                id=comment.id,
+                user_id=comment.user_id,
+                user_name=comment.user.full_name if comment.user else "مستخدم Plupool",
+                user_avatar=comment.user.profile_image if comment.user else None,
+                content=comment.content,
+                rating=comment.rating,
+                service_id=comment.service_id,
+                booking_id=comment.booking_id,
+                created_at=comment.created_at,
+                relative_time=relative_time(comment.created_at),
+            )
+        )
+    
+    return CommentsListResponse(
+        comments=comments_list,
+        total=total,
+        average_rating=average_rating,
+        sort_by=sort_by,
+    )
+
+
+# ============= Home Snapshot (أقسام الصفحة الرئيسية في الذاكرة) =============
+# الأقسام المشتركة تُحسب في الخلفية لكل دور وتُقدّم من الذاكرة
+# الفرق الوحيد بين المستخدمين هو الدور (الفني يرى المنتجات، والباقي يرى عروض الخدمات)
+
+HOME_ROLE_TECHNICIAN = "technician"
+HOME_ROLE_DEFAULT = "default"
+
+# القيم الافتراضية التي يرسلها التطبيق (يتم تحديثها في الخلفية)
+DEFAULT_FEATURED_LIMIT = 6
+DEFAULT_PROJECTS_LIMIT = 6
+DEFAULT_COMMENTS_QUERY = (None, None, "all", 0, 20)
+
+
+def home_role_key(user: Optional[User]) -> str:
+    if user and user.role == UserRole.TECHNICIAN:
+        return HOME_ROLE_TECHNICIAN
+    return HOME_ROLE_DEFAULT
+
+
+def fetch_featured_for_role(role_key: str, limit: int, db: Session):
+    # إذا كان المستخدم فني، نعرض المنتجات
+    if role_key == HOME_ROLE_TECHNICIAN:
+        return fetch_featured_products(limit, db)
+    # لصاحب الحمام وممثل الشركة والزوار: نعرض عروض الخدمات
+    return fetch_featured_service_offers(limit, db)
+
+
+def home_snapshot_ttl() -> int:
+    # ضعف فترة التحديث - إذا توقف التحديث في الخلفية تنتهي القيم القديمة
+    return settings.HOME_SNAPSHOT_REFRESH_SECONDS * 2
+
+
+def home_section(key: tuple, loader):
+    return reference_cache.get_or_load(HOME, key, loader, ttl_seconds=home_snapshot_ttl())
+
+
+def refresh_home_snapshot(db: Session) -> None:
+    """
+    إعادة حساب أقسام الصفحة الرئيسية الافتراضية لكل دور واستبدالها في الذاكرة
+    الإصدار يُقرأ قبل التحميل - إذا تم الإبطال أثناء التحميل لا تُحفظ النتائج القديمة
+    """
+    ttl = home_snapshot_ttl()
+    version = reference_cache.version(HOME)
+    for role_key in (HOME_ROLE_TECHNICIAN, HOME_ROLE_DEFAULT):
+        reference_cache.put(
+            HOME,
+            ("featured_offers", role_key, DEFAULT_FEATURED_LIMIT),
+            fetch_featured_for_role(role_key, DEFAULT_FEATURED_LIMIT, db),
+            ttl_seconds=ttl,
+            version=version,
+        )
+    reference_cache.put(HOME, ("home_stats",), fetch_home_stats(db), ttl_seconds=ttl, version=version)
+    reference_cache.put(
+        HOME,
+        ("projects", DEFAULT_PROJECTS_LIMIT),
+        fetch_home_projects(DEFAULT_PROJECTS_LIMIT, db),
+        ttl_seconds=ttl,
+        version=version,
+    )
+    reference_cache.put(
+        HOME,
+        ("comments", *DEFAULT_COMMENTS_QUERY),
+        fetch_comments(*DEFAULT_COMMENTS_QUERY, db),
+        ttl_seconds=ttl,
+        version=version,
+    )
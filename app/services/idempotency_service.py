@@ -0,0 +1,135 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, NamedTuple, Optional
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+from app.core.serialization import dump_json
+from app.models.idempotency_key import IdempotencyKey
+
+# أقصى طول لقيمة Idempotency-Key (نفس طول العمود)
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# header يوضح للعميل أن الاستجابة محفوظة من طلب سابق
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotentRequest(NamedTuple):
+    """طلب إنشاء مرسل مع Idempotency-Key"""
+    user_id: int
+    endpoint: str
+    key: str
+    request_hash: str
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: int
+    body: bytes
+
+
+class IdempotencyStore:
+    """
+    مخزن مفاتيح Idempotency-Key:
+    - جدول idempotency_keys (مشترك بين العمليات) مع مدة صلاحية IDEMPOTENCY_KEY_TTL_HOURS
+    - كاش في الذاكرة أمام الجدول حتى تكون إعادة المحاولة بحثاً في الذاكرة فقط
+    الاستجابة تُحفظ في نفس الـ transaction مع الطلب/الحجز - إما الاثنان أو لا شيء
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 4096):
+        self.ttl_seconds = ttl_seconds
+        self._recent = TTLCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+    def request(
+        self, key: Optional[str], user_id: int, endpoint: str, payload: BaseModel
+    ) -> Optional[IdempotentRequest]:
+        """تجهيز الطلب من الـ header (None إذا لم يرسل العميل مفتاحاً)"""
+        if key is None:
+            return None
+        key = key.strip()
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Idempotency-Key يجب أن يكون بين 1 و {IDEMPOTENCY_KEY_MAX_LENGTH} حرفاً"
+            )
+        request_hash = hashlib.blake2b(dump_json(payload.model_dump()), digest_size=32).hexdigest()
+        return IdempotentRequest(user_id=user_id, endpoint=endpoint, key=key, request_hash=request_hash)
+
+    def replay(self, db: Session, request: Optional[IdempotentRequest]) -> Optional[Response]:
+        """الاستجابة المحفوظة لنفس المفتاح إن وجدت (الذاكرة أولاً ثم الجدول)"""
+        if request is None:
+            return None
+
+        cache_key = (request.user_id, request.endpoint, request.key)
+        stored = self._recent.get(cache_key)
+        if stored is MISSING:
+            row = db.query(
+                IdempotencyKey.request_hash,
+                IdempotencyKey.status_code,
+                IdempotencyKey.response_body,
+                IdempotencyKey.expires_at,
+            ).filter(
+                IdempotencyKey.user_id == request.user_id,
+                IdempotencyKey.endpoint == request.endpoint,
+                IdempotencyKey.key == request.key,
+                IdempotencyKey.expires_at > datetime.now(timezone.utc),
+            ).first()
+            if row is None:
+                return None
+            stored = StoredResponse(row.request_hash, row.status_code, row.response_body.encode("utf-8"))
+            expires_at = row.expires_at
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+            self._recent.set(cache_key, stored, ttl_seconds=max(remaining, 0))
+
+        if stored.request_hash != request.request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key مستخدم مسبقاً مع طلب مختلف"
+            )
+        return Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            media_type="application/json",
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    def record(
+        self, db: Session, request: Optional[IdempotentRequest], status_code: int, content: Any
+    ) -> Optional[StoredResponse]:
+        """
+        حفظ الاستجابة في نفس الـ transaction (قبل الـ commit)
+        طلب متزامن بنفس المفتاح يفشل بـ IntegrityError على القيد الفريد
+        """
+        if request is None:
+            return None
+        stored = StoredResponse(request.request_hash, status_code, dump_json(content))
+        db.add(IdempotencyKey(
+            user_id=request.user_id,
+            endpoint=request.endpoint,
+            key=request.key,
+            request_hash=request.request_hash,
+            status_code=status_code,
+            response_body=stored.body.decode("utf-8"),
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds),
+        ))
+        return stored
+
+    def remember(self, request: Optional[IdempotentRequest], stored: Optional[StoredResponse]) -> None:
+        """إضافة الاستجابة للكاش بعد نجاح الـ commit"""
+        if request is None or stored is None:
+            return
+        self._recent.set((request.user_id, request.endpoint, request.key), stored)
+
+
+idempotency_store = IdempotencyStore(ttl_seconds=settings.IDEMPOTENCY_KEY_TTL_HOURS * 3600)
+
+
+def purge_expired_idempotency_keys(db: Session) -> int:
+    """حذف المفاتيح المنتهية في DELETE واحد (على فهرس expires_at)"""
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.now(timezone.utc)))
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,56 @@
+from typing import Dict, List
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+from app.models.product import Product, ProductStatus
+from app.models.order_item import OrderItem
+
+
+def reserve_stock(db: Session, quantities: Dict[int, int]) -> List[int]:
+    """
+    حجز المخزون لعدة منتجات في UPDATE شرطي واحد:
+    UPDATE products SET stock_quantity = stock_quantity - :q
+    WHERE id IN (...) AND status = 'active' AND stock_quantity >= :q
+    الشرط والخصم في نفس الجملة - لا يمكن لطلبين متزامنين بيع نفس الكمية
+    لا يتم الـ commit هنا - يتم مع الطلب في نفس الـ transaction
+    Returns: معرفات المنتجات التي لم يكفِ مخزونها (قائمة فارغة = تم الحجز)
+    """
+    if not quantities:
+        return []
+
+    products = Product.__table__
+    requested = case(quantities, value=products.c.id)
+    result = db.execute(
+        update(products)
+        .where(
+            products.c.id.in_(list(quantities)),
+            products.c.status == ProductStatus.ACTIVE,
+            products.c.stock_quantity >= requested,
+        )
+        .values(stock_quantity=products.c.stock_quantity - requested)
+        .returning(products.c.id)
+    )
+    reserved = {row.id for row in result}
+    return [product_id for product_id in quantities if product_id not in reserved]
+
+
+def release_order_stock(db: Session, order_id: int) -> int:
+    """
+    إرجاع كميات عناصر الطلب للمخزون (عند الإلغاء) في UPDATE واحد:
+    UPDATE products SET stock_quantity = stock_quantity + (SUM كمية المنتج في الطلب)
+    WHERE id IN (منتجات الطلب)
+    لا يتم الـ commit هنا - يتم مع تغيير حالة الطلب في نفس الـ transaction
+    Returns: عدد المنتجات التي تم تحديثها
+    """
+    products = Product.__table__
+    items = OrderItem.__table__
+    returned = (
+        select(func.sum(items.c.quantity))
+        .where(items.c.order_id == order_id, items.c.product_id == products.c.id)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(products)
+        .where(products.c.id.in_(select(items.c.product_id).where(items.c.order_id == order_id)))
+        .values(stock_quantity=products.c.stock_quantity + returned)
+    )
+    return result.rowcount
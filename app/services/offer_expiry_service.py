@@ -0,0 +1,28 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.models.service_offer import ServiceOffer, OfferStatus
+from app.core.cache import reference_cache, OFFERS, HOME
+
+
+def expire_ended_offers(db: Session, today: Optional[date] = None) -> int:
+    """
+    تحويل العروض النشطة التي انتهى تاريخها إلى EXPIRED في UPDATE واحد
+    بعدها تكفي الحالة (status = ACTIVE) لمعرفة العروض المتاحة بدون فحص end_date
+    العروض غير النشطة (INACTIVE) لا تتغير - حالة اختارها الأدمن
+    Returns: عدد العروض التي تم تحويلها
+    """
+    today = today or date.today()
+    result = db.execute(
+        update(ServiceOffer)
+        .where(
+            ServiceOffer.status == OfferStatus.ACTIVE,
+            ServiceOffer.end_date < today,
+        )
+        .values(status=OfferStatus.EXPIRED)
+    )
+    db.commit()
+    if result.rowcount:
+        reference_cache.invalidate(OFFERS, HOME)
+    return result.rowcount
@@ -0,0 +1,34 @@
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.db.upsert import upsert
+from app.models.order import OrderNumberCounter, order_number_seq
+
+
+def _next_daily_counter(db: Session, day: date) -> int:
+    """
+    الرقم التالي في عداد اليوم (UPSERT واحد مع RETURNING)
+    صف اليوم يبقى مقفلاً حتى نهاية الـ transaction - لا يأخذ طلبان نفس الرقم
+    """
+    counters = OrderNumberCounter.__table__
+    stmt = upsert(db, counters).values(day=day, last_value=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day"],
+        set_={"last_value": counters.c.last_value + 1},
+    ).returning(counters.c.last_value)
+    return db.execute(stmt).scalar_one()
+
+
+def generate_order_number(db: Session, today: Optional[date] = None) -> str:
+    """
+    رقم طلب فريد ومقروء: # + التاريخ + رقم تسلسلي من 6 أرقام
+    مثال: #20261019000123
+    - PostgreSQL: رقم من order_number_seq (بدون تعارض بين العمليات أو السيرفرات)
+    - غير ذلك: عداد يومي في جدول order_number_counters
+    """
+    today = today or datetime.now().date()
+    if db.get_bind().dialect.supports_sequences:
+        serial = db.scalar(order_number_seq.next_value())
+    else:
+        serial = _next_daily_counter(db, today)
+    return f"#{today:%Y%m%d}{serial:06d}"
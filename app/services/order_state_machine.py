@@ -0,0 +1,135 @@
+from datetime import datetime
+from typing import Dict, FrozenSet, NamedTuple, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+from app.models.order import Order, OrderStatus
+from app.models.order_event import OrderEvent, OrderEventType
+from app.services.order_summary_service import update_order_summary_status
+from app.services.inventory_service import release_order_stock
+
+# الانتقالات المسموحة لحالة الطلب (DELIVERED و CANCELLED حالات نهائية)
+ORDER_TRANSITIONS: Dict[OrderStatus, FrozenSet[OrderStatus]] = {
+    OrderStatus.PENDING: frozenset({OrderStatus.CONFIRMED, OrderStatus.CANCELLED}),
+    OrderStatus.CONFIRMED: frozenset({OrderStatus.PROCESSING, OrderStatus.CANCELLED}),
+    OrderStatus.PROCESSING: frozenset({OrderStatus.SHIPPED, OrderStatus.CANCELLED}),
+    OrderStatus.SHIPPED: frozenset({OrderStatus.DELIVERED}),
+    OrderStatus.DELIVERED: frozenset(),
+    OrderStatus.CANCELLED: frozenset(),
+}
+
+
+class OrderTransition(NamedTuple):
+    """نتيجة تغيير حالة الطلب - نفس بيانات الحدث المسجل"""
+    event_id: int
+    order_id: int
+    order_number: str
+    event_type: OrderEventType
+    from_status: Optional[OrderStatus]
+    to_status: OrderStatus
+    note: Optional[str]
+    created_at: datetime
+
+
+def can_transition(current: OrderStatus, new_status: OrderStatus) -> bool:
+    return new_status in ORDER_TRANSITIONS.get(current, frozenset())
+
+
+def record_order_event(
+    db: Session,
+    order_id: int,
+    user_id: int,
+    event_type: OrderEventType,
+    to_status: OrderStatus,
+    from_status: Optional[OrderStatus] = None,
+    actor_id: Optional[int] = None,
+    note: Optional[str] = None,
+):
+    """
+    إضافة حدث لسجل الطلب (INSERT فقط - السجل لا يُعدل)
+    لا يتم الـ commit هنا - يتم مع التغيير نفسه في نفس الـ transaction
+    Returns: (id, created_at) للحدث
+    """
+    events = OrderEvent.__table__
+    return db.execute(
+        insert(events)
+        .values(
+            order_id=order_id,
+            user_id=user_id,
+            event_type=event_type,
+            from_status=from_status,
+            to_status=to_status,
+            actor_id=actor_id,
+            note=note,
+        )
+        .returning(events.c.id, events.c.created_at)
+    ).one()
+
+
+def transition_order_status(
+    db: Session,
+    order_id: int,
+    new_status: OrderStatus,
+    actor_id: Optional[int] = None,
+    note: Optional[str] = None,
+) -> OrderTransition:
+    """
+    تغيير حالة الطلب حسب ORDER_TRANSITIONS:
+    UPDATE orders SET status = :new ... WHERE id = :id AND status = :current
+    الشرط على الحالة الحالية يمنع تغييرين متزامنين من البناء على نفس الحالة
+    مع الحدث في order_events وتحديث order_summaries - بدون commit
+    عند الإلغاء: إرجاع كميات الطلب للمخزون في نفس الـ transaction
+    """
+    current = db.query(Order.user_id, Order.order_number, Order.status).filter(Order.id == order_id).first()
+    if not current:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="الطلب غير موجود"
+        )
+    
+    if not can_transition(current.status, new_status):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"لا يمكن تغيير حالة الطلب من {current.status.value} إلى {new_status.value}"
+        )
+    
+    values = {"status": new_status, "updated_at": func.now()}
+    if new_status == OrderStatus.DELIVERED:
+        values["delivered_at"] = func.now()
+    
+    result = db.execute(
+        update(Order.__table__)
+        .where(Order.id == order_id, Order.status == current.status)
+        .values(**values)
+    )
+    if result.rowcount == 0:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="تم تغيير حالة الطلب بالتزامن، حاول مرة أخرى"
+        )
+    
+    if new_status == OrderStatus.CANCELLED:
+        release_order_stock(db, order_id)
+    
+    event = record_order_event(
+        db,
+        order_id=order_id,
+        user_id=current.user_id,
+        event_type=OrderEventType.STATUS_CHANGED,
+        to_status=new_status,
+        from_status=current.status,
+        actor_id=actor_id,
+        note=note,
+    )
+    update_order_summary_status(db, order_id, new_status)
+    
+    return OrderTransition(
+        event_id=event.id,
+        order_id=order_id,
+        order_number=current.order_number,
+        event_type=OrderEventType.STATUS_CHANGED,
+        from_status=current.status,
+        to_status=new_status,
+        note=note,
+        created_at=event.created_at,
+    )
@@ -0,0 +1,92 @@
+from typing import Any, Dict, Sequence
+from sqlalchemy import exists, func, insert, select, update
+from sqlalchemy.orm import Session, aliased
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.order_summary import OrderSummary
+
+# ترتيب أعمدة INSERT ... SELECT في backfill_order_summaries
+SUMMARY_COLUMNS = [
+    "order_id",
+    "user_id",
+    "order_number",
+    "items_count",
+    "first_item_image_url",
+    "total_amount",
+    "delivery_fee",
+    "grand_total",
+    "payment_method",
+    "status",
+    "created_at",
+    "updated_at",
+]
+
+
+def write_order_summary(db: Session, order: Order, items_values: Sequence[Dict[str, Any]]) -> None:
+    """
+    كتابة ملخص الطلب عند إنشائه من البيانات الموجودة في الذاكرة (بدون استعلام إضافي)
+    لا يتم الـ commit هنا - يتم مع الطلب في نفس الـ transaction
+    """
+    db.execute(
+        insert(OrderSummary.__table__).values(
+            order_id=order.id,
+            user_id=order.user_id,
+            order_number=order.order_number,
+            items_count=len(items_values),
+            first_item_image_url=items_values[0]["product_image_url"] if items_values else None,
+            total_amount=order.total_amount,
+            delivery_fee=order.delivery_fee or 0.0,
+            grand_total=order.grand_total,
+            payment_method=order.payment_method,
+            status=order.status,
+            created_at=order.created_at,
+        )
+    )
+
+
+def update_order_summary_status(db: Session, order_id: int, new_status: OrderStatus) -> None:
+    """تحديث حالة الطلب في الملخص (يُستدعى مع كل تغيير لحالة الطلب، بدون commit)"""
+    db.execute(
+        update(OrderSummary.__table__)
+        .where(OrderSummary.order_id == order_id)
+        .values(status=new_status, updated_at=func.now())
+    )
+
+
+def backfill_order_summaries(db: Session) -> int:
+    """
+    إنشاء الملخصات الناقصة للطلبات القديمة في INSERT ... SELECT واحد
+    (الطلبات التي أُنشئت قبل جدول order_summaries) - لا يتم الـ commit هنا
+    Returns: عدد الملخصات التي تم إنشاؤها
+    """
+    items = (
+        select(
+            OrderItem.order_id,
+            func.count(OrderItem.id).label("items_count"),
+            func.min(OrderItem.id).label("first_item_id"),
+        )
+        .group_by(OrderItem.order_id)
+        .subquery()
+    )
+    first_item = aliased(OrderItem)
+    missing = (
+        select(
+            Order.id,
+            Order.user_id,
+            Order.order_number,
+            func.coalesce(items.c.items_count, 0),
+            first_item.product_image_url,
+            Order.total_amount,
+            func.coalesce(Order.delivery_fee, 0.0),
+            Order.grand_total,
+            Order.payment_method,
+            Order.status,
+            Order.created_at,
+            Order.updated_at,
+        )
+        .outerjoin(items, items.c.order_id == Order.id)
+        .outerjoin(first_item, first_item.id == items.c.first_item_id)
+        .where(~exists().where(OrderSummary.order_id == Order.id))
+    )
+    result = db.execute(insert(OrderSummary.__table__).from_select(SUMMARY_COLUMNS, missing))
+    return result.rowcount
@@ -0,0 +1,54 @@
+from typing import Iterable, List, NamedTuple
+from app.core.config import settings
+
+
+class CartLine(NamedTuple):
+    """بيانات عنصر السلة اللازمة للتسعير فقط"""
+    product_id: int
+    quantity: int
+    unit_price: float
+    free_delivery: bool
+
+
+class PricedLine(NamedTuple):
+    line: CartLine
+    total_price: float  # unit_price * quantity
+
+
+class CartPricing(NamedTuple):
+    lines: List[PricedLine]
+    total_items: int      # إجمالي الكمية
+    total_amount: float   # الإجمالي
+    delivery_fee: float   # رسوم التوصيل
+    grand_total: float    # الإجمالي الكلي
+
+
+def price_cart(lines: Iterable[CartLine]) -> CartPricing:
+    """
+    حساب إجماليات السلة في مرور واحد - نفس القواعد للسلة وملخص السلة وإنشاء الطلب:
+    - سعر العنصر = سعر الوحدة × الكمية
+    - رسوم التوصيل الافتراضية DEFAULT_DELIVERY_FEE
+    - إذا كان أي منتج توصيل مجاني، لا رسوم توصيل
+    - إذا كان الإجمالي 0، لا رسوم توصيل
+    """
+    priced: List[PricedLine] = []
+    total_items = 0
+    total_amount = 0.0
+    free_delivery = False
+
+    for line in lines:
+        total_price = float(line.unit_price * line.quantity)
+        priced.append(PricedLine(line=line, total_price=total_price))
+        total_items += line.quantity
+        total_amount += total_price
+        free_delivery = free_delivery or bool(line.free_delivery)
+
+    delivery_fee = 0.0 if free_delivery or total_amount == 0 else float(settings.DEFAULT_DELIVERY_FEE)
+
+    return CartPricing(
+        lines=priced,
+        total_items=total_items,
+        total_amount=total_amount,
+        delivery_fee=delivery_fee,
+        grand_total=total_amount + delivery_fee,
+    )
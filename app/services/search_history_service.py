@@ -0,0 +1,200 @@
+import threading
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+from sqlalchemy import delete, desc, func, insert, select
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+from app.models.search_history import SearchHistory
+from app.models.user import User
+from app.models.recent_search import RecentSearch
+from app.models.search_trend import SearchQueryDailyCount
+from app.services.trending_search_service import normalize_search_query
+from app.core.config import settings
+from app.db.upsert import upsert
+
+# نفس طول عمود search_query
+SEARCH_QUERY_MAX_LENGTH = 200
+
+
+class SearchHistoryWriter:
+    """
+    كاتب تاريخ البحث في الخلفية
+    Buffers search events in memory and writes them with bulk statements
+    """
+
+    def __init__(self, max_pending: int = 10000):
+        self._lock = threading.Lock()
+        # حماية الذاكرة - إذا تأخر الحفظ يتم تجاهل الأقدم
+        self._pending: deque = deque(maxlen=max_pending)
+
+    def record(self, user_id: int, search_query: str) -> None:
+        """تسجيل عملية بحث بدون الكتابة في قاعدة البيانات"""
+        search_query = search_query[:SEARCH_QUERY_MAX_LENGTH]
+        with self._lock:
+            self._pending.append((user_id, search_query, datetime.now(timezone.utc)))
+
+    def drain(self) -> List[Tuple[int, str, datetime]]:
+        """سحب جميع عمليات البحث المعلقة"""
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+        return pending
+
+    def restore(self, events: List[Tuple[int, str, datetime]]) -> None:
+        """إرجاع عمليات البحث للبافر في حالة فشل الحفظ"""
+        with self._lock:
+            self._pending = deque(events + list(self._pending), maxlen=self._pending.maxlen)
+
+    def flush(self, db: Session) -> int:
+        """
+        حفظ عمليات البحث المعلقة:
+        - INSERT مجمع في سجل البحث (search_history)
+        - UPSERT مجمع في آخر عمليات البحث (recent_searches)
+        - UPSERT مجمع في العدد اليومي لكل عبارة (search_query_daily_counts)
+        إذا فشلت الدفعة بسبب صفوف غير صالحة (مستخدم محذوف مثلاً) يتم تجاهل هذه الصفوف فقط
+        Returns: عدد عمليات البحث التي تم حفظها
+        """
+        events = self.drain()
+        if not events:
+            return 0
+
+        try:
+            self._write(db, events)
+            db.commit()
+            return len(events)
+        except (IntegrityError, DataError):
+            db.rollback()
+        except Exception:
+            db.rollback()
+            self.restore(events)
+            raise
+
+        # مرة واحدة فقط: حذف عمليات البحث لمستخدمين لم يعودوا موجودين ثم الحفظ صفاً صفاً
+        # الصف الذي يفشل مرة أخرى يتم تجاهله (لا يعود للبافر حتى لا تتكرر المحاولة للأبد)
+        return self._write_valid_events(db, events)
+
+    def _write_valid_events(self, db: Session, events: List[Tuple[int, str, datetime]]) -> int:
+        user_ids = {user_id for user_id, _, _ in events if user_id is not None}
+        existing = set(db.scalars(select(User.id).where(User.id.in_(user_ids)))) if user_ids else set()
+        events = [event for event in events if event[0] is None or event[0] in existing]
+
+        saved = 0
+        for event in events:
+            try:
+                with db.begin_nested():
+                    self._write(db, [event])
+                saved += 1
+            except (IntegrityError, DataError):
+                continue
+        db.commit()
+        return saved
+
+    def _write(self, db: Session, events: List[Tuple[int, str, datetime]]) -> None:
+        """كتابة الدفعة بثلاث جمل مجمعة - بدون commit"""
+        # تجميع التكرار داخل نفس الدفعة
+        latest: Dict[Tuple[int, str], Tuple[datetime, int]] = {}
+        for user_id, search_query, searched_at in events:
+            key = (user_id, search_query)
+            last_seen, count = latest.get(key, (searched_at, 0))
+            latest[key] = (max(last_seen, searched_at), count + 1)
+
+        daily_counts: Dict[Tuple[date, str], int] = {}
+        for _, search_query, searched_at in events:
+            key = (searched_at.date(), normalize_search_query(search_query))
+            daily_counts[key] = daily_counts.get(key, 0) + 1
+
+        db.execute(
+            insert(SearchHistory),
+            [
+                {"user_id": user_id, "search_query": search_query, "created_at": searched_at}
+                for user_id, search_query, searched_at in events
+            ],
+        )
+
+        stmt = upsert(db, RecentSearch.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "search_query"],
+            set_={
+                "last_searched_at": stmt.excluded.last_searched_at,
+                "search_count": RecentSearch.__table__.c.search_count + stmt.excluded.search_count,
+            },
+        )
+        db.execute(
+            stmt,
+            [
+                {
+                    "user_id": user_id,
+                    "search_query": search_query,
+                    "last_searched_at": last_seen,
+                    "search_count": count,
+                }
+                for (user_id, search_query), (last_seen, count) in latest.items()
+            ],
+        )
+
+        daily_table = SearchQueryDailyCount.__table__
+        stmt = upsert(db, daily_table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["day", "search_query"],
+            set_={"search_count": daily_table.c.search_count + stmt.excluded.search_count},
+        )
+        db.execute(
+            stmt,
+            [
+                {"day": day, "search_query": search_query, "search_count": count}
+                for (day, search_query), count in daily_counts.items()
+            ],
+        )
+
+
+def get_deduplicated_history(db: Session, user_id: int, limit: int):
+    """
+    آخر عمليات البحث المميزة من سجل البحث مباشرة (GROUP BY في قاعدة البيانات)
+    يستخدم الفهرس (user_id, created_at) ولا يقرأ إلا فترة الاحتفاظ
+    Returns: صفوف (id, search_query, last_searched_at)
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=settings.SEARCH_HISTORY_RETENTION_DAYS)
+    last_searched_at = func.max(SearchHistory.created_at)
+    return db.execute(
+        select(
+            func.max(SearchHistory.id).label("id"),
+            SearchHistory.search_query,
+            last_searched_at.label("last_searched_at"),
+        )
+        .where(SearchHistory.user_id == user_id, SearchHistory.created_at >= since)
+        .group_by(SearchHistory.search_query)
+        .order_by(desc(last_searched_at))
+        .limit(limit)
+    ).all()
+
+
+def purge_search_history(db: Session) -> None:
+    """
+    سياسة الاحتفاظ بتاريخ البحث:
+    - حذف سجل البحث الأقدم من SEARCH_HISTORY_RETENTION_DAYS
+    - الإبقاء على آخر RECENT_SEARCHES_PER_USER عبارة فقط لكل مستخدم
+    - حذف العدد اليومي خارج فترة الاحتفاظ
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.SEARCH_HISTORY_RETENTION_DAYS)
+    db.execute(delete(SearchHistory).where(SearchHistory.created_at < cutoff))
+    db.execute(delete(SearchQueryDailyCount).where(SearchQueryDailyCount.day < cutoff.date()))
+
+    ranked = select(
+        RecentSearch.id,
+        func.row_number()
+        .over(partition_by=RecentSearch.user_id, order_by=desc(RecentSearch.last_searched_at))
+        .label("position"),
+    ).subquery()
+    db.execute(
+        delete(RecentSearch).where(
+            RecentSearch.id.in_(
+                select(ranked.c.id).where(ranked.c.position > settings.RECENT_SEARCHES_PER_USER)
+            )
+        )
+    )
+    db.execute(delete(RecentSearch).where(RecentSearch.last_searched_at < cutoff))
+    db.commit()
+
+
+search_history_writer = SearchHistoryWriter()
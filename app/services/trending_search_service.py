@@ -0,0 +1,62 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import desc, func, select
+from sqlalchemy.orm import Session
+from app.models.search_trend import SearchQueryDailyCount
+from app.core.config import settings
+
+
+def normalize_search_query(search_query: str) -> str:
+    """توحيد عبارة البحث (حروف صغيرة ومسافات مفردة) لتجميع العبارات المتشابهة"""
+    return " ".join(search_query.split()).lower()
+
+
+class TrendingSearchesCache:
+    """
+    عمليات البحث الأكثر شيوعاً في الذاكرة
+    Periodically recomputed from the daily rollup table, served from memory
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items: List[Tuple[str, int]] = []
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def refresh(self, db: Session) -> None:
+        """
+        إعادة حساب العبارات الأكثر بحثاً خلال آخر TRENDING_SEARCHES_WINDOW_DAYS يوم
+        - الأيام بتوقيت UTC (نفس تجميع search_query_daily_counts)
+        - العبارات الأقل من TRENDING_SEARCHES_MIN_COUNT لا تظهر (بحث شخصي لمرة واحدة)
+        """
+        since = datetime.now(timezone.utc).date() - timedelta(days=settings.TRENDING_SEARCHES_WINDOW_DAYS - 1)
+        total = func.sum(SearchQueryDailyCount.search_count)
+        rows = db.execute(
+            select(SearchQueryDailyCount.search_query, total.label("search_count"))
+            .where(SearchQueryDailyCount.day >= since)
+            .group_by(SearchQueryDailyCount.search_query)
+            .having(total >= settings.TRENDING_SEARCHES_MIN_COUNT)
+            .order_by(desc(total))
+            .limit(settings.TRENDING_SEARCHES_CACHE_SIZE)
+        ).all()
+
+        items = [(row.search_query, int(row.search_count)) for row in rows]
+        with self._lock:
+            self._items = items
+            self._loaded = True
+
+    def get(self, limit: int, prefix: Optional[str] = None) -> List[Tuple[str, int]]:
+        """العبارات الأكثر بحثاً (مع فلترة اختيارية ببداية العبارة)"""
+        with self._lock:
+            items = self._items
+        if prefix:
+            prefix = normalize_search_query(prefix)
+            items = [item for item in items if item[0].startswith(prefix)]
+        return items[:limit]
+
+
+trending_searches = TrendingSearchesCache()
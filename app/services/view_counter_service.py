@@ -0,0 +1,70 @@
+import threading
+from collections import Counter
+from typing import Dict
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.orm import Session
+from app.models.product import Product
+
+
+class ProductViewCounter:
+    """
+    عداد مشاهدات المنتجات في الذاكرة
+    Buffers product view increments in memory and flushes them in batches
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+
+    def record(self, product_id: int) -> None:
+        """تسجيل مشاهدة بدون الكتابة في قاعدة البيانات"""
+        with self._lock:
+            self._pending[product_id] += 1
+
+    def pending(self, product_id: int) -> int:
+        """عدد المشاهدات التي لم تُحفظ بعد لمنتج معين"""
+        with self._lock:
+            return self._pending.get(product_id, 0)
+
+    def drain(self) -> Dict[int, int]:
+        """سحب جميع المشاهدات المعلقة وتصفير العداد"""
+        with self._lock:
+            pending = dict(self._pending)
+            self._pending.clear()
+        return pending
+
+    def restore(self, increments: Dict[int, int]) -> None:
+        """إرجاع المشاهدات للعداد في حالة فشل الحفظ"""
+        with self._lock:
+            self._pending.update(increments)
+
+    def flush(self, db: Session) -> int:
+        """
+        حفظ المشاهدات المعلقة في UPDATE واحد مجمع (executemany)
+        Returns: عدد المنتجات التي تم تحديثها
+        """
+        increments = self.drain()
+        if not increments:
+            return 0
+
+        products = Product.__table__
+        stmt = (
+            update(products)
+            .where(products.c.id == bindparam("b_id"))
+            .values(views_count=func.coalesce(products.c.views_count, 0) + bindparam("b_views"))
+        )
+        try:
+            db.execute(
+                stmt,
+                [{"b_id": product_id, "b_views": views} for product_id, views in increments.items()],
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            self.restore(increments)
+            raise
+
+        return len(increments)
+
+
+product_view_counter = ProductViewCounter()
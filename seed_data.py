@@ -51,6 +51,7 @@ from app.models.water_quality import WaterQualityReading
 from app.models.faq import FAQ
 from app.models.privacy_policy import PrivacyPolicySection
 from app.models.why_us import WhyUsStat, WhyUsFeature
+from app.services.order_summary_service import backfill_order_summaries
 
 logger = logging.getLogger("plupool.seed")
 
@@ -1430,6 +1431,9 @@ def main() -> None:
             summary["why_us_stats"] = seed_why_us_stats(session)
             summary["why_us_features"] = seed_why_us_features(session)
 
+            # ملخصات الطلبات التي أُنشئت قبل جدول order_summaries
+            summary["order_summaries"] = backfill_order_summaries(session)
+
             session.commit()
         except Exception as exc:  # pragma: no cover - utility script
             session.rollback()
@@ -0,0 +1,110 @@
+import os
+
+# الإعدادات المطلوبة قبل استيراد app.core.config
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (تسجيل كل الجداول)
+from app.db.base import Base
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """قاعدة SQLite في ملف (وليس في الذاكرة) حتى تعمل عدة اتصالات متزامنة"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def count_statements(engine):
+    """
+    عدّاد جمل SQL المرسلة لقاعدة البيانات داخل كتلة with
+    with count_statements() as statements: ... ثم len(statements)
+    """
+
+    @contextmanager
+    def _count_statements():
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+
+    return _count_statements
+
+
+@pytest.fixture
+def make_user(db):
+    from app.models.enums import UserRole
+    from app.models.user import User
+
+    counter = iter(range(1, 1_000_000))
+
+    def _make_user(**values) -> User:
+        user = User(
+            phone=f"+9665000{next(counter):05d}",
+            role=values.pop("role", UserRole.POOL_OWNER),
+            **values,
+        )
+        db.add(user)
+        db.commit()
+        return user
+
+    return _make_user
+
+
+@pytest.fixture
+def make_product(db):
+    from app.models.product import Product, ProductStatus
+
+    counter = iter(range(1, 1_000_000))
+
+    def _make_product(stock_quantity: int = 10, final_price: int = 100, **values) -> Product:
+        product = Product(
+            name_ar=f"منتج {next(counter)}",
+            original_price=final_price,
+            final_price=final_price,
+            stock_quantity=stock_quantity,
+            status=values.pop("status", ProductStatus.ACTIVE),
+            **values,
+        )
+        db.add(product)
+        db.commit()
+        return product
+
+    return _make_product
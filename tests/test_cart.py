@@ -0,0 +1,101 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import cart
+from app.api.v1.endpoints.cart import batch_update_cart, clear_cart
+from app.core.dependencies import get_current_user
+from app.db.database import get_db
+from app.models.cart_item import CartItem
+from app.schemas.cart import CartBatchUpdate
+
+LARGE_CART = 200
+
+
+def _cart_quantities(db, user_id):
+    db.expire_all()
+    return {
+        item.product_id: item.quantity
+        for item in db.query(CartItem).filter(CartItem.user_id == user_id)
+    }
+
+
+@pytest.fixture
+def shopper(db, make_user, make_product):
+    """سلة فيها 3 منتجات + منتج رابع خارج السلة"""
+    user = make_user()
+    products = [make_product(stock_quantity=5) for _ in range(4)]
+    db.add_all([
+        CartItem(user_id=user.id, product_id=products[0].id, quantity=1),
+        CartItem(user_id=user.id, product_id=products[1].id, quantity=2),
+        CartItem(user_id=user.id, product_id=products[2].id, quantity=1),
+    ])
+    db.commit()
+    return user, [product.id for product in products]
+
+
+def test_batch_applies_add_update_and_remove(db, shopper):
+    user, (first, second, third, fourth) = shopper
+    batch = CartBatchUpdate(operations=[
+        {"op": "add", "product_id": first, "quantity": 2},
+        {"op": "update", "product_id": second, "quantity": 5},
+        {"op": "remove", "product_id": third},
+        {"op": "add", "product_id": fourth, "quantity": 1},
+    ])
+
+    response = batch_update_cart(batch, db=db, current_user=user)
+
+    assert _cart_quantities(db, user.id) == {first: 3, second: 5, fourth: 1}
+    assert len(response.items) == 3
+    assert response.total_items == 3 + 5 + 1
+
+
+def test_batch_with_short_stock_applies_nothing(db, shopper):
+    user, (first, second, third, fourth) = shopper
+    before = _cart_quantities(db, user.id)
+    batch = CartBatchUpdate(operations=[
+        {"op": "update", "product_id": first, "quantity": 4},
+        {"op": "remove", "product_id": third},
+        {"op": "add", "product_id": fourth, "quantity": 6},
+    ])
+
+    with pytest.raises(HTTPException) as exc_info:
+        batch_update_cart(batch, db=db, current_user=user)
+    db.rollback()
+
+    assert exc_info.value.status_code == 400
+    assert _cart_quantities(db, user.id) == before
+
+
+def test_batch_without_quantity_is_rejected(db, shopper):
+    user, (first, *_) = shopper
+    app = FastAPI()
+    app.include_router(cart.router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: user
+
+    with TestClient(app) as client:
+        response = client.patch("/cart", json={"operations": [{"op": "update", "product_id": first}]})
+        removed = client.patch("/cart", json={"operations": [{"op": "remove", "product_id": first}]})
+
+    assert response.status_code == 422
+    assert "quantity" in response.text
+    assert removed.status_code == 200
+
+
+def test_clearing_a_large_cart_is_one_delete(db, make_user, make_product, count_statements):
+    user = make_user()
+    other_user = make_user()
+    products = [make_product() for _ in range(LARGE_CART)]
+    db.add_all(CartItem(user_id=user.id, product_id=product.id, quantity=1) for product in products)
+    db.add(CartItem(user_id=other_user.id, product_id=products[0].id, quantity=1))
+    db.commit()
+    user_id, other_user_id = user.id, other_user.id
+
+    with count_statements() as statements:
+        clear_cart(db=db, current_user=user)
+
+    assert len(statements) == 1
+    assert statements[0].startswith("DELETE FROM cart_items")
+    assert db.query(CartItem).filter(CartItem.user_id == user_id).count() == 0
+    assert db.query(CartItem).filter(CartItem.user_id == other_user_id).count() == 1
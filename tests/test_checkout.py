@@ -0,0 +1,47 @@
+from app.api.v1.endpoints.orders import _place_order
+from app.models.cart_item import CartItem
+from app.models.order import PaymentMethod
+from app.models.order_item import OrderItem
+from app.schemas.order import OrderCreate
+
+ORDER_DATA = OrderCreate(
+    delivery_address="الرياض",
+    delivery_phone="+966500000000",
+    payment_method=PaymentMethod.CASH_ON_DELIVERY,
+)
+
+CART_SIZES = (1, 10, 50)
+
+
+def _checkout_statements(db, make_user, make_product, count_statements, items):
+    user = make_user()
+    products = [make_product(stock_quantity=5) for _ in range(items)]
+    db.add_all(CartItem(user_id=user.id, product_id=product.id, quantity=2) for product in products)
+    db.commit()
+    db.expire_all()
+
+    with count_statements() as statements:
+        response = _place_order(ORDER_DATA, db, user)
+
+    assert len(response.order_items) == items
+    assert db.query(OrderItem).filter(OrderItem.order_id == response.id).count() == items
+    # SQLite لا يضمن ترتيب RETURNING فيرسل INSERT عناصر الطلب صفاً صفاً
+    # (PostgreSQL يرسلها في جملة واحدة) - نستثنيها من العدّ
+    return [statement for statement in statements if not statement.startswith("INSERT INTO order_items")]
+
+
+def test_checkout_statement_count_does_not_grow_with_cart_size(db, make_user, make_product, count_statements):
+    counts = {
+        items: len(_checkout_statements(db, make_user, make_product, count_statements, items))
+        for items in CART_SIZES
+    }
+
+    # قراءة المستخدم والسلة مع منتجاتها، حجز المخزون، رقم الطلب، الطلب، الملخص، الحدث، حذف السلة
+    assert counts == {items: 8 for items in CART_SIZES}
+
+
+def test_checkout_reads_cart_products_in_one_query(db, make_user, make_product, count_statements):
+    statements = _checkout_statements(db, make_user, make_product, count_statements, 50)
+
+    assert sum(statement.startswith("SELECT") for statement in statements) == 2
+    assert sum(statement.startswith("DELETE FROM cart_items") for statement in statements) == 1
@@ -0,0 +1,94 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, accepts_gzip
+
+LARGE_JSON = b'{"items": "' + b"x" * 4096 + b'"}'
+SMALL_JSON = b'{"ok": true}'
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, content_types=["application/json"])
+
+    @app.get("/large")
+    def large():
+        return Response(LARGE_JSON, media_type="application/json")
+
+    @app.get("/small")
+    def small():
+        return Response(SMALL_JSON, media_type="application/json")
+
+    @app.get("/text")
+    def text():
+        return PlainTextResponse("x" * 4096)
+
+    @app.get("/encoded")
+    def already_encoded():
+        return Response(gzip.compress(LARGE_JSON), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    return TestClient(app)
+
+
+def _get(client, path, accept_encoding):
+    # httpx يفك الضغط تلقائياً - نقرأ الـ bytes الخام للتأكد من المحتوى المضغوط
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_large_json_is_gzipped(client):
+    response, raw = _get(client, "/large", "gzip, deflate")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) == len(raw)
+    assert gzip.decompress(raw) == LARGE_JSON
+
+
+def test_below_minimum_size_is_not_compressed(client):
+    response, raw = _get(client, "/small", "gzip")
+    assert "content-encoding" not in response.headers
+    assert raw == SMALL_JSON
+
+
+def test_content_type_not_in_list_is_not_compressed(client):
+    response, raw = _get(client, "/text", "gzip")
+    assert "content-encoding" not in response.headers
+    assert raw == b"x" * 4096
+
+
+def test_already_encoded_response_is_left_alone(client):
+    response, raw = _get(client, "/encoded", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw) == LARGE_JSON
+
+
+@pytest.mark.parametrize("accept_encoding", ["identity", "br", "gzip;q=0", "gzip; q=0.0, br", "x-gzip", "*;q=0"])
+def test_client_not_accepting_gzip_gets_identity(client, accept_encoding):
+    response, raw = _get(client, "/large", accept_encoding)
+    assert "content-encoding" not in response.headers
+    assert raw == LARGE_JSON
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip", True),
+        ("GZIP", True),
+        ("deflate, gzip;q=0.5", True),
+        ("gzip;q=0.001", True),
+        ("*", True),
+        ("br, *;q=0.1", True),
+        ("gzip;q=0, *", False),
+        ("gzip;q=0", False),
+        ("gzip;q=invalid", False),
+        ("x-gzip", False),
+        ("", False),
+    ],
+)
+def test_accepts_gzip(accept_encoding, expected):
+    assert accepts_gzip(accept_encoding) is expected
@@ -0,0 +1,148 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.api.v1.endpoints import orders
+from app.core import tasks
+from app.models.cart_item import CartItem
+from app.models.idempotency_key import IdempotencyKey
+from app.models.order import Order, PaymentMethod
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.order import OrderCreate
+from app.services.idempotency_service import REPLAYED_HEADER, IdempotencyStore
+
+ORDER_DATA = OrderCreate(
+    delivery_address="الرياض",
+    delivery_phone="+966500000000",
+    payment_method=PaymentMethod.CASH_ON_DELIVERY,
+)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """مخزن جديد لكل اختبار (معرفات المستخدمين تتكرر بين قواعد الاختبار)"""
+    store = IdempotencyStore(ttl_seconds=3600)
+    monkeypatch.setattr(orders, "idempotency_store", store)
+    return store
+
+
+@pytest.fixture
+def shopper(db, make_user, make_product):
+    user = make_user()
+    product = make_product(stock_quantity=10)
+    db.add(CartItem(user_id=user.id, product_id=product.id, quantity=2))
+    db.commit()
+    return user, product
+
+
+def _create_order(db, user, key, order_data=ORDER_DATA):
+    return orders.create_order(order_data, idempotency_key=key, db=db, current_user=user)
+
+
+def test_retry_replays_stored_response(db, store, shopper):
+    user, product = shopper
+    created = _create_order(db, user, "checkout-1")
+
+    replayed = _create_order(db, user, "checkout-1")
+    assert isinstance(replayed, Response)
+    assert replayed.status_code == 201
+    assert replayed.headers[REPLAYED_HEADER] == "true"
+    assert json.loads(replayed.body)["id"] == created.id
+    assert json.loads(replayed.body)["order_number"] == created.order_number
+
+    db.expire_all()
+    assert db.query(Order).count() == 1
+    assert db.get(Product, product.id).stock_quantity == 8
+
+
+def test_replay_reads_table_when_memory_is_cold(db, store, shopper):
+    user, _ = shopper
+    created = _create_order(db, user, "checkout-1")
+
+    # عملية أخرى لا تملك الاستجابة في ذاكرتها
+    cold_store = IdempotencyStore(ttl_seconds=3600)
+    request = cold_store.request("checkout-1", user.id, "orders.create", ORDER_DATA)
+    replayed = cold_store.replay(db, request)
+    assert replayed.headers[REPLAYED_HEADER] == "true"
+    assert json.loads(replayed.body)["id"] == created.id
+
+
+def test_same_key_with_different_body_is_rejected(db, store, shopper):
+    user, _ = shopper
+    _create_order(db, user, "checkout-1")
+
+    other_data = ORDER_DATA.model_copy(update={"delivery_address": "جدة"})
+    with pytest.raises(HTTPException) as exc_info:
+        _create_order(db, user, "checkout-1", other_data)
+    assert exc_info.value.status_code == 422
+    assert db.query(Order).count() == 1
+
+
+def test_concurrent_requests_with_same_key_create_one_order(session_factory, store, shopper, monkeypatch):
+    user, product = shopper
+
+    # الطلبان يقرآن السلة ويتجاوزان فحص replay قبل أن يحفظ أي منهما
+    # الثاني يفشل على القيد الفريد عند الـ commit ويرجع استجابة الأول
+    barrier = threading.Barrier(2)
+    reserve_stock = orders.reserve_stock
+
+    def reserve_together(db, quantities):
+        barrier.wait(timeout=10)
+        return reserve_stock(db, quantities)
+
+    monkeypatch.setattr(orders, "reserve_stock", reserve_together)
+
+    def checkout(_):
+        with session_factory() as session:
+            return _create_order(session, session.get(User, user.id), "checkout-1")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(checkout, range(2)))
+
+    replayed = [result for result in results if isinstance(result, Response)]
+    created = [result for result in results if not isinstance(result, Response)]
+    assert len(replayed) == 1 and len(created) == 1
+    assert replayed[0].headers[REPLAYED_HEADER] == "true"
+    assert json.loads(replayed[0].body)["id"] == created[0].id
+
+    with session_factory() as session:
+        assert session.query(Order).count() == 1
+        assert session.query(IdempotencyKey).count() == 1
+        assert session.get(Product, product.id).stock_quantity == 8
+
+
+def test_purge_job_removes_only_expired_keys(db, session_factory, store, shopper, monkeypatch):
+    user, _ = shopper
+    _create_order(db, user, "checkout-1")
+    key = db.query(IdempotencyKey).one()
+    expected_expiry = datetime.now(timezone.utc) + timedelta(seconds=store.ttl_seconds)
+    assert abs((key.expires_at.replace(tzinfo=timezone.utc) - expected_expiry).total_seconds()) < 60
+
+    db.add(IdempotencyKey(
+        user_id=user.id,
+        endpoint="orders.create",
+        key="checkout-old",
+        request_hash="0" * 64,
+        status_code=201,
+        response_body="{}",
+        expires_at=datetime.now(timezone.utc) - timedelta(minutes=1),
+    ))
+    db.commit()
+
+    def get_test_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr(tasks, "get_db", get_test_db)
+    tasks.purge_idempotency_keys()
+
+    db.expire_all()
+    assert [row.key for row in db.query(IdempotencyKey)] == ["checkout-1"]
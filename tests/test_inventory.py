@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.api.v1.endpoints.orders import _place_order
+from app.models.cart_item import CartItem
+from app.models.order import Order, PaymentMethod
+from app.models.product import Product, ProductStatus
+from app.models.user import User
+from app.schemas.order import OrderCreate
+from app.services.inventory_service import reserve_stock
+
+ORDER_DATA = OrderCreate(
+    delivery_address="الرياض",
+    delivery_phone="+966500000000",
+    payment_method=PaymentMethod.CASH_ON_DELIVERY,
+)
+
+
+def _stock(session_factory, product_id):
+    with session_factory() as session:
+        return session.get(Product, product_id).stock_quantity
+
+
+def test_reserve_stock_decrements_all_products(db, make_product):
+    first = make_product(stock_quantity=5)
+    second = make_product(stock_quantity=3)
+
+    assert reserve_stock(db, {first.id: 2, second.id: 3}) == []
+    db.commit()
+
+    db.expire_all()
+    assert first.stock_quantity == 3
+    assert second.stock_quantity == 0
+
+
+def test_reserve_stock_reports_unavailable_products(db, make_product):
+    available = make_product(stock_quantity=5)
+    short = make_product(stock_quantity=1)
+    inactive = make_product(stock_quantity=10, status=ProductStatus.INACTIVE)
+
+    assert sorted(reserve_stock(db, {available.id: 1, short.id: 2, inactive.id: 1})) == sorted([short.id, inactive.id])
+    db.rollback()
+
+    db.expire_all()
+    assert available.stock_quantity == 5
+
+
+def test_concurrent_reservations_never_oversell(session_factory, make_product):
+    product = make_product(stock_quantity=5)
+
+    def reserve(_):
+        with session_factory() as session:
+            unavailable = reserve_stock(session, {product.id: 1})
+            if unavailable:
+                session.rollback()
+                return False
+            session.commit()
+            return True
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(reserve, range(20)))
+
+    assert results.count(True) == 5
+    assert _stock(session_factory, product.id) == 0
+
+
+def test_concurrent_checkouts_never_oversell(session_factory, make_user, make_product):
+    product = make_product(stock_quantity=5)
+    users = [make_user() for _ in range(12)]
+    with session_factory() as session:
+        session.add_all(CartItem(user_id=user.id, product_id=product.id, quantity=1) for user in users)
+        session.commit()
+
+    def checkout(user_id):
+        with session_factory() as session:
+            try:
+                _place_order(ORDER_DATA, session, session.get(User, user_id))
+                return True
+            except HTTPException as exc:
+                session.rollback()
+                # 409: لم يكفِ المخزون عند الحجز - 400: نفد المخزون قبل بداية الطلب
+                assert exc.status_code in (400, 409)
+                return False
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(checkout, [user.id for user in users]))
+
+    assert results.count(True) == 5
+    assert _stock(session_factory, product.id) == 0
+    with session_factory() as session:
+        assert session.query(Order).count() == 5
@@ -0,0 +1,75 @@
+import json
+from datetime import date, timedelta
+
+from starlette.requests import Request
+
+from app.api.v1.endpoints.offers import get_all_offers
+from app.models.service import Service, ServiceType
+from app.models.service_offer import DiscountType, OfferStatus, ServiceOffer
+from app.services.offer_expiry_service import expire_ended_offers
+
+TODAY = date(2026, 10, 19)
+
+
+def _offer(db, status, end_date):
+    service = Service(name_ar="صيانة", service_type=ServiceType.MAINTENANCE)
+    offer = ServiceOffer(
+        title_ar="عرض",
+        service=service,
+        original_price=100,
+        discount_type=DiscountType.FIXED,
+        discount_value=10,
+        final_price=90,
+        end_date=end_date,
+        status=status,
+    )
+    db.add(offer)
+    db.commit()
+    return offer
+
+
+def test_only_active_ended_offers_expire(db):
+    ended_active = _offer(db, OfferStatus.ACTIVE, TODAY - timedelta(days=1))
+    ended_inactive = _offer(db, OfferStatus.INACTIVE, TODAY - timedelta(days=1))
+    running = _offer(db, OfferStatus.ACTIVE, TODAY)
+
+    assert expire_ended_offers(db, today=TODAY) == 1
+
+    db.expire_all()
+    assert ended_active.status == OfferStatus.EXPIRED
+    assert ended_inactive.status == OfferStatus.INACTIVE
+    assert running.status == OfferStatus.ACTIVE
+
+
+def test_extending_end_date_reactivates_expired_offer(db):
+    offer = _offer(db, OfferStatus.EXPIRED, TODAY - timedelta(days=1))
+
+    offer.end_date = TODAY + timedelta(days=7)
+    offer.reactivate_if_extended(today=TODAY)
+    offer.expire_if_ended(today=TODAY)
+    assert offer.status == OfferStatus.ACTIVE
+
+
+def test_inactive_offer_is_not_reactivated_or_expired(db):
+    offer = _offer(db, OfferStatus.INACTIVE, TODAY - timedelta(days=1))
+
+    offer.reactivate_if_extended(today=TODAY)
+    offer.expire_if_ended(today=TODAY)
+    assert offer.status == OfferStatus.INACTIVE
+
+
+def test_listing_defaults_to_offers_that_have_not_ended(db):
+    today = date.today()
+    active = _offer(db, OfferStatus.ACTIVE, today)
+    inactive = _offer(db, OfferStatus.INACTIVE, None)
+    _offer(db, OfferStatus.EXPIRED, today - timedelta(days=1))
+    _offer(db, OfferStatus.INACTIVE, today - timedelta(days=1))
+    expected = {active.id, inactive.id}
+
+    def list_offers(status=None):
+        request = Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+        response = get_all_offers(request, service_id=None, status=status, is_featured=None, skip=0, limit=20, db=db)
+        return {offer["id"] for offer in json.loads(response.body)}
+
+    assert list_offers() == expected
+    assert len(list_offers(OfferStatus.EXPIRED)) == 1
@@ -0,0 +1,47 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from app.services.order_number_service import generate_order_number
+
+ORDER_NUMBER_PATTERN = re.compile(r"^#\d{8}\d{6}$")
+
+
+def test_order_numbers_are_short_and_sequential_per_day(db):
+    day = date(2026, 10, 19)
+    numbers = [generate_order_number(db, today=day) for _ in range(3)]
+    db.commit()
+
+    assert numbers == ["#20261019000001", "#20261019000002", "#20261019000003"]
+    assert all(ORDER_NUMBER_PATTERN.match(number) for number in numbers)
+
+
+def test_counter_restarts_each_day(db):
+    assert generate_order_number(db, today=date(2026, 10, 19)) == "#20261019000001"
+    assert generate_order_number(db, today=date(2026, 10, 20)) == "#20261020000001"
+    db.commit()
+
+
+def test_concurrent_order_numbers_are_unique(session_factory):
+    day = date(2026, 10, 19)
+
+    def generate(_):
+        with session_factory() as session:
+            number = generate_order_number(session, today=day)
+            session.commit()
+            return number
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        numbers = list(pool.map(generate, range(200)))
+
+    assert len(set(numbers)) == 200
+    assert sorted(numbers) == [f"#20261019{serial:06d}" for serial in range(1, 201)]
+
+
+def test_rolled_back_checkout_does_not_consume_a_number(db):
+    day = date(2026, 10, 19)
+    generate_order_number(db, today=day)
+    db.rollback()
+
+    assert generate_order_number(db, today=day) == "#20261019000001"
+    db.commit()
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints.orders import _place_order, get_order_changes
+from app.models.cart_item import CartItem
+from app.models.order import Order, OrderStatus, PaymentMethod
+from app.models.order_event import OrderEvent, OrderEventType
+from app.models.order_summary import OrderSummary
+from app.schemas.order import OrderCreate
+from app.services.order_state_machine import can_transition, transition_order_status
+
+ORDER_DATA = OrderCreate(
+    delivery_address="الرياض",
+    delivery_phone="+966500000000",
+    payment_method=PaymentMethod.CASH_ON_DELIVERY,
+)
+
+
+@pytest.fixture
+def placed_order(db, make_user, make_product):
+    """طلب مؤكد فيه منتجان: 3 من الأول و 2 من الثاني"""
+    user = make_user()
+    first = make_product(stock_quantity=10)
+    second = make_product(stock_quantity=4)
+    db.add_all([
+        CartItem(user_id=user.id, product_id=first.id, quantity=3),
+        CartItem(user_id=user.id, product_id=second.id, quantity=2),
+    ])
+    db.commit()
+    response = _place_order(ORDER_DATA, db, user)
+    return user, response.id, first, second
+
+
+def test_transition_table():
+    assert can_transition(OrderStatus.CONFIRMED, OrderStatus.PROCESSING)
+    assert can_transition(OrderStatus.SHIPPED, OrderStatus.DELIVERED)
+    assert not can_transition(OrderStatus.SHIPPED, OrderStatus.CANCELLED)
+    assert not can_transition(OrderStatus.DELIVERED, OrderStatus.CANCELLED)
+    assert not can_transition(OrderStatus.CANCELLED, OrderStatus.CONFIRMED)
+
+
+def test_cancelling_restores_reserved_stock(db, placed_order):
+    _, order_id, first, second = placed_order
+    db.expire_all()
+    assert (first.stock_quantity, second.stock_quantity) == (7, 2)
+
+    transition_order_status(db, order_id, OrderStatus.CANCELLED)
+    db.commit()
+
+    db.expire_all()
+    assert (first.stock_quantity, second.stock_quantity) == (10, 4)
+    assert db.get(Order, order_id).status == OrderStatus.CANCELLED
+    assert db.get(OrderSummary, order_id).status == OrderStatus.CANCELLED
+
+
+def test_rolled_back_cancellation_keeps_stock_reserved(db, placed_order):
+    _, order_id, first, _ = placed_order
+    transition_order_status(db, order_id, OrderStatus.CANCELLED)
+    db.rollback()
+
+    db.expire_all()
+    assert first.stock_quantity == 7
+    assert db.get(Order, order_id).status == OrderStatus.CONFIRMED
+
+
+def test_other_transitions_do_not_touch_stock(db, placed_order):
+    _, order_id, first, _ = placed_order
+    transition_order_status(db, order_id, OrderStatus.PROCESSING)
+    transition_order_status(db, order_id, OrderStatus.SHIPPED)
+    transition_order_status(db, order_id, OrderStatus.DELIVERED)
+    db.commit()
+
+    db.expire_all()
+    order = db.get(Order, order_id)
+    assert order.status == OrderStatus.DELIVERED
+    assert order.delivered_at is not None
+    assert first.stock_quantity == 7
+
+
+def test_invalid_transition_is_rejected(db, placed_order):
+    _, order_id, _, _ = placed_order
+    transition_order_status(db, order_id, OrderStatus.CANCELLED)
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc_info:
+        transition_order_status(db, order_id, OrderStatus.CANCELLED)
+    assert exc_info.value.status_code == 409
+
+
+def test_changes_are_polled_by_event_id(db, placed_order):
+    user, order_id, _, _ = placed_order
+
+    def poll(after_id):
+        response = get_order_changes(after_id=after_id, limit=100, db=db, current_user=user)
+        return json.loads(response.body)
+
+    created = poll(0)
+    assert [event["event_type"] for event in created] == [OrderEventType.CREATED.value]
+    assert created[0]["order_id"] == order_id
+
+    transition_order_status(db, order_id, OrderStatus.PROCESSING, note="قيد التجهيز")
+    db.commit()
+
+    changes = poll(created[-1]["id"])
+    assert len(changes) == 1
+    assert changes[0]["from_status"] == OrderStatus.CONFIRMED.value
+    assert changes[0]["to_status"] == OrderStatus.PROCESSING.value
+    assert changes[0]["note"] == "قيد التجهيز"
+    assert poll(changes[-1]["id"]) == []
+    assert db.query(OrderEvent).filter(OrderEvent.order_id == order_id).count() == 2
@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+from app.api.v1.endpoints.orders import _place_order, get_orders
+from app.models.cart_item import CartItem
+from app.models.order import Order, OrderStatus, PaymentMethod
+from app.models.order_item import OrderItem
+from app.models.order_summary import OrderSummary
+from app.schemas.order import OrderCreate
+from app.services.order_state_machine import transition_order_status
+from app.services.order_summary_service import backfill_order_summaries
+
+ORDER_DATA = OrderCreate(
+    delivery_address="الرياض",
+    delivery_phone="+966500000000",
+    payment_method=PaymentMethod.CASH_ON_DELIVERY,
+)
+
+
+@pytest.fixture
+def placed_order(db, make_user, make_product):
+    """طلب من منتجين - صورة الأول هي صورة الملخص"""
+    user = make_user()
+    first = make_product(stock_quantity=10, final_price=40, image_url="https://cdn.example.com/first.jpg")
+    second = make_product(stock_quantity=10, final_price=25, image_url="https://cdn.example.com/second.jpg")
+    db.add_all([
+        CartItem(user_id=user.id, product_id=first.id, quantity=3),
+        CartItem(user_id=user.id, product_id=second.id, quantity=1),
+    ])
+    db.commit()
+    return user, _place_order(ORDER_DATA, db, user)
+
+
+def _legacy_order(db, user, product, order_number, images):
+    """طلب قديم بدون ملخص (قبل جدول order_summaries)"""
+    order = Order(
+        user_id=user.id,
+        order_number=order_number,
+        total_amount=100.0,
+        delivery_fee=None,
+        grand_total=100.0,
+        delivery_address="جدة",
+        delivery_phone="+966500000001",
+        payment_method=PaymentMethod.CASH_ON_DELIVERY,
+        status=OrderStatus.DELIVERED,
+    )
+    db.add(order)
+    db.flush()
+    db.add_all(
+        OrderItem(
+            order_id=order.id,
+            product_id=product.id,
+            product_name_ar="منتج قديم",
+            product_image_url=image,
+            unit_price=50.0,
+            quantity=1,
+            total_price=50.0,
+        )
+        for image in images
+    )
+    db.commit()
+    return order
+
+
+def test_checkout_writes_matching_summary(db, placed_order):
+    user, response = placed_order
+    summary = db.get(OrderSummary, response.id)
+
+    assert summary.user_id == user.id
+    assert summary.order_number == response.order_number
+    assert summary.items_count == 2
+    assert summary.first_item_image_url == "https://cdn.example.com/first.jpg"
+    assert summary.total_amount == response.total_amount == 145.0
+    assert summary.delivery_fee == response.delivery_fee
+    assert summary.grand_total == response.grand_total
+    assert summary.payment_method == PaymentMethod.CASH_ON_DELIVERY
+    assert summary.status == OrderStatus.CONFIRMED
+
+    listed = json.loads(get_orders(skip=0, limit=50, db=db, current_user=user).body)
+    assert [order["order_number"] for order in listed] == [response.order_number]
+    assert listed[0]["items_count"] == 2
+    assert listed[0]["grand_total"] == response.grand_total
+
+
+def test_status_transition_updates_summary(db, placed_order):
+    _, response = placed_order
+    transition_order_status(db, response.id, OrderStatus.PROCESSING)
+    db.commit()
+
+    summary = db.get(OrderSummary, response.id)
+    assert summary.status == OrderStatus.PROCESSING
+    assert summary.updated_at is not None
+
+
+def test_backfill_fills_legacy_orders_once(db, make_product, placed_order):
+    user, response = placed_order
+    product = make_product()
+    two_items = _legacy_order(db, user, product, "#LEGACY-1", ["https://cdn.example.com/old.jpg", None])
+    no_items = _legacy_order(db, user, product, "#LEGACY-2", [])
+
+    assert backfill_order_summaries(db) == 2
+    db.commit()
+    assert backfill_order_summaries(db) == 0
+    db.commit()
+
+    assert db.query(OrderSummary).count() == 3
+    legacy = db.get(OrderSummary, two_items.id)
+    assert legacy.order_number == "#LEGACY-1"
+    assert legacy.items_count == 2
+    assert legacy.first_item_image_url == "https://cdn.example.com/old.jpg"
+    assert legacy.delivery_fee == 0.0
+    assert legacy.status == OrderStatus.DELIVERED
+    assert legacy.created_at is not None
+
+    empty = db.get(OrderSummary, no_items.id)
+    assert empty.items_count == 0
+    assert empty.first_item_image_url is None
+
+    # الملخص الموجود لا يتغير
+    assert db.get(OrderSummary, response.id).items_count == 2
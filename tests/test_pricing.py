@@ -0,0 +1,70 @@
+import math
+import random
+
+import pytest
+
+from app.core.config import settings
+from app.services.pricing_service import CartLine, price_cart
+
+# اختبارات خصائص (property-based) على سلال عشوائية ببذرة ثابتة - النتائج قابلة للتكرار
+SEEDS = range(200)
+
+
+def _random_cart(rng: random.Random):
+    return [
+        CartLine(
+            product_id=rng.randint(1, 50),
+            quantity=rng.randint(1, 20),
+            unit_price=rng.choice([0, rng.randint(1, 5000), round(rng.uniform(0.5, 999.99), 2)]),
+            free_delivery=rng.random() < 0.15,
+        )
+        for _ in range(rng.randint(0, 12))
+    ]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_totals_are_sums_of_lines(seed):
+    lines = _random_cart(random.Random(seed))
+    pricing = price_cart(lines)
+
+    assert [priced.line for priced in pricing.lines] == lines
+    for priced in pricing.lines:
+        assert math.isclose(priced.total_price, priced.line.unit_price * priced.line.quantity)
+    assert pricing.total_items == sum(line.quantity for line in lines)
+    assert math.isclose(pricing.total_amount, sum(priced.total_price for priced in pricing.lines), abs_tol=1e-6)
+    assert math.isclose(pricing.grand_total, pricing.total_amount + pricing.delivery_fee, abs_tol=1e-6)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_delivery_fee_rules(seed):
+    lines = _random_cart(random.Random(seed))
+    pricing = price_cart(lines)
+
+    if any(line.free_delivery for line in lines) or pricing.total_amount == 0:
+        assert pricing.delivery_fee == 0
+    else:
+        assert pricing.delivery_fee == settings.DEFAULT_DELIVERY_FEE
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_totals_do_not_depend_on_line_order(seed):
+    rng = random.Random(seed)
+    lines = _random_cart(rng)
+    shuffled = lines[:]
+    rng.shuffle(shuffled)
+
+    original, reordered = price_cart(lines), price_cart(shuffled)
+    assert original.total_items == reordered.total_items
+    assert math.isclose(original.total_amount, reordered.total_amount, abs_tol=1e-6)
+    assert original.delivery_fee == reordered.delivery_fee
+
+
+def test_accepts_a_generator():
+    lines = [CartLine(1, 2, 10.0, False), CartLine(2, 1, 5.0, False)]
+    assert price_cart(line for line in lines) == price_cart(lines)
+
+
+def test_empty_cart_costs_nothing():
+    pricing = price_cart([])
+    assert pricing.lines == []
+    assert (pricing.total_items, pricing.total_amount, pricing.delivery_fee, pricing.grand_total) == (0, 0, 0, 0)
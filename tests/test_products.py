@@ -0,0 +1,47 @@
+import json
+
+import pytest
+from starlette.requests import Request
+
+from app.api.v1.endpoints.products import get_all_products, get_product
+from app.models.category import Category
+
+PAGE_SIZE = 100
+
+
+def _request():
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+
+
+@pytest.fixture
+def catalog(db, make_product):
+    """100 منتج كل منها في فئة مختلفة (أسوأ حالة للتحميل الكسول للفئة)"""
+    categories = [Category(name_ar=f"فئة {index}") for index in range(PAGE_SIZE)]
+    db.add_all(categories)
+    db.commit()
+    products = [make_product(category_id=category.id) for category in categories]
+    db.expire_all()
+    return products
+
+
+def test_product_page_is_one_query(db, catalog, count_statements):
+    with count_statements() as statements:
+        response = get_all_products(
+            _request(), search=None, category_id=None, min_price=None, max_price=None,
+            free_delivery=None, is_featured=None, status=None, sort_by="created_at",
+            order="desc", skip=0, limit=PAGE_SIZE, db=db, current_user=None,
+        )
+
+    assert len(statements) == 1
+    page = json.loads(response.body)
+    assert len(page) == PAGE_SIZE
+    assert {product["category_name"] for product in page} == {f"فئة {index}" for index in range(PAGE_SIZE)}
+
+
+def test_product_detail_is_one_query(db, catalog, count_statements):
+    product_id = catalog[0].id
+    with count_statements() as statements:
+        response = get_product(product_id, _request(), db=db)
+
+    assert len(statements) == 1
+    assert json.loads(response.body)["category_name"] == "فئة 0"
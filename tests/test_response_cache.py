@@ -0,0 +1,63 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.cache import CATEGORIES, PRODUCTS, InMemoryCacheBackend, VersionedCache
+from app.core.response_cache import CachedRoute, ResponseCacheMiddleware
+
+MAX_RESPONSES = 3
+
+
+@pytest.fixture
+def cache():
+    # سعة صغيرة: لو كانت الاستجابات في نفس المخزن لأخرجت 50 استجابة البيانات المرجعية منه
+    return VersionedCache(InMemoryCacheBackend(max_entries=8), ttl_seconds=600)
+
+
+@pytest.fixture
+def served(cache):
+    """تطبيق بمسار واحد يعد مرات الحساب الفعلي"""
+    calls = []
+
+    async def items(request):
+        calls.append(request.url.query)
+        return JSONResponse({"page": request.query_params.get("page")})
+
+    app = Starlette(routes=[Route("/items", items)])
+    middleware = ResponseCacheMiddleware(
+        app,
+        routes={"/items": CachedRoute(PRODUCTS, 60)},
+        cache=cache,
+        max_entries=MAX_RESPONSES,
+    )
+    with TestClient(middleware) as client:
+        yield client, middleware, calls
+
+
+def test_anonymous_responses_are_cached_until_invalidated(cache, served):
+    client, _, calls = served
+
+    assert client.get("/items?page=1&size=20").json() == {"page": "1"}
+    assert client.get("/items?size=20&page=1").json() == {"page": "1"}
+    assert len(calls) == 1
+
+    cache.invalidate(PRODUCTS)
+    client.get("/items?page=1&size=20")
+    assert len(calls) == 2
+
+    client.get("/items?page=1&size=20", headers={"Authorization": "Bearer token"})
+    assert len(calls) == 3
+
+
+def test_distinct_queries_do_not_evict_reference_data(cache, served):
+    client, middleware, calls = served
+    cache.put(CATEGORIES, "all", ["مضخات", "فلاتر"])
+
+    for page in range(50):
+        client.get(f"/items?page={page}")
+
+    assert len(calls) == 50
+    assert len(middleware._responses._entries) == MAX_RESPONSES
+    assert cache.get(CATEGORIES, "all") == ["مضخات", "فلاتر"]
@@ -0,0 +1,54 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.api.v1.endpoints.search import get_search_history
+from app.core.config import settings
+from app.models.recent_search import RecentSearch
+from app.models.search_history import SearchHistory
+from app.services.search_history_service import get_deduplicated_history
+
+NOW = datetime.now(timezone.utc)
+
+
+def _search(db, user, search_query, minutes_ago):
+    db.add(SearchHistory(user_id=user.id, search_query=search_query, created_at=NOW - timedelta(minutes=minutes_ago)))
+
+
+def _history(db, user, limit=10):
+    return asyncio.run(get_search_history(limit=limit, db=db, current_user=user))
+
+
+def test_deduplicated_history_groups_in_sql(db, make_user):
+    user = make_user()
+    other_user = make_user()
+    _search(db, user, "مضخة", 30)
+    _search(db, user, "فلتر", 20)
+    _search(db, user, "مضخة", 10)
+    _search(db, user, "كلور", 5)
+    _search(db, user, "قديم", (settings.SEARCH_HISTORY_RETENTION_DAYS + 1) * 24 * 60)
+    _search(db, other_user, "سلم", 1)
+    db.commit()
+
+    rows = get_deduplicated_history(db, user.id, limit=10)
+    assert [row.search_query for row in rows] == ["كلور", "مضخة", "فلتر"]
+    assert [row.search_query for row in get_deduplicated_history(db, user.id, limit=2)] == ["كلور", "مضخة"]
+
+
+def test_endpoint_falls_back_to_search_history(db, make_user):
+    user = make_user()
+    _search(db, user, "مضخة", 30)
+    _search(db, user, "مضخة", 10)
+    _search(db, user, "فلتر", 20)
+    db.commit()
+
+    assert [item.search_query for item in _history(db, user)] == ["مضخة", "فلتر"]
+
+
+def test_endpoint_prefers_recent_searches(db, make_user):
+    user = make_user()
+    _search(db, user, "قديم", 10)
+    db.add(RecentSearch(user_id=user.id, search_query="مضخة", last_searched_at=NOW, search_count=2))
+    db.commit()
+
+    assert [item.search_query for item in _history(db, user)] == ["مضخة"]
+    assert _history(db, None) == []
@@ -0,0 +1,152 @@
+import asyncio
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from time import perf_counter
+from typing import List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy.orm import joinedload
+
+from app.api.v1.endpoints.dashboard import get_technician_dashboard
+from app.core.serialization import ORJSONResponse, construct_row, construct_rows, dump_json
+from app.models.category import Category
+from app.models.enums import UserRole
+from app.models.product import Product, ProductStatus
+from app.models.technician_task import TaskPriority, TechnicianTask, TechnicianTaskStatus
+from app.schemas.dashboard import TechnicianDashboardResponse
+from app.schemas.product import ProductDetailResponse
+from app.services.catalog_service import product_detail_query, product_details_from_rows
+
+LIST_SIZE = 500
+TASKS_PER_WEEK = 70
+REPEATS = 5
+
+
+def _best_time(func) -> float:
+    """أفضل زمن من عدة محاولات (أقل تأثراً بضجيج الجهاز)"""
+    timings = []
+    for _ in range(REPEATS):
+        started = perf_counter()
+        func()
+        timings.append(perf_counter() - started)
+    return min(timings)
+
+
+def _fastapi_body(response_model, content) -> bytes:
+    """ما يفعله FastAPI مع response_model: validation ثم serialization ثم json.dumps"""
+    field = create_model_field(name="Response", type_=response_model, mode="serialization")
+    serialized = asyncio.run(serialize_response(field=field, response_content=content))
+    return JSONResponse(serialized).body
+
+
+@pytest.fixture
+def products(db):
+    category = Category(name_ar="مضخات")
+    db.add(category)
+    db.add_all(
+        Product(
+            name_ar=f"مضخة مياه للمسبح {index}",
+            description_ar="مضخة قوية بضمان سنتين",
+            category=category,
+            original_price=1200,
+            final_price=999,
+            stock_quantity=10,
+            rating=4.5,
+            status=ProductStatus.ACTIVE,
+        )
+        for index in range(LIST_SIZE)
+    )
+    db.commit()
+
+
+def test_list_fast_path_matches_and_beats_validated_responses(db, products):
+    rows = product_detail_query(db).order_by(Product.id).all()
+    orm_products = db.query(Product).options(joinedload(Product.category)).order_by(Product.id).all()
+
+    def fast_path():
+        return dump_json(product_details_from_rows(rows))
+
+    def validated_path():
+        # الطريقة السابقة: Model(**orm.__dict__) ثم إعادة التحقق من response_model
+        models = [
+            ProductDetailResponse(**product.__dict__, category_name=product.category.name_ar)
+            for product in orm_products
+        ]
+        return _fastapi_body(List[ProductDetailResponse], models)
+
+    assert json.loads(fast_path()) == json.loads(validated_path())
+    assert _best_time(fast_path) < _best_time(validated_path)
+
+
+def test_constructed_rows_fill_defaults_and_overrides(db, products):
+    rows = db.query(Product.id, Product.name_ar, Product.original_price, Product.final_price).limit(2).all()
+
+    models = construct_rows(ProductDetailResponse, rows)
+    assert [model.id for model in models] == [row.id for row in rows]
+    assert models[0].category_name is None
+    assert models[0].model_fields_set == {"id", "name_ar", "original_price", "final_price"}
+
+    model = construct_row(ProductDetailResponse, rows[0], views_count=7)
+    assert model.views_count == 7
+    assert "views_count" not in model.model_dump(exclude={"views_count"})
+    assert model.model_dump()["name_ar"] == rows[0].name_ar
+
+
+@pytest.fixture
+def technician(db, make_user):
+    """فني لديه مهام طوال الأسبوع الحالي ومهام مكتملة بتقييمات (نصوص عربية)"""
+    technician = make_user(role=UserRole.TECHNICIAN, full_name="فني الصيانة")
+    week_start = date.today() - timedelta(days=date.today().weekday())
+    db.add_all(
+        TechnicianTask(
+            technician_id=technician.id,
+            title=f"صيانة مسبح فيلا {index}",
+            description="تنظيف الفلتر وفحص المضخة وقياس جودة المياه",
+            scheduled_date=week_start + timedelta(days=index % 7),
+            scheduled_time=time(8 + index % 10, 30),
+            status=TechnicianTaskStatus.COMPLETED if index % 3 == 0 else TechnicianTaskStatus.SCHEDULED,
+            priority=TaskPriority.HIGH if index % 4 == 0 else TaskPriority.NORMAL,
+            location_name="حي الملقا - الرياض",
+            customer_name=f"عميل {index}",
+            client_rating=5 if index % 3 == 0 else None,
+            client_feedback="خدمة ممتازة وسريعة" if index % 3 == 0 else None,
+            completed_at=datetime.now(timezone.utc) if index % 3 == 0 else None,
+        )
+        for index in range(TASKS_PER_WEEK)
+    )
+    db.commit()
+    return technician
+
+
+def test_technician_dashboard_orjson_matches_and_beats_default(db, technician):
+    dashboard = get_technician_dashboard(current_user=technician, db=db)
+    field = create_model_field(name="Response", type_=TechnicianDashboardResponse, mode="serialization")
+    content = asyncio.run(serialize_response(field=field, response_content=dashboard))
+    assert sum(len(day["tasks"]) for day in content["weekly_overview"]["days"]) == TASKS_PER_WEEK
+
+    orjson_body = ORJSONResponse(content).body
+    default_body = JSONResponse(content).body
+
+    assert json.loads(orjson_body) == json.loads(default_body)
+    # النص العربي بدون escape
+    assert "صيانة مسبح".encode("utf-8") in orjson_body
+    assert _best_time(lambda: ORJSONResponse(content)) < _best_time(lambda: JSONResponse(content))
+
+
+def test_orjson_response_encodes_native_types():
+    content = {
+        "created_at": datetime(2026, 10, 19, 8, 30, tzinfo=timezone.utc),
+        "day": date(2026, 10, 19),
+        "at": time(8, 30),
+        "status": TechnicianTaskStatus.SCHEDULED,
+        "title": "مهمة",
+        "price": Decimal("12.50"),
+        3: "مفتاح رقمي",
+    }
+
+    assert json.loads(ORJSONResponse(content).body) == json.loads(JSONResponse(jsonable_encoder(content)).body)